@@ -6,7 +6,10 @@ B2C Revenue & Orders Analytics Dashboard
 import streamlit as st
 
 import config
+from src.db.connection import get_engine
 from src.logger import get_logger
+from src.services.cache_warmer import start_cache_warmer
+from src.utils.query_manager import QueryValidationError, get_query_registry
 from ui.styles import inject_styles
 from ui.sidebar import render_sidebar, render_page_content
 
@@ -22,6 +25,20 @@ def initialize_app() -> None:
     if not config.SIDEBAR_MENU_MAP:
         config.SIDEBAR_MENU_MAP.update(config._init_menu_map())
     
+    # Load and validate all SQL files once; malformed queries stop the app here
+    try:
+        get_query_registry()
+    except QueryValidationError as e:
+        logger.error(str(e))
+        st.error(str(e))
+        st.stop()
+    
+    # Precompute common views in the background (once per server process)
+    if config.CACHE_WARM_ENABLED:
+        engine = get_engine()
+        if engine:
+            start_cache_warmer(engine)
+    
     logger.info("App initialized")
 
 
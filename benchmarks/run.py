@@ -0,0 +1,297 @@
+"""
+data_service benchmark.
+Times every data_service dataset function against a synthetic omisell dataset
+loaded into a stand-in MySQL database, across date-range widths and filter
+cardinalities, and writes a JSON report.
+
+Usage:
+    # Generate 1M catalogue rows into BENCH_DB_URL, then benchmark
+    python -m benchmarks.run --rows 1M --generate --report bench_1M.json
+    
+    # Re-run against the loaded data and compare with an earlier report
+    python -m benchmarks.run --rows 1M --report after.json --baseline bench_1M.json
+
+BENCH_DB_URL defaults to mysql+pymysql://root@127.0.0.1:3306/omisell_db and must
+point at a database named omisell_db (it is dropped and refilled by --generate).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import Engine, create_engine, make_url
+
+import config
+from benchmarks import synthetic
+from src.logger import get_logger
+from src.services import data_service
+from src.services.dimensions import load_dimension_counts
+from src.services.result_cache import get_result_cache
+from src.services.rollups import get_rollup_watermarks
+from src.utils.sql_helpers import FilterSpec, build_filters
+
+logger = get_logger(__name__)
+
+DEFAULT_DB_URL = "mysql+pymysql://root@127.0.0.1:3306/omisell_db"
+WIDTHS_DAYS = [1, 7, 30, 90]
+
+# Filter scenarios: name -> (brand count, platform count, status count)
+FILTER_SCENARIOS: Dict[str, Tuple[int, int, int]] = {
+    "none": (0, 0, 0),
+    "brand_1": (1, 0, 0),
+    "brand_10": (10, 0, 0),
+    "brand_5_platform_2_status_3": (5, 2, 3),
+    # The page default: every option ticked (normalized to no filter)
+    "all_selected": (synthetic.N_BRANDS, len(config.PLATFORMS), len(synthetic.STATUSES)),
+}
+# Every value of each filter field in the synthetic data (the dimension catalog)
+FILTER_DOMAINS = {
+    "brand": synthetic.BRANDS,
+    "platform": config.PLATFORMS,
+    "shop": synthetic.SHOPS,
+    "status": synthetic.STATUSES,
+}
+
+
+def _filters_for(scenario: str) -> FilterSpec:
+    n_brands, n_platforms, n_statuses = FILTER_SCENARIOS[scenario]
+    return build_filters(
+        synthetic.BRANDS[:n_brands],
+        config.PLATFORMS[:n_platforms],
+        [],
+        synthetic.STATUSES[-n_statuses:] if n_statuses else [],
+        domains=FILTER_DOMAINS,
+    )
+
+
+def _periods(end: datetime, days: int) -> Tuple[str, str, str, str]:
+    """Current period of `days` days ending at `end`, and the period before it."""
+    fmt = config.SQL_DATETIME_FORMAT
+    start = (end - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0)
+    prev_end = start - timedelta(seconds=1)
+    prev_start = start - timedelta(days=days)
+    return start.strftime(fmt), end.strftime(fmt), prev_start.strftime(fmt), prev_end.strftime(fmt)
+
+
+def _cases(engine: Engine) -> Dict[str, Callable[[str, str, str, str, FilterSpec], Any]]:
+    """Benchmarked functions, adapted to one (start, end, prev_start, prev_end, filters) signature."""
+    ds = data_service
+    return {
+        "get_kpi_data":
+            lambda s, e, ps, pe, f: ds.get_kpi_data(s, e, ps, pe, f, engine),
+        "get_trend_data":
+            lambda s, e, ps, pe, f: ds.get_trend_data(s, e, f, engine),
+        "get_status_summary":
+            lambda s, e, ps, pe, f: ds.get_status_summary(s, e, f, engine),
+        "get_province_data":
+            lambda s, e, ps, pe, f: ds.get_province_data(s, e, f, engine),
+        "get_revenue_by_brand_platform":
+            lambda s, e, ps, pe, f: ds.get_revenue_by_brand_platform(s, e, f, engine),
+        "get_revenue_by_brand":
+            lambda s, e, ps, pe, f: ds.get_revenue_by_brand(s, e, f, engine),
+        "get_revenue_by_platform":
+            lambda s, e, ps, pe, f: ds.get_revenue_by_platform(s, e, f, engine),
+        "get_overview_bundle":
+            lambda s, e, ps, pe, f: ds.get_overview_bundle(s, e, ps, pe, f, engine),
+    }
+
+
+def _result_rows(result: Any) -> int:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(_result_rows(value) for value in result.values())
+    return 0
+
+
+def _clear_caches() -> None:
+    """Drop every cached result so the next call hits the database."""
+    get_result_cache().clear()
+    data_service.load_filter_options.clear()
+    load_dimension_counts.clear()
+    get_rollup_watermarks.clear()
+
+
+def _time_call(func: Callable[[], Any]) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def run_benchmark(
+    engine: Engine,
+    end: datetime,
+    repeat: int,
+    functions: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Time each function for every (date width, filter scenario) pair.
+    Each repetition clears the caches, then times a cold call and a warm call.
+    
+    Args:
+        engine: SQLAlchemy Engine of the stand-in database
+        end: Last moment of the benchmarked periods (end of the synthetic data)
+        repeat: Repetitions per case
+        functions: Subset of function names to run (default: all)
+    
+    Returns:
+        List of result records (one per function / width / filter scenario)
+    """
+    cases = _cases(engine)
+    results = []
+    
+    _clear_caches()
+    elapsed, options = _time_call(lambda: data_service.get_filter_options_dict(engine))
+    results.append({
+        "function": "get_filter_options_dict",
+        "days": None,
+        "filters": None,
+        "filter_values": 0,
+        "rows": sum(len(values) for key, values in options.items() if key != "counts"),
+        "cold_ms": [round(elapsed, 2)],
+        "warm_ms": [],
+    })
+    
+    for name, case in cases.items():
+        if functions and name not in functions:
+            continue
+        for days in WIDTHS_DAYS:
+            periods = _periods(end, days)
+            for scenario in FILTER_SCENARIOS:
+                filters = _filters_for(scenario)
+                cold, warm, rows = [], [], 0
+                for _ in range(repeat):
+                    _clear_caches()
+                    elapsed, result = _time_call(lambda: case(*periods, filters))
+                    cold.append(round(elapsed, 2))
+                    rows = _result_rows(result)
+                    elapsed, _ = _time_call(lambda: case(*periods, filters))
+                    warm.append(round(elapsed, 2))
+                results.append({
+                    "function": name,
+                    "days": days,
+                    "filters": scenario,
+                    "filter_values": len(filters.params),
+                    "rows": rows,
+                    "cold_ms": cold,
+                    "warm_ms": warm,
+                    "cold_median_ms": statistics.median(cold),
+                    "warm_median_ms": statistics.median(warm),
+                })
+                logger.info(
+                    f"{name} days={days} filters={scenario}: "
+                    f"cold {statistics.median(cold):.1f} ms, warm {statistics.median(warm):.1f} ms"
+                )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Compare cold medians of two reports case by case.
+    
+    Args:
+        report: New report
+        baseline: Earlier report
+    
+    Returns:
+        One line per case present in both, with the speed-up factor
+    """
+    def key(record: Dict[str, Any]) -> Tuple:
+        return record["function"], record["days"], record["filters"]
+    
+    before = {key(r): r for r in baseline["results"] if "cold_median_ms" in r}
+    lines = []
+    for record in report["results"]:
+        old = before.get(key(record))
+        if old is None or "cold_median_ms" not in record:
+            continue
+        new_ms, old_ms = record["cold_median_ms"], old["cold_median_ms"]
+        speedup = old_ms / new_ms if new_ms else 0.0
+        lines.append(
+            f"{record['function']:<32} {record['days']:>3}d {record['filters']:<28} "
+            f"{old_ms:>10.1f} -> {new_ms:>10.1f} ms  x{speedup:.2f}"
+        )
+    return lines
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark data_service on synthetic data")
+    parser.add_argument("--rows", default="1M", help="omisell_catalogue rows: 1M, 10M, 50M, ...")
+    parser.add_argument("--days", type=int, default=180, help="Days the data is spread over")
+    parser.add_argument("--start", default="2024-01-01", help="First day of synthetic data")
+    parser.add_argument("--generate", action="store_true", help="Drop and regenerate the tables")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per case")
+    parser.add_argument("--functions", nargs="*", help="Only benchmark these functions")
+    parser.add_argument("--report", default="bench_report.json", help="JSON report path")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    args = parser.parse_args()
+    
+    db_url = os.getenv("BENCH_DB_URL", DEFAULT_DB_URL)
+    engine = create_engine(
+        db_url,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_recycle=config.DB_POOL_RECYCLE,
+    )
+    total_rows = synthetic.parse_scale(args.rows)
+    start = datetime.strptime(args.start, config.SQL_DATE_FORMAT)
+    _, end = synthetic.date_span(start, args.days)
+    
+    load_stats = None
+    if args.generate:
+        started = time.perf_counter()
+        counts = synthetic.load_dataset(engine, total_rows, start, args.days)
+        load_stats = {"tables": counts, "seconds": round(time.perf_counter() - started, 1)}
+    
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "database": make_url(db_url).render_as_string(hide_password=True),
+            "rows": total_rows,
+            "data_start": start.isoformat(),
+            "data_days": args.days,
+            "repeat": args.repeat,
+            "fact_store_enabled": config.FACT_STORE_ENABLED,
+            "rollup_enabled": config.ROLLUP_ENABLED,
+            "overview_bundle_mode": config.OVERVIEW_BUNDLE_MODE,
+            "load": load_stats,
+        },
+        "results": run_benchmark(engine, end, args.repeat, args.functions),
+    }
+    
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"Benchmark report written to {args.report}")
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)))
+    
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Synthetic omisell dataset.
+Generates omisell_catalogue / omisell_order / omisell_inventory rows (plus the
+omisell_brand and omisell_platform lookups) with the columns the query/*.sql
+files use, and loads them into a stand-in MySQL database.
+
+Distributions are skewed like production: a few brands and shops carry most
+orders, orders have 1-4 lines, and traffic follows a daily curve.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Engine, text
+
+import config
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+N_BRANDS = 40
+N_SHOPS = 120
+N_PROVINCES = 63
+STATUSES = [
+    "Chờ xác nhận", "Đã xác nhận", "Đang đóng gói", "Đang giao",
+    "Đã giao", "Hoàn thành", "Đã hủy", "Trả hàng",
+]
+STATUS_WEIGHTS = [0.04, 0.05, 0.05, 0.08, 0.10, 0.58, 0.08, 0.02]
+PLATFORM_WEIGHTS = [0.05, 0.25, 0.45, 0.05, 0.20]
+INVENTORY_RATIO = 10  # One inventory row per this many catalogue rows
+
+BRANDS = [f"Brand {i:02d}" for i in range(1, N_BRANDS + 1)]
+SHOPS = [f"Shop {i:03d}" for i in range(1, N_SHOPS + 1)]
+PROVINCES = [f"Province {i:02d}" for i in range(1, N_PROVINCES + 1)]
+
+DDL = [
+    """CREATE TABLE IF NOT EXISTS omisell_brand (
+        BrandID INT NOT NULL PRIMARY KEY,
+        brand VARCHAR(255) NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS omisell_platform (
+        PlatformID INT NOT NULL PRIMARY KEY,
+        PlatformName VARCHAR(255) NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS omisell_catalogue (
+        Id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        OmisellOrderNumber VARCHAR(32) NOT NULL,
+        CreatedTime DATETIME NOT NULL,
+        brand VARCHAR(255) NULL,
+        PlatformName VARCHAR(255) NULL,
+        ShopName VARCHAR(255) NULL,
+        ShopId VARCHAR(64) NULL,
+        StatusName VARCHAR(255) NULL,
+        StatusID VARCHAR(64) NULL,
+        Province VARCHAR(255) NULL,
+        OriginalPrice DECIMAL(18, 2) NOT NULL,
+        DiscountSeller DECIMAL(18, 2) NOT NULL,
+        VoucherSeller DECIMAL(18, 2) NOT NULL,
+        Quantity DECIMAL(18, 2) NOT NULL,
+        Revenue DECIMAL(18, 2) NOT NULL,
+        KEY idx_created (CreatedTime))""",
+    """CREATE TABLE IF NOT EXISTS omisell_order (
+        OmisellOrderNumber VARCHAR(32) NOT NULL PRIMARY KEY,
+        CreatedTime DATETIME NOT NULL,
+        BrandID INT NULL,
+        PlatformID INT NULL,
+        Revenue DECIMAL(18, 2) NOT NULL,
+        KEY idx_created (CreatedTime))""",
+    """CREATE TABLE IF NOT EXISTS omisell_inventory (
+        Id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        CreatedTime DATETIME NOT NULL,
+        brand VARCHAR(255) NULL,
+        ShopName VARCHAR(255) NULL,
+        Quantity DECIMAL(18, 2) NOT NULL,
+        KEY idx_created (CreatedTime))""",
+]
+
+TABLES = ["omisell_inventory", "omisell_order", "omisell_catalogue", "omisell_platform", "omisell_brand"]
+
+CATALOGUE_COLUMNS = [
+    "OmisellOrderNumber", "CreatedTime", "brand", "PlatformName", "ShopName", "ShopId",
+    "StatusName", "StatusID", "Province", "OriginalPrice", "DiscountSeller",
+    "VoucherSeller", "Quantity", "Revenue",
+]
+ORDER_COLUMNS = ["OmisellOrderNumber", "CreatedTime", "BrandID", "PlatformID", "Revenue"]
+INVENTORY_COLUMNS = ["CreatedTime", "brand", "ShopName", "Quantity"]
+
+
+def parse_scale(value: str) -> int:
+    """
+    Parse a row count such as "1M", "10M", "500k" or "2000000".
+    
+    Args:
+        value: Row count with optional k/M suffix
+    
+    Returns:
+        Number of rows
+    """
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    digits = value[:-1] if multiplier > 1 else value
+    return int(float(digits) * multiplier)
+
+
+def _zipf_weights(n: int, skew: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** skew
+    return weights / weights.sum()
+
+
+# Share of orders per hour of day (quiet at night, peaks at noon and evening)
+HOUR_WEIGHTS = np.array([
+    1, 0.6, 0.4, 0.3, 0.3, 0.5, 1, 2, 3, 4, 5, 6,
+    6, 5, 4, 4, 4, 5, 6, 7, 8, 7, 4, 2,
+], dtype="float64")
+HOUR_WEIGHTS /= HOUR_WEIGHTS.sum()
+
+
+def generate_batches(
+    total_rows: int,
+    start: datetime,
+    days: int,
+    batch_rows: int = 500_000,
+    seed: int = 42,
+) -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Generate the dataset batch by batch (memory stays at one batch).
+    
+    Args:
+        total_rows: Number of omisell_catalogue rows
+        start: First day of data
+        days: Number of days the rows are spread over
+        batch_rows: Catalogue rows per batch
+        seed: Random seed (same seed, same data)
+    
+    Yields:
+        {"catalogue": ..., "order": ..., "inventory": ...} DataFrames per batch
+    """
+    rng = np.random.default_rng(seed)
+    brand_p = _zipf_weights(N_BRANDS)
+    shop_p = _zipf_weights(N_SHOPS, skew=0.9)
+    province_p = _zipf_weights(N_PROVINCES, skew=0.8)
+    next_order = 1
+    generated = 0
+    
+    while generated < total_rows:
+        rows = min(batch_rows, total_rows - generated)
+        # Orders with 1-4 lines, trimmed to exactly `rows` lines
+        lines = rng.choice([1, 2, 3, 4], size=rows, p=[0.45, 0.30, 0.15, 0.10])
+        lines = lines[: np.searchsorted(np.cumsum(lines), rows) + 1]
+        n_orders = len(lines)
+        
+        order_ids = np.arange(next_order, next_order + n_orders)
+        next_order += n_orders
+        created = (
+            np.datetime64(start, "s")
+            + rng.integers(0, days, n_orders).astype("timedelta64[D]")
+            + rng.choice(24, n_orders, p=HOUR_WEIGHTS).astype("timedelta64[h]")
+            + rng.integers(0, 3600, n_orders).astype("timedelta64[s]")
+        )
+        brand_idx = rng.choice(N_BRANDS, n_orders, p=brand_p)
+        platform_idx = rng.choice(len(config.PLATFORMS), n_orders, p=PLATFORM_WEIGHTS)
+        shop_idx = rng.choice(N_SHOPS, n_orders, p=shop_p)
+        status_idx = rng.choice(len(STATUSES), n_orders, p=STATUS_WEIGHTS)
+        province_idx = rng.choice(N_PROVINCES, n_orders, p=province_p)
+        # ~3% of orders have no province (excluded by the province query)
+        province_idx[rng.random(n_orders) < 0.03] = -1
+        
+        line_order = np.repeat(np.arange(n_orders), lines)[:rows]
+        price = rng.integers(20, 2000, rows) * 1000.0
+        discount = np.round(price * rng.choice([0, 0.05, 0.1, 0.2], rows), -2)
+        voucher = np.round(price * rng.choice([0, 0, 0.05], rows), -2)
+        quantity = rng.choice([1, 1, 1, 2, 3], rows).astype("float64")
+        revenue = (price - discount - voucher) * quantity
+        
+        order_numbers = np.char.add("OM", order_ids.astype(str))
+        brands = np.array(BRANDS)
+        platforms = np.array(config.PLATFORMS)
+        shops = np.array(SHOPS)
+        provinces = np.array(PROVINCES + [""])
+        
+        catalogue = pd.DataFrame({
+            "OmisellOrderNumber": order_numbers[line_order],
+            "CreatedTime": created[line_order],
+            "brand": brands[brand_idx][line_order],
+            "PlatformName": platforms[platform_idx][line_order],
+            "ShopName": shops[shop_idx][line_order],
+            "ShopId": np.char.add("S", shop_idx.astype(str))[line_order],
+            "StatusName": np.array(STATUSES)[status_idx][line_order],
+            "StatusID": status_idx.astype(str)[line_order],
+            "Province": provinces[province_idx][line_order],
+            "OriginalPrice": price,
+            "DiscountSeller": discount,
+            "VoucherSeller": voucher,
+            "Quantity": quantity,
+            "Revenue": revenue,
+        })
+        order = pd.DataFrame({
+            "OmisellOrderNumber": order_numbers,
+            "CreatedTime": created,
+            "BrandID": brand_idx + 1,
+            "PlatformID": platform_idx + 1,
+            "Revenue": np.bincount(line_order, weights=revenue, minlength=n_orders),
+        })
+        sample = rng.choice(rows, max(rows // INVENTORY_RATIO, 1), replace=False)
+        inventory = catalogue.loc[np.sort(sample), ["CreatedTime", "brand", "ShopName", "Quantity"]]
+        
+        generated += rows
+        yield {"catalogue": catalogue, "order": order, "inventory": inventory}
+
+
+def _insert(conn, table: str, columns: List[str], df: pd.DataFrame) -> None:
+    """Multi-row INSERT of one DataFrame (pymysql batches executemany INSERTs)."""
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    values = df[columns].astype(object).where(df[columns].notna(), None)
+    values["CreatedTime"] = df["CreatedTime"].dt.to_pydatetime()
+    conn.exec_driver_sql(sql, list(values.itertuples(index=False, name=None)))
+
+
+def load_dataset(
+    engine: Engine,
+    total_rows: int,
+    start: datetime,
+    days: int,
+    batch_rows: int = 500_000,
+    seed: int = 42,
+) -> Dict[str, int]:
+    """
+    Recreate the omisell tables and fill them with synthetic rows.
+    
+    Args:
+        engine: SQLAlchemy Engine of the stand-in database (must be omisell_db,
+            since the omisell_order queries use schema-qualified names)
+        total_rows: Number of omisell_catalogue rows
+        start: First day of data
+        days: Number of days the rows are spread over
+        batch_rows: Catalogue rows per insert batch
+        seed: Random seed
+    
+    Returns:
+        Row counts per table
+    """
+    with engine.begin() as conn:
+        for table in TABLES:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        for ddl in DDL:
+            conn.execute(text(ddl))
+        conn.exec_driver_sql(
+            "INSERT INTO omisell_brand (BrandID, brand) VALUES (%s, %s)",
+            [(i + 1, name) for i, name in enumerate(BRANDS)],
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO omisell_platform (PlatformID, PlatformName) VALUES (%s, %s)",
+            [(i + 1, name) for i, name in enumerate(config.PLATFORMS)],
+        )
+    
+    counts = {"omisell_catalogue": 0, "omisell_order": 0, "omisell_inventory": 0}
+    for batch in generate_batches(total_rows, start, days, batch_rows, seed):
+        with engine.begin() as conn:
+            _insert(conn, "omisell_catalogue", CATALOGUE_COLUMNS, batch["catalogue"])
+            _insert(conn, "omisell_order", ORDER_COLUMNS, batch["order"])
+            _insert(conn, "omisell_inventory", INVENTORY_COLUMNS, batch["inventory"])
+        counts["omisell_catalogue"] += len(batch["catalogue"])
+        counts["omisell_order"] += len(batch["order"])
+        counts["omisell_inventory"] += len(batch["inventory"])
+        logger.info(f"Loaded {counts['omisell_catalogue']:,}/{total_rows:,} catalogue rows")
+    
+    return counts
+
+
+def date_span(start: datetime, days: int) -> Tuple[datetime, datetime]:
+    """First and last moment covered by a dataset generated with (start, days)."""
+    return start, start + timedelta(days=days) - timedelta(seconds=1)
@@ -4,6 +4,7 @@ Centralized settings for database, UI, cache, and application constants.
 """
 
 import os
+import tempfile
 from typing import Optional
 
 # ============================================================================
@@ -21,13 +22,113 @@ DB_POOL_SIZE: int = 10
 DB_MAX_OVERFLOW: int = 20
 DB_POOL_TIMEOUT: int = 30
 DB_POOL_RECYCLE: int = 3600
+DB_POOL_PRE_PING: bool = True  # Test each connection on checkout, replace dead ones
+
+# Read replicas (src/db/replicas.py): dataset queries go to these "host:port"
+# endpoints (same user, password and database as the primary), e.g.
+# DB_REPLICAS=10.0.0.21:3306,10.0.0.22:3306; empty = everything on DB_HOST
+DB_REPLICAS: list[str] = [e.strip() for e in os.getenv("DB_REPLICAS", "").split(",") if e.strip()]
+DB_REPLICA_STRATEGY: str = os.getenv("DB_REPLICA_STRATEGY", "round_robin")  # or "least_latency"
+DB_REPLICA_MAX_LAG_SECONDS: int = 30  # Replicas further behind are skipped (primary fallback)
+DB_REPLICA_CHECK_INTERVAL: int = 15  # Seconds between lag / latency checks of a replica
+DB_REPLICA_RETRY_SECONDS: int = 60  # A failed replica is skipped this long
+# Use endpoints that are not replicating (no SHOW REPLICA STATUS row) as 0s behind.
+# Only for local stand-ins loaded with a copy of the data; off, such endpoints are skipped
+DB_REPLICA_ALLOW_STANDALONE: bool = os.getenv("DB_REPLICA_ALLOW_STANDALONE", "false").lower() == "true"
+
+# Admission control (src/db/admission.py): dataset queries beyond the limit wait
+# in a priority queue (interactive > warmer > export) instead of the pool
+ADMISSION_MAX_CONCURRENCY: int = DB_POOL_SIZE  # Leaves the overflow to unqueued callers
+ADMISSION_MIN_CONCURRENCY: int = 2
+ADMISSION_TARGET_LATENCY_MS: int = 2000  # Limit shrinks while queries average above this
+ADMISSION_DECREASE_FACTOR: float = 0.75
+ADMISSION_QUEUE_TIMEOUT: int = DB_POOL_TIMEOUT  # Seconds a query waits for a slot
+ADMISSION_PRIORITY_SHARES: dict[str, float] = {"interactive": 1.0, "warmer": 0.5, "export": 0.25}
+
+# Parallel dataset fetching (fetch_many); keep well below the pool capacity
+DATA_FETCH_MAX_WORKERS: int = 4
+
+# Asyncio data path (aiomysql engine on a background event loop, see
+# src/db/async_connection.py); concurrent queries without a thread each
+ASYNC_DATA_ENABLED: bool = os.getenv("ASYNC_DATA_ENABLED", "false").lower() == "true"
+ASYNC_DB_POOL_SIZE: int = 20
+ASYNC_DB_MAX_OVERFLOW: int = 20
+ASYNC_QUERY_TIMEOUT: int = 60  # Seconds a page waits for an async dataset batch
 
 # ============================================================================
 # CACHE CONFIGURATION
 # ============================================================================
 CACHE_TTL_DATA: int = 600  # 10 minutes for data queries
+# Stale-while-revalidate: between CACHE_TTL_DATA and this age a cached result is
+# served at once while one background query refreshes it; older results block
+CACHE_HARD_TTL_DATA: int = 3600
+CACHE_REVALIDATE_MAX_WORKERS: int = 2  # Background refreshes running at once
 CACHE_TTL_OPTIONS: int = 3600  # 1 hour for options (brand, shop, etc.)
 
+# Result cache for query results (src/services/result_cache.py)
+RESULT_CACHE_MEMORY_MAX_MB: int = int(os.getenv("RESULT_CACHE_MEMORY_MAX_MB", "512"))
+RESULT_CACHE_DISK_ENABLED: bool = os.getenv("RESULT_CACHE_DISK_ENABLED", "true").lower() == "true"
+RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", "data/result_cache")
+RESULT_CACHE_DISK_MAX_MB: int = int(os.getenv("RESULT_CACHE_DISK_MAX_MB", "2048"))
+# Entries are Arrow IPC buffers compressed with "lz4" (fast), "zstd" (smaller) or "none"
+RESULT_CACHE_COMPRESSION: str = os.getenv("RESULT_CACHE_COMPRESSION", "lz4")
+
+# Cache warmer (src/services/cache_warmer.py): precomputes common views at
+# startup and re-warms them CACHE_WARM_LEAD_SECONDS before CACHE_TTL_DATA expires
+CACHE_WARM_ENABLED: bool = os.getenv("CACHE_WARM_ENABLED", "false").lower() == "true"
+CACHE_WARM_RANGES: list[str] = ["today", "yesterday", "last_7_days", "last_30_days"]
+CACHE_WARM_TOP_BRANDS: int = 3  # Also warm each of the N brands with most orders alone
+CACHE_WARM_MAX_WORKERS: int = 2  # Views warmed at a time; keep well below DB_POOL_SIZE
+CACHE_WARM_LEAD_SECONDS: int = 90
+
+# Streaming reads (server-side cursor) for large result sets
+STREAM_CHUNK_ROWS: int = 50000  # Rows per DataFrame chunk
+
+# Row exports (src/services/export_service.py): streamed into temp files on
+# background threads at export priority, offered as downloads
+EXPORT_DIR: str = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "oqr_exports"))
+EXPORT_MAX_WORKERS: int = 2  # Exports running at once (process-wide)
+EXPORT_QUEUE_TIMEOUT: int = 600  # Seconds an export waits for an admission slot
+EXPORT_FILE_TTL_SECONDS: int = 3600  # Finished export files are removed after this
+# CSV exports larger than this are zipped before download: st.download_button
+# holds the whole file in memory on every rerun of the page that shows it
+EXPORT_ZIP_MIN_MB: int = int(os.getenv("EXPORT_ZIP_MIN_MB", "20"))
+EXPORT_FORMATS = {"csv": "CSV", "xlsx": "Excel (XLSX)", "parquet": "Parquet"}
+
+# Query profiler (diagnostics page)
+PROFILER_HISTORY_SIZE: int = 20  # Profiled renders kept per session
+
+# ============================================================================
+# LOCAL FACT STORE (Parquet copy of omisell_catalogue, partitioned by day)
+# ============================================================================
+# When enabled, catalogue datasets (KPI, trend, status, province) are answered
+# from the local store. Keep it fresh with: python -m src.store.fact_store
+FACT_STORE_ENABLED: bool = os.getenv("FACT_STORE_ENABLED", "false").lower() == "true"
+FACT_STORE_DIR: str = os.getenv("FACT_STORE_DIR", "data/fact_store")
+FACT_STORE_START_DATE: str = "2024-01-01"  # First day pulled by the initial sync
+FACT_STORE_RESYNC_HOURS: int = 48  # Re-pull window behind the watermark (late updates)
+FACT_STORE_SYNC_BATCH_DAYS: int = 7  # Days fetched per sync query
+# Ranges past the last sync go to MySQL unless that sync is newer than this
+FACT_STORE_MAX_LAG_MINUTES: int = 15
+
+# ============================================================================
+# HOURLY ROLLUPS (summary tables in MySQL)
+# ============================================================================
+# When enabled, datasets are routed to hour-grain rollup tables if they cover
+# the requested dimensions. Refresh with: python -m src.services.rollups
+ROLLUP_ENABLED: bool = os.getenv("ROLLUP_ENABLED", "false").lower() == "true"
+ROLLUP_START_DATE: str = "2024-01-01"  # First day built by the initial refresh
+ROLLUP_RESYNC_HOURS: int = 48  # Hours behind the watermark rebuilt on each refresh
+ROLLUP_BATCH_DAYS: int = 7  # Days rebuilt per transaction
+ROLLUP_MAX_LAG_MINUTES: int = 15  # Skip rollups if the last refresh is older than this
+CACHE_TTL_ROLLUP_STATE: int = 60  # Cache watermarks lookup for 1 minute
+
+# ============================================================================
+# DIMENSION CATALOG (filter options with order counts)
+# ============================================================================
+# Refresh with: python -m src.services.dimensions  (add --rebuild to recount)
+DIM_CATALOG_SETTLE_MINUTES: int = 10  # Only count rows older than this (ingestion lag)
+
 # ============================================================================
 # STREAMLIT PAGE CONFIGURATION
 # ============================================================================
@@ -44,17 +145,154 @@ PAGE_CONFIG = {
 # SQL Query Files Mapping
 QUERY_FILES = {
     "kpi": "GET_ORDER_REVENUE_AOV.sql",
-    "trend": "get_Hourly_Trend.sql",
+    "trend": "GET_TREND_BUCKETS.sql",
     "status": "GET_ORDER_STATUS.sql",
     "province": "GET_REVENUE_ORDER_PROVINCE.sql",
     "brand": "GET_BRAND.sql",
     "shop": "GET_SHOP.sql",
-    "platform": "GET_PLATFORM.sql",
+    "platform": "get_Platform.sql",
     "order_status": "GET_STATUS.sql",
     "revenue_brand_platform": "GET_REVENUE_BRAND_PLATFORM.sql",
     "revenue_by_brand": "GET_REVENUE_BY_BRAND.sql",
     "revenue_by_platform": "GET_REVENUE_BY_PLATFORM.sql",
+    "overview_slice": "GET_OVERVIEW_SLICE.sql",
+    "catalogue_sync": "SYNC_CATALOGUE.sql",
+    # Row-level export of the Custom Report selection (src/services/export_service.py)
+    "export_rows": "GET_EXPORT_ROWS.sql",
+    # Revenue / orders of one period (KPI comparisons, see data_service.get_period_totals)
+    "period_totals": "GET_PERIOD_TOTALS.sql",
+    # Top-N / keyset page + "Others" wrapper around a breakdown (QueryRegistry.compile_ranked)
+    "ranked_breakdown": "GET_RANKED_BREAKDOWN.sql",
+    # Dimension catalog (see src/services/dimensions.py)
+    "dim_catalog": "GET_DIM_CATALOG.sql",
+    "dim_catalog_refresh": "DIM_CATALOG_REFRESH.sql",
+    # Hourly rollup tables (see src/services/rollups.py)
+    "rollup_refresh_catalogue": "ROLLUP_REFRESH_CATALOGUE.sql",
+    "rollup_refresh_order": "ROLLUP_REFRESH_ORDER.sql",
+    "period_totals_rollup": "GET_PERIOD_TOTALS_ROLLUP.sql",
+    "trend_rollup": "GET_TREND_BUCKETS_ROLLUP.sql",
+    "status_rollup": "GET_ORDER_STATUS_ROLLUP.sql",
+    "province_rollup": "GET_REVENUE_ORDER_PROVINCE_ROLLUP.sql",
+    "revenue_brand_platform_rollup": "GET_REVENUE_BRAND_PLATFORM_ROLLUP.sql",
+    "revenue_by_brand_rollup": "GET_REVENUE_BY_BRAND_ROLLUP.sql",
+    "revenue_by_platform_rollup": "GET_REVENUE_BY_PLATFORM_ROLLUP.sql",
+}
+
+# Named parameters of every query, in the order of its %s placeholders.
+# The query registry checks the counts at startup and compiles each %s to
+# the matching :name bind. Rollup queries keep the names of their raw query.
+_RANGE = ("start", "end")
+QUERY_PARAMS = {
+    "kpi": (
+        "start", "end", "start", "end",
+        "prev_start", "prev_end", "prev_start", "prev_end",
+        "prev_start", "end",
+    ),
+    # Time buckets (src/utils/time_buckets.py)
+    "trend": ("bucket_count", "start", "step", "start", "end", "step", "start"),
+    "status": _RANGE,
+    "province": _RANGE,
+    "brand": _RANGE,
+    "shop": _RANGE,
+    "platform": _RANGE,
+    "order_status": _RANGE,
+    "revenue_brand_platform": _RANGE,
+    "revenue_by_brand": _RANGE,
+    "revenue_by_platform": _RANGE,
+    "overview_slice": _RANGE,
+    "catalogue_sync": _RANGE,
+    "export_rows": _RANGE,
+    "period_totals": _RANGE,
+    "ranked_breakdown": (
+        "first_page", "after_value", "after_value", "after_key", "after_key", "limit", "others_label",
+    ),
+    "dim_catalog": ("dimension",),
+    "dim_catalog_refresh": ("watermark", "until"),
+    "rollup_refresh_catalogue": _RANGE,
+    "rollup_refresh_order": _RANGE,
+}
+QUERY_PARAMS.update({
+    f"{key}_rollup": QUERY_PARAMS[key]
+    for key in (
+        "period_totals", "trend", "status", "province",
+        "revenue_brand_platform", "revenue_by_brand", "revenue_by_platform",
+    )
+})
+
+# Column dtypes of query results, applied by fetch_data (src/utils/dtypes.py
+# coerce_columns; kinds: float, int, count, category, datetime). Columns not
+# listed only get DECIMAL -> float64. Rollup queries share their raw query's spec.
+_BREAKDOWN_MEASURES = {"Revenue": "float", "Orders": "count"}
+QUERY_COLUMNS = {
+    "kpi": {
+        "Revenue": "float", "Orders": "count", "Quantity": "count", "AOV": "float",
+        "RevenueGrowth": "float", "OrdersGrowth": "float",
+        "QuantityGrowth": "float", "AovGrowth": "float",
+    },
+    "trend": {"BucketStart": "datetime", **_BREAKDOWN_MEASURES},
+    "status": {"StatusName": "category", "Orders": "count"},
+    "province": {"Province": "category", "Orders": "count"},
+    "revenue_brand_platform": {"brand": "category", "PlatformName": "category", **_BREAKDOWN_MEASURES},
+    "revenue_by_brand": {"Brand": "category", **_BREAKDOWN_MEASURES},
+    "revenue_by_platform": {"PlatformName": "category", **_BREAKDOWN_MEASURES},
+    "overview_slice": {
+        "CreatedTime": "datetime", "StatusName": "category", "Province": "category",
+        "LineRevenue": "float",
+    },
+    "period_totals": dict(_BREAKDOWN_MEASURES),
+    "dim_catalog": {"Orders": "count"},
+    # Fixed dtypes (no downcast, no category): every streamed chunk has the same schema
+    "export_rows": {
+        "CreatedTime": "datetime", "OriginalPrice": "float", "DiscountSeller": "float",
+        "VoucherSeller": "float", "Quantity": "int", "LineRevenue": "float",
+    },
+    # Added to the spec of the wrapped breakdown (QueryRegistry.compile_ranked)
+    "ranked_breakdown": {"GroupRank": "int", "TotalGroups": "int"},
 }
+QUERY_COLUMNS.update({
+    f"{key}_rollup": QUERY_COLUMNS[key]
+    for key in (
+        "period_totals", "trend", "status", "province",
+        "revenue_brand_platform", "revenue_by_brand", "revenue_by_platform",
+    )
+})
+
+# Re-read changed .sql files on access (development only)
+QUERY_HOT_RELOAD: bool = os.getenv("QUERY_HOT_RELOAD", "false").lower() == "true"
+
+# KPI comparison modes: key -> label shown after the growth % ("so với ...")
+# Each period is read with its own range scan, so the distance between the
+# periods does not change the cost (see date_helpers.get_comparison_period)
+COMPARISON_MODES = {
+    "previous": "kỳ trước",
+    "wow": "tuần trước",
+    "mom": "tháng trước",
+    "yoy": "năm trước",
+}
+DEFAULT_COMPARISON_MODE: str = "previous"
+
+# Overview bundle mode: scan omisell_catalogue once and derive KPI, trend,
+# status and province aggregates in pandas instead of running four queries.
+# Off by default: the bundle reads line-level rows of the whole range, while the
+# four queries use the rollups and ranked breakdowns. With it on, the page still
+# falls back to the four queries when a rollup covers the range or the scan fails.
+OVERVIEW_BUNDLE_MODE: bool = os.getenv("OVERVIEW_BUNDLE_MODE", "false").lower() == "true"
+OVERVIEW_PROVINCE_LIMIT: int = 20
+
+# Trend chart time buckets (src/utils/time_buckets.py): the finest grain that
+# fits in TREND_MAX_POINTS is used unless one is picked on the page
+TREND_MAX_POINTS: int = 200
+TREND_GRAINS = {
+    "minute": "Phút",
+    "hour": "Giờ",
+    "day": "Ngày",
+    "week": "Tuần",
+    "month": "Tháng",
+}
+
+# Ranked breakdowns (data_service.get_ranked_breakdown): label of the row summing
+# every group after the displayed page
+BREAKDOWN_OTHERS_LABEL: str = "Khác"
 
 # Platform List (Static)
 PLATFORMS: list[str] = ["Haravan", "Lazada", "Shopee", "Shopify", "Tiktok Shop"]
@@ -101,6 +339,12 @@ CHART_COLORS = {
     "primary": "#1e3a8a",
     "secondary": "#3b82f6",
 }
+# Stacked bar series colors, cycled in order
+CHART_STACK_COLORS = ["#1e3a8a", "#ef4444", "#f97316", "#22c55e", "#8b5cf6"]
+# Label of missing dimension values (LEFT JOIN misses, e.g. no brand row) in charts
+CHART_MISSING_LABEL: str = "(Không rõ)"
+# Figure specs cached by content hash of the chart data (ui/figures.py)
+FIGURE_CACHE_MAX_ENTRIES: int = 128
 
 # KPI Card Styles
 CARD_STYLES = {
@@ -121,6 +365,8 @@ SIDEBAR_MENU: list[dict] = [
     {"key": "b2b_revenue", "label": "[B2B] Revenue & Orders", "icon": "🏢"},
     {"key": "accounting_check", "label": "Kế toán check", "icon": "🧮"},
     {"key": "fulfillment", "label": "Fulfillment", "icon": "📦"},
+    # Hidden pages are listed only when the URL has ?diagnostics=1
+    {"key": "diagnostics", "label": "Diagnostics", "icon": "🩺", "hidden": True},
 ]
 
 # Lazy import to avoid circular imports
@@ -135,6 +381,7 @@ def _init_menu_map():
     from pages.b2b_revenue import render_b2b_revenue
     from pages.accounting_check import render_accounting_check
     from pages.fulfillment import render_fulfillment
+    from pages.diagnostics import render_diagnostics
     
     return {
         "overview": render_overview,
@@ -144,6 +391,7 @@ def _init_menu_map():
         "b2b_revenue": render_b2b_revenue,
         "accounting_check": render_accounting_check,
         "fulfillment": render_fulfillment,
+        "diagnostics": render_diagnostics,
     }
 
 # ============================================================================
@@ -2,19 +2,24 @@
 Custom Report page - Brand and Platform Analysis
 """
 
+import os
+
 import streamlit as st
 from datetime import datetime
+from sqlalchemy import Engine
 
 import config
 from src.db.connection import get_engine
 from src.logger import get_logger
+from src.services.data_context import DataContext
 from src.services.data_service import (
     get_filter_options_dict,
     get_revenue_by_brand_platform,
     get_revenue_by_brand,
     get_revenue_by_platform,
 )
-from src.utils.sql_helpers import build_filters
+from src.services.export_service import get_export_manager
+from src.utils.sql_helpers import FilterSpec, build_filters
 from src.utils.date_helpers import get_previous_period
 from ui.filters import render_filter_section
 from ui.charts import render_stacked_bar_chart, render_pie_chart
@@ -22,6 +27,9 @@ from ui.data_tables import render_status_table
 
 logger = get_logger(__name__)
 
+# Session key of the id of this session's latest export
+EXPORT_JOB_KEY = "custom_report_export_job"
+
 
 def render_custom_report() -> None:
     """Render Custom Report page with Brand and Platform analysis."""
@@ -35,31 +43,54 @@ def render_custom_report() -> None:
     # Load filter options
     filter_opts = get_filter_options_dict(engine)
     
-    # Prepare shop options with counts
-    shop_with_counts = {shop: 0 for shop in filter_opts["shop"]}
-    
-    # Render filter section
+    # Render filter section (options with order counts from the dimension catalog)
     filters = render_filter_section(
         engine,
-        brand_options=filter_opts["brand"],
-        platform_options=filter_opts["platform"],
-        shop_options=shop_with_counts,
-        status_options=filter_opts["status"],
+        brand_options=filter_opts["counts"]["brand"],
+        platform_options=filter_opts["counts"]["platform"],
+        shop_options=filter_opts["counts"]["shop"],
+        status_options=filter_opts["counts"]["status"],
     )
     
     # Extract filters and dates
     start_date, end_date = filters["date_range"]
     start_str, end_str = filters["date_str"]
     
-    # Build SQL filters
-    filter_sql = build_filters(
+    # Build filter spec (bound parameters; fields with every value ticked are not filtered)
+    filter_spec = build_filters(
         filters["brand"],
         filters["platform"],
         filters["shop"],
         filters["status"],
+        domains=filter_opts["domains"],
     )
     
+    # --- FETCH ALL DATASETS IN PARALLEL ---
+    # Sections ask for datasets independently; the data context runs each
+    # distinct request once per render
+    with DataContext() as data:
+        dataset_args = (start_str, end_str, filter_spec, engine)
+        for dataset in (get_revenue_by_brand_platform, get_revenue_by_brand, get_revenue_by_platform):
+            data.prefetch(dataset, *dataset_args)
+        _render_sections(data, dataset_args)
+    
+    _render_export_section(engine, start_str, end_str, filter_spec)
+    
+    logger.info("Custom Report page rendered successfully")
+
+
+def _render_sections(data: DataContext, dataset_args: tuple) -> None:
+    """
+    Render report sections, fetching datasets through the render's data context.
+    
+    Args:
+        data: DataContext of the current render
+        dataset_args: (start_str, end_str, filter_spec, engine) for the dataset functions
+    """
     # --- SECTION 1: REVENUE BY BRAND & PLATFORM ---
+    brand_platform_df = data.get(get_revenue_by_brand_platform, *dataset_args)
+    brand_data = data.get(get_revenue_by_brand, *dataset_args)
+    
     st.divider()
     st.subheader("🏢 Doanh Số Theo Brand Và Nền Tảng")
     
@@ -67,9 +98,6 @@ def render_custom_report() -> None:
     
     # Stacked bar chart
     with col1:
-        brand_platform_df = get_revenue_by_brand_platform(
-            start_str, end_str, filter_sql, engine
-        )
         if not brand_platform_df.empty:
             render_stacked_bar_chart(
                 brand_platform_df,
@@ -81,7 +109,6 @@ def render_custom_report() -> None:
     
     # Revenue by Brand table
     with col2:
-        brand_data = get_revenue_by_brand(start_str, end_str, filter_sql, engine)
         if not brand_data.empty:
             st.markdown("#### Tỷ Trọng Doanh Số Theo Brand")
             display_data = brand_data[["Brand", "Revenue", "Orders", "RevenuePercent"]].copy()
@@ -101,6 +128,9 @@ def render_custom_report() -> None:
             st.info("Không có dữ liệu")
     
     # --- SECTION 2: BRAND & PLATFORM PROPORTIONS ---
+    brand_data = data.get(get_revenue_by_brand, *dataset_args)
+    platform_data = data.get(get_revenue_by_platform, *dataset_args)
+    
     st.divider()
     st.subheader("📊 Tỷ Trọng Doanh Số")
     
@@ -109,7 +139,6 @@ def render_custom_report() -> None:
     # Pie chart - Brand
     with col1:
         st.markdown("#### Theo Brand")
-        brand_data = get_revenue_by_brand(start_str, end_str, filter_sql, engine)
         if not brand_data.empty:
             render_pie_chart(brand_data, label_col="Brand", value_col="Revenue")
         else:
@@ -118,13 +147,15 @@ def render_custom_report() -> None:
     # Pie chart - Platform
     with col2:
         st.markdown("#### Theo Nền Tảng")
-        platform_data = get_revenue_by_platform(start_str, end_str, filter_sql, engine)
         if not platform_data.empty:
             render_pie_chart(platform_data, label_col="PlatformName", value_col="Revenue")
         else:
             st.info("Không có dữ liệu")
     
     # --- SECTION 3: DETAILED TABLES ---
+    brand_data = data.get(get_revenue_by_brand, *dataset_args)
+    platform_data = data.get(get_revenue_by_platform, *dataset_args)
+    
     st.divider()
     st.subheader("📋 Chi Tiết Theo Nền Tảng")
     
@@ -132,7 +163,6 @@ def render_custom_report() -> None:
     
     # Brand table
     with col1:
-        brand_data = get_revenue_by_brand(start_str, end_str, filter_sql, engine)
         if not brand_data.empty:
             st.markdown("#### Doanh Số Theo Brand")
             display_data = brand_data[["Brand", "Revenue", "Orders", "RevenuePercent"]].copy()
@@ -153,7 +183,6 @@ def render_custom_report() -> None:
     
     # Platform table
     with col2:
-        platform_data = get_revenue_by_platform(start_str, end_str, filter_sql, engine)
         if not platform_data.empty:
             st.markdown("#### Doanh Số Theo Nền Tảng")
             display_data = platform_data[["PlatformName", "Revenue", "Orders", "RevenuePercent"]].copy()
@@ -171,5 +200,60 @@ def render_custom_report() -> None:
             st.markdown(f"**Grand total: {total:,.0f}**")
         else:
             st.info("Không có dữ liệu")
+
+
+def _render_export_section(engine: Engine, start_str: str, end_str: str, filter_spec: FilterSpec) -> None:
+    """
+    Render the row export: format picker, start button and the status or
+    download of this session's latest export.
     
-    logger.info("Custom Report page rendered successfully")
+    Args:
+        engine: SQLAlchemy Engine
+        start_str: Range start (YYYY-MM-DD HH:MM:SS)
+        end_str: Range end (YYYY-MM-DD HH:MM:SS)
+        filter_spec: FilterSpec of the current selection
+    """
+    st.divider()
+    st.subheader("📤 Xuất Dữ Liệu Chi Tiết")
+    st.caption(
+        "Xuất từng dòng đơn hàng theo khoảng thời gian và bộ lọc đang chọn. "
+        "File được tạo ở nền, không làm chậm các phiên khác."
+    )
+    manager = get_export_manager()
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox(
+            "Định dạng",
+            options=list(config.EXPORT_FORMATS),
+            format_func=config.EXPORT_FORMATS.get,
+            key="export_format",
+        )
+        if st.button("Tạo file xuất", key="export_start"):
+            job = manager.submit(engine, start_str, end_str, filter_spec, fmt)
+            st.session_state[EXPORT_JOB_KEY] = job.id
+    
+    with col2:
+        job = manager.get(st.session_state.get(EXPORT_JOB_KEY))
+        if job is None:
+            return
+        if job.status in ("queued", "running"):
+            st.info(f"⏳ Đang xuất {job.export_name}: {job.rows:,} dòng...")
+            # Any rerun shows the latest progress
+            st.button("Cập nhật tiến độ", key="export_refresh")
+        elif job.status == "error":
+            st.error(f"Xuất dữ liệu thất bại: {job.error}")
+        elif not os.path.exists(job.path):
+            st.warning("File xuất đã hết hạn, vui lòng tạo lại.")
+        else:
+            if job.zipped:
+                st.caption(f"File CSV lớn được nén ZIP: giải nén để mở {job.export_name}.")
+            # The button holds the whole file in memory (zipping keeps large CSVs small)
+            with open(job.path, "rb") as f:
+                st.download_button(
+                    f"⬇️ Tải {job.file_name} ({job.rows:,} dòng, {job.size / 1024 / 1024:,.1f} MB)",
+                    data=f,
+                    file_name=job.file_name,
+                    mime=job.mime,
+                    key=f"export_download_{job.id}",
+                )
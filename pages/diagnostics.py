@@ -0,0 +1,130 @@
+"""
+Diagnostics page - Query profiler (hidden, open with ?diagnostics=1)
+"""
+
+from typing import Any, Dict
+
+import pandas as pd
+import streamlit as st
+
+import config
+from src.db.admission import get_admission_controller
+from src.db.connection import get_engine
+from src.db.pool_monitor import get_pool_metrics
+from src.db.replicas import get_replica_router
+from src.logger import get_logger
+from src.services.profiler import EXPLAIN_KEY, get_history
+from src.services.result_cache import get_result_cache
+from ui.charts import render_waterfall_chart
+
+logger = get_logger(__name__)
+
+
+def _render_stats(stats: Dict[str, Any]) -> None:
+    """Render a metric name -> value dict as a two-column table."""
+    st.dataframe(
+        pd.DataFrame([{"metric": name, "value": value} for name, value in stats.items()]),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def render_diagnostics() -> None:
+    """Render query waterfall of a recent render, session history, cache and pool stats."""
+    st.title("🩺 Diagnostics")
+    
+    # Stored under a non-widget key so the setting survives visits to other pages
+    st.session_state[EXPLAIN_KEY] = st.checkbox(
+        "Chạy EXPLAIN cho các truy vấn không trúng cache (các lần render sau)",
+        value=st.session_state.get(EXPLAIN_KEY, False),
+    )
+    
+    history = get_history()
+    if not history:
+        st.info("Chưa có lần render nào được ghi lại. Mở một trang dữ liệu rồi quay lại đây.")
+        return
+    
+    # --- WATERFALL OF ONE RENDER (latest by default) ---
+    st.divider()
+    options = list(range(len(history) - 1, -1, -1))
+    selected = st.selectbox(
+        "Lần render",
+        options=options,
+        format_func=lambda i: (
+            f"{history[i].started_at:%H:%M:%S} · {history[i].page} · "
+            f"{history[i].total_ms:,.0f} ms · {len(history[i].records)} truy vấn"
+        ),
+    )
+    profile = history[selected]
+    records = profile.to_frame()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    summary = profile.summary()
+    col1.metric("Tổng thời gian render", f"{summary['total_ms']:,.0f} ms")
+    col2.metric("Truy vấn", summary["queries"])
+    col3.metric("Trúng cache", summary["cache_hits"])
+    col4.metric("Thời gian DB", f"{summary['db_ms']:,.0f} ms")
+    
+    render_waterfall_chart(records)
+    
+    table = records.copy()
+    table["kb"] = (table["nbytes"] / 1024).round(1)
+    st.dataframe(
+        table[["query_id", "cache", "start_ms", "wall_ms", "server_ms", "rows", "kb", "thread"]].round(1),
+        use_container_width=True,
+        hide_index=True,
+    )
+    
+    for record in profile.records:
+        if record.explain:
+            with st.expander(f"EXPLAIN · {record.query_id}"):
+                st.dataframe(pd.DataFrame(record.explain), use_container_width=True, hide_index=True)
+    
+    # --- SESSION HISTORY ---
+    st.divider()
+    st.subheader("Lịch sử phiên")
+    st.dataframe(
+        pd.DataFrame([p.summary() for p in reversed(history)]),
+        use_container_width=True,
+        hide_index=True,
+    )
+    
+    # --- RESULT CACHE ---
+    st.divider()
+    st.subheader("Result cache")
+    cache = get_result_cache()
+    _render_stats(cache.stats())
+    entries = cache.entries()
+    if not entries.empty:
+        st.caption(
+            f"Bộ nhớ theo entry (Arrow IPC, nén {config.RESULT_CACHE_COMPRESSION}): "
+            f"stored = bytes giữ trong RAM, frame = DataFrame sau khi giải mã"
+        )
+        entries["stored_kb"] = (entries["stored_bytes"] / 1024).round(1)
+        entries["frame_kb"] = (entries["frame_bytes"] / 1024).round(1)
+        st.dataframe(
+            entries[["label", "key", "format", "rows", "stored_kb", "frame_kb", "age_s", "stale"]],
+            use_container_width=True,
+            hide_index=True,
+        )
+    
+    # --- CONNECTION POOL ---
+    st.divider()
+    st.subheader("Connection pool")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.caption("Pool (checkout latency, in use, overflow, invalidations)")
+        _render_stats(get_pool_metrics(get_engine()))
+    with col2:
+        st.caption("Admission control (queued queries by priority)")
+        _render_stats(get_admission_controller().stats())
+    
+    # --- READ REPLICAS ---
+    engine = get_engine()
+    router = get_replica_router(engine) if engine is not None else None
+    if router is not None:
+        st.divider()
+        st.subheader(f"Read replicas ({router.strategy})")
+        st.dataframe(pd.DataFrame(router.stats()), use_container_width=True, hide_index=True)
+    
+    logger.info("Diagnostics page rendered successfully")
@@ -2,21 +2,26 @@
 Overview page - Main B2C Revenue & Orders Dashboard
 """
 
+import pandas as pd
 import streamlit as st
 from datetime import datetime
+from typing import Dict, Optional
 
 import config
 from src.db.connection import get_engine
 from src.logger import get_logger
 from src.services.data_service import (
+    fetch_many,
     get_filter_options_dict,
+    get_overview_bundle,
     get_kpi_data,
     get_trend_data,
     get_status_summary,
     get_province_data,
 )
-from src.utils.sql_helpers import build_filters
-from src.utils.date_helpers import get_previous_period
+from src.utils.sql_helpers import FilterSpec, build_filters
+from src.utils.date_helpers import get_comparison_period
+from src.utils.time_buckets import plan_buckets
 from ui.filters import render_filter_section
 from ui.kpi_cards import render_kpi_section
 from ui.charts import render_hourly_trend_chart
@@ -37,61 +42,95 @@ def render_overview() -> None:
     # Load filter options
     filter_opts = get_filter_options_dict(engine)
     
-    # Prepare shop options with counts
-    shop_with_counts = {shop: 0 for shop in filter_opts["shop"]}
-    
-    # Render filter section
+    # Render filter section (options with order counts from the dimension catalog)
     filters = render_filter_section(
         engine,
-        brand_options=filter_opts["brand"],
-        platform_options=filter_opts["platform"],
-        shop_options=shop_with_counts,
-        status_options=filter_opts["status"],
+        brand_options=filter_opts["counts"]["brand"],
+        platform_options=filter_opts["counts"]["platform"],
+        shop_options=filter_opts["counts"]["shop"],
+        status_options=filter_opts["counts"]["status"],
     )
     
     # Extract filters and dates
     start_date, end_date = filters["date_range"]
     start_str, end_str = filters["date_str"]
     
-    # Calculate previous period for comparison
-    p_start, p_end = get_previous_period(start_date, end_date)
+    col_compare, col_grain = st.columns(2)
+    
+    # Comparison period (previous period, WoW, MoM or YoY)
+    with col_compare:
+        comparison_mode = st.selectbox(
+            "So sánh với",
+            options=list(config.COMPARISON_MODES),
+            index=list(config.COMPARISON_MODES).index(config.DEFAULT_COMPARISON_MODE),
+            format_func=lambda mode: config.COMPARISON_MODES[mode].capitalize(),
+            key="comparison_mode",
+        )
+    
+    # Trend buckets: automatic grain from the range length, or an override
+    with col_grain:
+        trend_grain = st.selectbox(
+            "Biểu đồ theo",
+            options=[None, *config.TREND_GRAINS],
+            format_func=lambda grain: "Tự động" if grain is None else config.TREND_GRAINS[grain],
+            key="trend_grain",
+        )
+    trend_plan = plan_buckets(start_str, end_str, trend_grain)
+    p_start, p_end = get_comparison_period(start_date, end_date, comparison_mode)
     p_start_str = p_start.strftime("%Y-%m-%d 00:00:00")
     p_end_str = p_end.strftime("%Y-%m-%d 23:59:59")
     
-    # Build SQL filters
-    filter_sql = build_filters(
+    # Build filter spec (bound parameters; fields with every value ticked are not filtered)
+    filter_spec = build_filters(
         filters["brand"],
         filters["platform"],
         filters["shop"],
         filters["status"],
+        domains=filter_opts["domains"],
     )
     
-    # --- FETCH KPI DATA ---
-    kpi_df = get_kpi_data(
-        start_str, end_str,
-        p_start_str, p_end_str,
-        filter_sql,
-        engine,
-    )
+    # --- FETCH ALL DATASETS ---
+    data = None
+    if config.OVERVIEW_BUNDLE_MODE:
+        # One scan of the fact table, aggregates derived in pandas
+        data = get_overview_bundle(
+            start_str, end_str,
+            p_start_str, p_end_str,
+            filter_spec,
+            engine,
+            trend_grain=trend_grain,
+        )
+    if data is None and config.ASYNC_DATA_ENABLED:
+        # Four independent queries awaited together on the async engine
+        data = _fetch_overview_async(
+            start_str, end_str, p_start_str, p_end_str, filter_spec, trend_grain
+        )
+    if data is None:
+        # Four independent queries, run in parallel
+        data = fetch_many({
+            "kpi": (get_kpi_data, (start_str, end_str, p_start_str, p_end_str, filter_spec, engine)),
+            "trend": (get_trend_data, (start_str, end_str, filter_spec, engine, trend_grain)),
+            "status": (get_status_summary, (start_str, end_str, filter_spec, engine)),
+            "province": (get_province_data, (start_str, end_str, filter_spec, engine)),
+        })
     
     # --- RENDER KPI SECTION ---
-    render_kpi_section(kpi_df)
+    render_kpi_section(data["kpi"], config.COMPARISON_MODES[comparison_mode])
     
     # --- RENDER 3 CHARTS IN ONE ROW ---
     st.divider()
     st.subheader(config.DASHBOARD_SUBTITLE)
     
-    # Fetch data for all 3 visualizations
-    trend_df = get_trend_data(start_str, end_str, filter_sql, engine)
-    status_df = get_status_summary(start_str, end_str, filter_sql, engine)
-    province_df = get_province_data(start_str, end_str, filter_sql, engine)
+    trend_df = data["trend"]
+    status_df = data["status"]
+    province_df = data["province"]
     
     # Create 3 equal columns
     col1, col2, col3 = st.columns(3)
     
     # Trend chart (left)
     with col1:
-        render_hourly_trend_chart(trend_df)
+        render_hourly_trend_chart(trend_df, trend_plan.label)
     
     # Status table (middle)
     with col2:
@@ -102,3 +141,48 @@ def render_overview() -> None:
         render_province_table(province_df)
     
     logger.info("Overview page rendered successfully")
+
+
+def _fetch_overview_async(
+    start_str: str,
+    end_str: str,
+    p_start_str: str,
+    p_end_str: str,
+    filter_spec: FilterSpec,
+    trend_grain: Optional[str] = None,
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Fetch the four Overview datasets concurrently on the async engine.
+    
+    Args:
+        start_str: Current period start
+        end_str: Current period end
+        p_start_str: Comparison period start
+        p_end_str: Comparison period end
+        filter_spec: FilterSpec from build_filters
+        trend_grain: Trend bucket grain override
+        
+    Returns:
+        Dictionary with "kpi", "trend", "status" and "province" DataFrames,
+        or None if the async engine is unavailable
+    """
+    # Optional dependency (aiomysql): only imported when the async path is enabled
+    from src.db.async_connection import get_async_runner
+    from src.services.async_data_service import (
+        gather_datasets,
+        get_kpi_data_async,
+        get_trend_data_async,
+        get_status_summary_async,
+        get_province_data_async,
+    )
+    
+    runner = get_async_runner()
+    if runner is None:
+        return None
+    engine = runner.engine
+    return runner.run(gather_datasets({
+        "kpi": get_kpi_data_async(start_str, end_str, p_start_str, p_end_str, filter_spec, engine),
+        "trend": get_trend_data_async(start_str, end_str, filter_spec, engine, trend_grain),
+        "status": get_status_summary_async(start_str, end_str, filter_spec, engine),
+        "province": get_province_data_async(start_str, end_str, filter_spec, engine),
+    }), timeout=config.ASYNC_QUERY_TIMEOUT)
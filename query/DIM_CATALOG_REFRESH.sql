@@ -0,0 +1,22 @@
+/* Cập nhật danh mục dimension từ các dòng mới (watermark, upper]. Python điền {dimension}, {column}, {id_column}. */
+INSERT INTO dim_catalog (Dimension, Value, ValueId, Orders, FirstSeen, LastSeen)
+SELECT
+    '{dimension}' AS Dimension,
+    {column} AS Value,
+    MAX({id_column}) AS ValueId,
+    COUNT(DISTINCT OmisellOrderNumber) AS Orders,
+    MIN(CreatedTime) AS FirstSeen,
+    MAX(CreatedTime) AS LastSeen
+FROM
+    omisell_catalogue
+WHERE
+    CreatedTime > %s AND CreatedTime <= %s
+    AND {column} IS NOT NULL
+    AND {column} <> ''
+GROUP BY
+    {column}
+ON DUPLICATE KEY UPDATE
+    Orders = Orders + VALUES(Orders),
+    ValueId = COALESCE(VALUES(ValueId), ValueId),
+    FirstSeen = LEAST(FirstSeen, VALUES(FirstSeen)),
+    LastSeen = GREATEST(LastSeen, VALUES(LastSeen));
@@ -35,13 +35,13 @@ FROM (
 /* Kỳ Hiện Tại */
 SUM(
     CASE
-        WHEN CreatedTime BETWEEN % s AND %  s THEN Revenue
+        WHEN CreatedTime BETWEEN %s AND %s THEN Revenue
         ELSE 0
     END
 ) as CurrRevenue,
 COUNT(
     DISTINCT CASE
-        WHEN CreatedTime BETWEEN % s AND %  s THEN OmisellOrderNumber
+        WHEN CreatedTime BETWEEN %s AND %s THEN OmisellOrderNumber
     END
 ) as CurrOrders,
 
@@ -0,0 +1,7 @@
+SELECT
+    Value,
+    Orders
+FROM dim_catalog
+WHERE
+    Dimension = %s
+ORDER BY Value ASC;
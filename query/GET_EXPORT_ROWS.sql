@@ -0,0 +1,22 @@
+SELECT
+    OmisellOrderNumber,
+    CreatedTime,
+    brand,
+    PlatformName,
+    ShopName,
+    StatusName,
+    Province,
+    OriginalPrice,
+    DiscountSeller,
+    VoucherSeller,
+    Quantity,
+    /* Doanh thu từng dòng, cùng công thức với GET_ORDER_REVENUE_AOV */
+    (OriginalPrice - DiscountSeller - VoucherSeller) * Quantity AS LineRevenue
+FROM
+    omisell_catalogue
+WHERE
+    CreatedTime BETWEEN %s AND %s
+    {filters}
+/* Đọc theo thứ tự thời gian (stream từng chunk ra file xuất) */
+ORDER BY
+    CreatedTime;
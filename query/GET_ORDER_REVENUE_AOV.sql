@@ -53,7 +53,7 @@ FROM (
 /* Param 3, 4: Số đơn hiện tại */
 COUNT(
     DISTINCT CASE
-        WHEN CreatedTime BETWEEN % s AND %  s THEN OmisellOrderNumber
+        WHEN CreatedTime BETWEEN %s AND %s THEN OmisellOrderNumber
     END
 ) AS CurrOrders,
 
@@ -61,7 +61,7 @@ COUNT(
 /* Param 5, 6: Doanh thu kỳ trước */
 SUM(
     CASE
-        WHEN CreatedTime BETWEEN % s AND %  s THEN (
+        WHEN CreatedTime BETWEEN %s AND %s THEN (
             OriginalPrice - DiscountSeller - VoucherSeller
         ) * Quantity
         ELSE 0
@@ -0,0 +1,12 @@
+SELECT 
+    StatusName,
+    SUM(Orders) as Orders
+FROM 
+    {table}
+WHERE 
+    HourStart BETWEEN %s AND %s
+    {filters}
+GROUP BY 
+    StatusName
+ORDER BY 
+    Orders DESC;
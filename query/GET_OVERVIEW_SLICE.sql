@@ -0,0 +1,13 @@
+SELECT
+    OmisellOrderNumber,
+    CreatedTime,
+    StatusName,
+    Province,
+    /* Doanh thu từng dòng, cùng công thức với GET_ORDER_REVENUE_AOV / get_Hourly_Trend */
+    (OriginalPrice - DiscountSeller - VoucherSeller) * Quantity AS LineRevenue
+FROM
+    omisell_catalogue
+WHERE
+    /* Range tổng: StartPrev -> EndCurr */
+    CreatedTime BETWEEN %s AND %s
+    {filters};
@@ -0,0 +1,9 @@
+/* Tổng doanh thu và số đơn của MỘT kỳ (mỗi kỳ so sánh là một range scan riêng) */
+SELECT 
+    SUM((OriginalPrice - DiscountSeller - VoucherSeller) * Quantity) as Revenue,
+    COUNT(DISTINCT OmisellOrderNumber) as Orders
+FROM 
+    omisell_catalogue
+WHERE 
+    CreatedTime BETWEEN %s AND %s
+    {filters};
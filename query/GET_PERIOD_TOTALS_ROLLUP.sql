@@ -0,0 +1,9 @@
+/* Giống GET_PERIOD_TOTALS.sql nhưng đọc từ bảng rollup theo giờ (mỗi đơn nằm trong đúng 1 giờ nên cộng được) */
+SELECT 
+    SUM(Revenue) as Revenue,
+    SUM(Orders) as Orders
+FROM 
+    {table}
+WHERE 
+    HourStart BETWEEN %s AND %s
+    {filters};
@@ -0,0 +1,43 @@
+-- Ranked breakdown: one page of the top groups of a breakdown query, the
+-- total number of groups and an "Others" row summing every group after the page.
+-- The breakdown CTE is a registry query inlined by QueryRegistry.compile_ranked.
+-- Keyset paging: first_page = 1 for the first page; otherwise pass the last
+-- row's (rank value, group) as after_value / after_key. The group may be NULL
+-- (LEFT JOINed dimensions): NULL groups rank after the named ones of equal value.
+WITH breakdown AS (
+{breakdown}
+),
+ranked AS (
+    SELECT
+        breakdown.*,
+        ROW_NUMBER() OVER (ORDER BY {order_column} DESC, {column} IS NULL, {column}) AS GroupRank,
+        COUNT(*) OVER () AS TotalGroups
+    FROM breakdown
+),
+page AS (
+    SELECT *
+    FROM ranked
+    WHERE %s
+        OR {order_column} < %s
+        OR (
+            {order_column} = %s
+            AND %s IS NOT NULL
+            AND ({column} > %s OR {column} IS NULL)
+        )
+    ORDER BY GroupRank
+    LIMIT %s
+)
+SELECT *
+FROM (
+    SELECT * FROM page
+    UNION ALL
+    SELECT
+        %s AS {column},
+        {measure_sums},
+        NULL AS GroupRank,
+        MAX(TotalGroups) AS TotalGroups
+    FROM ranked
+    WHERE GroupRank > (SELECT MAX(GroupRank) FROM page)
+    HAVING COUNT(*) > 0
+) AS result
+ORDER BY GroupRank IS NULL, GroupRank
@@ -0,0 +1,10 @@
+-- GET Revenue by Brand and Platform (from hourly order rollup)
+SELECT 
+    brand,
+    PlatformName,
+    SUM(Revenue) as Revenue,
+    SUM(Orders) as Orders
+FROM {table}
+WHERE HourStart BETWEEN %s AND %s
+GROUP BY brand, PlatformName
+ORDER BY Revenue DESC
@@ -1,9 +1,9 @@
--- GET Revenue proportion by Brand
+-- GET Revenue by Brand
+-- RevenuePercent is added in Python (metrics.with_share)
 SELECT 
     b.brand as Brand,
     SUM(o.Revenue) as Revenue,
-    COUNT(DISTINCT o.OmisellOrderNumber) as Orders,
-    ROUND((SUM(o.Revenue) / (SELECT SUM(Revenue) FROM omisell_db.omisell_order WHERE CreatedTime BETWEEN %s AND %s)) * 100, 1) as RevenuePercent
+    COUNT(DISTINCT o.OmisellOrderNumber) as Orders
 FROM omisell_db.omisell_order o
 LEFT JOIN omisell_db.omisell_brand b ON o.BrandID = b.BrandID
 WHERE o.CreatedTime BETWEEN %s AND %s
@@ -0,0 +1,10 @@
+-- GET Revenue by Brand (from hourly order rollup)
+-- RevenuePercent is added in Python (metrics.with_share)
+SELECT 
+    brand as Brand,
+    SUM(Revenue) as Revenue,
+    SUM(Orders) as Orders
+FROM {table}
+WHERE HourStart BETWEEN %s AND %s
+GROUP BY brand
+ORDER BY Revenue DESC
@@ -0,0 +1,10 @@
+-- GET Revenue by Platform (from hourly order rollup)
+-- RevenuePercent is added in Python (metrics.with_share)
+SELECT 
+    PlatformName as PlatformName,
+    SUM(Revenue) as Revenue,
+    SUM(Orders) as Orders
+FROM {table}
+WHERE HourStart BETWEEN %s AND %s
+GROUP BY PlatformName
+ORDER BY Revenue DESC
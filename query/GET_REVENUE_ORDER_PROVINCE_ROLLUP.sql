@@ -0,0 +1,14 @@
+SELECT 
+    Province,
+    SUM(Orders) as Orders
+FROM 
+    {table}
+WHERE 
+    HourStart BETWEEN %s AND %s
+    AND Province IS NOT NULL 
+    AND Province <> ''
+    {filters}
+GROUP BY 
+    Province
+ORDER BY 
+    Orders DESC;
@@ -0,0 +1,32 @@
+-- Revenue / orders per time bucket of the selected range, empty buckets included.
+-- Bucket n covers [start + n * step units, start + (n + 1) * step units); see
+-- src/utils/time_buckets.py. The range predicate is on the bare CreatedTime
+-- column, so the index range scan is kept; buckets are computed after it.
+WITH RECURSIVE buckets (BucketNo) AS (
+    SELECT 0
+    UNION ALL
+    SELECT BucketNo + 1 FROM buckets WHERE BucketNo + 1 < %s
+),
+totals AS (
+    SELECT 
+        FLOOR(TIMESTAMPDIFF({unit}, %s, CreatedTime) / %s) as BucketNo,
+        COUNT(DISTINCT OmisellOrderNumber) as Orders,
+        /* Tính doanh thu trực tiếp từ các cột có trong View */
+        SUM((OriginalPrice - DiscountSeller - VoucherSeller) * Quantity) as Revenue
+    FROM 
+        omisell_catalogue
+    WHERE 
+        CreatedTime BETWEEN %s AND %s
+        {filters}
+    GROUP BY 
+        BucketNo
+)
+SELECT 
+    TIMESTAMPADD({unit}, buckets.BucketNo * %s, %s) as BucketStart,
+    COALESCE(totals.Orders, 0) as Orders,
+    COALESCE(totals.Revenue, 0) as Revenue
+FROM 
+    buckets
+    LEFT JOIN totals ON totals.BucketNo = buckets.BucketNo
+ORDER BY 
+    buckets.BucketNo ASC;
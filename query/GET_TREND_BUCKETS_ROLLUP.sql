@@ -0,0 +1,28 @@
+-- Time buckets from an hourly rollup (hour grain and coarser only)
+WITH RECURSIVE buckets (BucketNo) AS (
+    SELECT 0
+    UNION ALL
+    SELECT BucketNo + 1 FROM buckets WHERE BucketNo + 1 < %s
+),
+totals AS (
+    SELECT 
+        FLOOR(TIMESTAMPDIFF({unit}, %s, HourStart) / %s) as BucketNo,
+        SUM(Orders) as Orders,
+        SUM(Revenue) as Revenue
+    FROM 
+        {table}
+    WHERE 
+        HourStart BETWEEN %s AND %s
+        {filters}
+    GROUP BY 
+        BucketNo
+)
+SELECT 
+    TIMESTAMPADD({unit}, buckets.BucketNo * %s, %s) as BucketStart,
+    COALESCE(totals.Orders, 0) as Orders,
+    COALESCE(totals.Revenue, 0) as Revenue
+FROM 
+    buckets
+    LEFT JOIN totals ON totals.BucketNo = buckets.BucketNo
+ORDER BY 
+    buckets.BucketNo ASC;
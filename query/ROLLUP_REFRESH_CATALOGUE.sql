@@ -0,0 +1,15 @@
+/* Rollup theo giờ từ omisell_catalogue. Python điền {table} và {dimensions}. */
+INSERT INTO {table} (HourStart, {dimensions}, Revenue, Quantity, Orders)
+SELECT
+    DATE_ADD(DATE(CreatedTime), INTERVAL HOUR(CreatedTime) HOUR) AS HourStart,
+    {dimensions},
+    SUM((OriginalPrice - DiscountSeller - VoucherSeller) * Quantity) AS Revenue,
+    SUM(Quantity) AS Quantity,
+    COUNT(DISTINCT OmisellOrderNumber) AS Orders
+FROM
+    omisell_catalogue
+WHERE
+    /* Cửa sổ refresh [from, to) */
+    CreatedTime >= %s AND CreatedTime < %s
+GROUP BY
+    HourStart, {dimensions};
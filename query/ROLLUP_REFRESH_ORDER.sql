@@ -0,0 +1,22 @@
+/* Rollup theo giờ từ omisell_order (cùng join với GET_REVENUE_BY_BRAND / PLATFORM). */
+INSERT INTO {table} (HourStart, {dimensions}, Revenue, Orders)
+SELECT
+    src.HourStart,
+    {dimensions},
+    SUM(src.Revenue) AS Revenue,
+    COUNT(DISTINCT src.OmisellOrderNumber) AS Orders
+FROM (
+    SELECT
+        DATE_ADD(DATE(o.CreatedTime), INTERVAL HOUR(o.CreatedTime) HOUR) AS HourStart,
+        b.brand,
+        p.PlatformName,
+        o.Revenue,
+        o.OmisellOrderNumber
+    FROM omisell_db.omisell_order o
+    LEFT JOIN omisell_db.omisell_brand b ON o.BrandID = b.BrandID
+    LEFT JOIN omisell_db.omisell_platform p ON o.PlatformID = p.PlatformID
+    /* Cửa sổ refresh [from, to) */
+    WHERE o.CreatedTime >= %s AND o.CreatedTime < %s
+) AS src
+GROUP BY
+    src.HourStart, {dimensions};
@@ -0,0 +1,21 @@
+SELECT
+    OmisellOrderNumber,
+    CreatedTime,
+    brand,
+    PlatformName,
+    ShopName,
+    StatusName,
+    Province,
+    OriginalPrice,
+    DiscountSeller,
+    VoucherSeller,
+    Quantity,
+    Revenue
+FROM
+    omisell_catalogue
+WHERE
+    /* Cửa sổ đồng bộ: từ đầu ngày đến cuối ngày (ghi đè nguyên partition) */
+    CreatedTime BETWEEN %s AND %s
+/* Đọc theo thứ tự thời gian để ghi từng partition ngày khi stream */
+ORDER BY
+    CreatedTime;
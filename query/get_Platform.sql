@@ -2,5 +2,5 @@ SELECT DISTINCT
     `PlatformName`
 from omisell_catalogue
 WHERE
-    CreatedTime BETWEEN % s AND %  s
+    CreatedTime BETWEEN %s AND %s
 ORDER BY PlatformName ASC;
\ No newline at end of file
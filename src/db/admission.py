@@ -0,0 +1,221 @@
+"""
+Admission control module.
+Limits how many dataset queries run against the sync engine at once, so a
+burst queues in the app (highest priority first) instead of piling up in the
+connection pool until pool_timeout fails the slowest requests.
+
+- priorities: interactive (page renders) > warmer (cache warmer, background
+  revalidation) > export; the caller's priority is a contextvar, so it
+  follows the query into DataContext worker threads
+- each priority below interactive may hold only a share of the slots
+  (ADMISSION_PRIORITY_SHARES), so background work never starves a page
+- the limit adapts (AIMD): it grows by one slot per limit's worth of fast
+  queries and shrinks by ADMISSION_DECREASE_FACTOR when the query latency
+  average exceeds ADMISSION_TARGET_LATENCY_MS or a query fails, between
+  ADMISSION_MIN_CONCURRENCY and ADMISSION_MAX_CONCURRENCY
+- a query waiting longer than ADMISSION_QUEUE_TIMEOUT raises AdmissionTimeout
+  (fetch_data then returns an empty frame, as for any query error)
+- export slots are held for a whole streamed export, so their duration does
+  not feed the latency average
+    
+    with query_priority(EXPORT):
+        with get_admission_controller().admit():
+            ...
+"""
+
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+
+import config
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+INTERACTIVE = "interactive"
+WARMER = "warmer"
+EXPORT = "export"
+# Priority -> rank, lower is served first
+PRIORITIES: Dict[str, int] = {INTERACTIVE: 0, WARMER: 1, EXPORT: 2}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("query_priority", default=INTERACTIVE)
+
+
+class AdmissionTimeout(Exception):
+    """A query waited longer than the queue timeout for a slot."""
+
+
+@contextmanager
+def query_priority(priority: str) -> Iterator[None]:
+    """
+    Run the queries of a block at the given priority.
+    
+    Args:
+        priority: INTERACTIVE, WARMER or EXPORT
+    
+    Raises:
+        ValueError: If priority is unknown
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown query priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    """Priority of the queries of the current context."""
+    return _priority.get()
+
+
+class AdmissionController:
+    """Priority queue in front of the pool with an adaptive concurrency limit."""
+    
+    def __init__(
+        self,
+        max_concurrency: int = config.ADMISSION_MAX_CONCURRENCY,
+        min_concurrency: int = config.ADMISSION_MIN_CONCURRENCY,
+        target_latency_ms: float = config.ADMISSION_TARGET_LATENCY_MS,
+        queue_timeout: float = config.ADMISSION_QUEUE_TIMEOUT,
+        shares: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Upper bound of the limit (keep below pool size + overflow)
+            min_concurrency: Lower bound of the limit
+            target_latency_ms: Query latency average above which the limit shrinks
+            queue_timeout: Seconds a query may wait for a slot
+            shares: Priority -> fraction of the limit it may hold (interactive: 1)
+        """
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.target_latency = target_latency_ms / 1000
+        self.queue_timeout = queue_timeout
+        self.shares = dict(config.ADMISSION_PRIORITY_SHARES if shares is None else shares)
+        self.limit = float(max_concurrency)
+        self.latency_avg = 0.0
+        self._active = {priority: 0 for priority in PRIORITIES}
+        self._waiting: List[Tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected": 0,
+            "wait_seconds": 0.0,
+        }
+    
+    def _slots(self, priority: str) -> int:
+        """Slots a priority may hold under the current limit."""
+        limit = int(self.limit)
+        share = self.shares.get(priority, 1.0)
+        return limit if share >= 1 else max(int(limit * share), 1)
+    
+    def _can_run(self, priority: str) -> bool:
+        return (
+            sum(self._active.values()) < int(self.limit)
+            and self._active[priority] < self._slots(priority)
+        )
+    
+    def _next_ticket(self) -> Optional[Tuple[int, int, str]]:
+        """Oldest waiting ticket of the best priority that has a free slot."""
+        return next((t for t in sorted(self._waiting) if self._can_run(t[2])), None)
+    
+    def _adapt(self, seconds: float, failed: bool) -> None:
+        """AIMD update of the limit after a query finished (lock held)."""
+        self.latency_avg = seconds if not self.latency_avg else 0.8 * self.latency_avg + 0.2 * seconds
+        if failed or self.latency_avg > self.target_latency:
+            self.limit = max(self.limit * config.ADMISSION_DECREASE_FACTOR, self.min_concurrency)
+        else:
+            self.limit = min(self.limit + 1 / self.limit, self.max_concurrency)
+    
+    @contextmanager
+    def admit(self, priority: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold a query slot for the block, waiting for one if needed.
+        
+        Args:
+            priority: Override of the context priority (current_priority())
+            timeout: Override of the queue timeout (seconds)
+        
+        Raises:
+            AdmissionTimeout: If no slot frees up within the queue timeout
+        """
+        priority = priority or current_priority()
+        timeout = self.queue_timeout if timeout is None else timeout
+        ticket = (PRIORITIES[priority], next(self._seq), priority)
+        started = time.monotonic()
+        deadline = started + timeout
+        
+        with self._cond:
+            self._waiting.append(ticket)
+            if self._next_ticket() != ticket:
+                self._counters["queued"] += 1
+            while self._next_ticket() != ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self._counters["rejected"] += 1
+                    self._cond.notify_all()
+                    raise AdmissionTimeout(
+                        f"No query slot within {timeout:g}s "
+                        f"({priority}, limit {int(self.limit)})"
+                    )
+                self._cond.wait(remaining)
+            self._waiting.remove(ticket)
+            self._active[priority] += 1
+            self._counters["admitted"] += 1
+            self._counters["wait_seconds"] += time.monotonic() - started
+            # Another waiter may fit in the slots left
+            self._cond.notify_all()
+        
+        query_started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            with self._cond:
+                self._active[priority] -= 1
+                if priority != EXPORT:
+                    self._adapt(time.monotonic() - query_started, failed)
+                self._cond.notify_all()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current limit, running and waiting queries and counters.
+        
+        Returns:
+            Dict of metric name -> value
+        """
+        with self._cond:
+            stats: Dict[str, Any] = {
+                "limit": round(self.limit, 1),
+                "latency_avg_ms": round(self.latency_avg * 1000, 1),
+            }
+            for priority in PRIORITIES:
+                stats[f"running_{priority}"] = self._active[priority]
+                stats[f"waiting_{priority}"] = sum(1 for t in self._waiting if t[2] == priority)
+            stats.update({
+                name: round(value, 1) if isinstance(value, float) else value
+                for name, value in self._counters.items()
+            })
+            return stats
+
+
+@st.cache_resource
+def get_admission_controller() -> AdmissionController:
+    """
+    Get or create the process-wide admission controller (sync engine queries).
+    
+    Returns:
+        AdmissionController instance
+    """
+    return AdmissionController()
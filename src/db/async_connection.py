@@ -0,0 +1,149 @@
+"""
+Async database connection module.
+Runs an aiomysql-backed SQLAlchemy AsyncEngine on a dedicated event loop
+thread, so synchronous callers (Streamlit pages, jobs) can run many queries
+concurrently without a thread per query.
+
+    runner = get_async_runner()
+    df = runner.run(fetch_data_async(query, runner.engine, params))
+
+The engine and its pool belong to the runner's loop; only use it from
+coroutines scheduled through the runner.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import streamlit as st
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import config
+from src.db.connection import build_connection_url
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def create_async_db_engine() -> AsyncEngine:
+    """
+    Create the aiomysql AsyncEngine with its own connection pool.
+    
+    Returns:
+        SQLAlchemy AsyncEngine (connections are opened lazily)
+    """
+    return create_async_engine(
+        build_connection_url("aiomysql"),
+        pool_size=config.ASYNC_DB_POOL_SIZE,
+        max_overflow=config.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        echo=False,
+    )
+
+
+class AsyncRunner:
+    """Background event loop thread owning an AsyncEngine."""
+    
+    def __init__(self, engine_factory: Callable[[], AsyncEngine] = create_async_db_engine):
+        """
+        Args:
+            engine_factory: Builds the AsyncEngine used by coroutines on this loop
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="async-data-loop", daemon=True
+        )
+        self._thread.start()
+        self.engine = engine_factory()
+    
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """
+        Schedule a coroutine on the loop without waiting for it.
+        The task runs in a copy of the caller's context, so contextvars such as
+        the active render profile follow the query onto the loop.
+        
+        Args:
+            coro: Coroutine to run
+        
+        Returns:
+            concurrent.futures.Future with the coroutine's result
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        context = contextvars.copy_context()
+        
+        def on_done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+        
+        def start() -> None:
+            # create_task copies the current context: create it inside the caller's
+            task = context.run(self.loop.create_task, coro)
+            task.add_done_callback(on_done)
+        
+        self.loop.call_soon_threadsafe(start)
+        return future
+    
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the loop and wait for its result.
+        
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (None = no limit)
+        
+        Returns:
+            The coroutine's result
+        
+        Raises:
+            concurrent.futures.TimeoutError: If the timeout expires
+            Exception: Whatever the coroutine raised
+        """
+        return self.submit(coro).result(timeout=timeout)
+    
+    def ping(self) -> None:
+        """Verify the async engine can reach the database (SELECT 1)."""
+        async def select_one() -> Any:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        
+        self.run(select_one(), timeout=config.DB_POOL_TIMEOUT)
+    
+    def close(self) -> None:
+        """Dispose of the engine's pool and stop the loop thread."""
+        try:
+            self.run(self.engine.dispose(), timeout=config.DB_POOL_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error closing async engine: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+@st.cache_resource
+def get_async_runner() -> Optional[AsyncRunner]:
+    """
+    Get or create the process-wide async runner (loop thread + AsyncEngine).
+    
+    Returns:
+        AsyncRunner instance or None if the async engine cannot connect
+    """
+    runner = None
+    try:
+        runner = AsyncRunner()
+        runner.ping()
+        logger.info("✓ Async database connection successful")
+        return runner
+    except Exception as e:
+        logger.error(f"✗ Async database connection failed: {e}")
+        if runner is not None:
+            runner.close()
+        return None
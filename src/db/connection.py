@@ -6,49 +6,114 @@ Handles SQLAlchemy engine creation and connection pooling.
 from sqlalchemy import create_engine, Engine, event, text
 from urllib.parse import quote_plus
 import streamlit as st
-from typing import Optional
+from typing import Optional, Tuple
 import config
+from src.db.pool_monitor import InstrumentedQueuePool, attach_pool_metrics
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-@st.cache_resource
-def get_engine() -> Optional[Engine]:
+def build_connection_url(
+    driver: str = "pymysql",
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+) -> str:
     """
-    Get or create SQLAlchemy engine with connection pooling.
+    Build the MySQL connection URL from config.
     
-    Returns:
-        SQLAlchemy Engine instance or None if connection fails
+    Args:
+        driver: SQLAlchemy MySQL driver ("pymysql", or "aiomysql" for the async engine)
+        host: Server host (default: config.DB_HOST, the primary)
+        port: Server port (default: config.DB_PORT)
         
-    Raises:
-        Exception: If connection string is invalid
+    Returns:
+        Connection URL string
     """
-    try:
-        # URL encode password to handle special characters like @
-        encoded_password = quote_plus(config.DB_PASSWORD)
+    # URL encode password to handle special characters like @
+    encoded_password = quote_plus(config.DB_PASSWORD)
+    return (
+        f"mysql+{driver}://{config.DB_USER}:{encoded_password}"
+        f"@{host or config.DB_HOST}:{port or config.DB_PORT}/{config.DB_NAME}"
+        f"?charset={config.DB_CHARSET}"
+    )
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, int]:
+    """
+    Split a "host:port" endpoint (config.DB_REPLICAS entry).
+    
+    Args:
+        endpoint: "host:port", or "host" for config.DB_PORT
         
-        # Build connection string
-        connection_string = (
-            f"mysql+pymysql://{config.DB_USER}:{encoded_password}"
-            f"@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}"
-            f"?charset={config.DB_CHARSET}"
-        )
+    Returns:
+        (host, port)
         
-        # Create engine with connection pooling
-        engine = create_engine(
-            connection_string,
-            pool_size=config.DB_POOL_SIZE,
-            max_overflow=config.DB_MAX_OVERFLOW,
-            pool_timeout=config.DB_POOL_TIMEOUT,
-            pool_recycle=config.DB_POOL_RECYCLE,
-            echo=False,  # Set to True for SQL debugging
-        )
+    Raises:
+        ValueError: If the port is not a number
+    """
+    host, _, port = endpoint.strip().rpartition(":")
+    if not host:
+        return port, config.DB_PORT
+    return host, int(port)
+
+
+def create_db_engine(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    verify: bool = True,
+) -> Engine:
+    """
+    Create SQLAlchemy engine with connection pooling and verify it with SELECT 1.
+    Streamlit-free, so background jobs (fact store sync etc.) can use it directly.
+    The pool pre-pings connections on checkout and records its metrics
+    (src/db/pool_monitor.py).
+    
+    Args:
+        host: Server host (default: the primary, config.DB_HOST)
+        port: Server port (default: config.DB_PORT)
+        verify: Run SELECT 1 before returning (replicas are checked by their router)
+    
+    Returns:
+        SQLAlchemy Engine instance
         
-        # Test connection
+    Raises:
+        Exception: If the connection string is invalid or the database is unreachable
+    """
+    # Build connection string
+    connection_string = build_connection_url(host=host, port=port)
+    
+    # Create engine with connection pooling
+    engine = create_engine(
+        connection_string,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        echo=False,  # Set to True for SQL debugging
+    )
+    attach_pool_metrics(engine)
+    
+    # Test connection
+    if verify:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
-            
+    
+    return engine
+
+
+@st.cache_resource
+def get_engine() -> Optional[Engine]:
+    """
+    Get or create SQLAlchemy engine with connection pooling.
+    
+    Returns:
+        SQLAlchemy Engine instance or None if connection fails
+    """
+    try:
+        engine = create_db_engine()
         logger.info("✓ Database connection successful")
         return engine
         
@@ -0,0 +1,205 @@
+"""
+Connection pool monitor module.
+Instruments the SQLAlchemy QueuePool of the sync engine:
+
+- checkout latency: time spent in pool.connect() (waiting for a free
+  connection, opening a new one, pre-ping), with p50 / p95 / max
+- in use / overflow: checked-out connections and overflow connections now,
+  plus their peaks
+- checkouts, pool timeouts, new connections and invalidations (dropped by
+  pre-ping, disconnect errors or pool_recycle)
+
+    engine = create_engine(url, poolclass=InstrumentedQueuePool, ...)
+    attach_pool_metrics(engine)
+    get_pool_metrics(engine).snapshot()
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import numpy as np
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Checkout latencies kept for the percentiles
+LATENCY_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Counters and recent checkout latencies of one connection pool."""
+    
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        """
+        Args:
+            samples: Checkout latencies kept for the percentiles
+        """
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self._latencies: Deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+    
+    def record_checkout(self, pool: QueuePool, seconds: float, timed_out: bool = False) -> None:
+        """
+        Record one pool.connect() call.
+        
+        Args:
+            pool: Pool the connection came from (current usage is read from it)
+            seconds: Time spent in pool.connect()
+            timed_out: True if it raised after pool_timeout
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+            self.peak_overflow = max(self.peak_overflow, pool.overflow())
+    
+    def record_connect(self) -> None:
+        """Count a new DBAPI connection."""
+        with self._lock:
+            self.connects += 1
+    
+    def record_invalidation(self) -> None:
+        """Count a connection dropped from the pool."""
+        with self._lock:
+            self.invalidations += 1
+    
+    def latency_ms(self, percentile: float) -> float:
+        """
+        Checkout latency percentile over the recent samples.
+        
+        Args:
+            percentile: 0-100
+        
+        Returns:
+            Milliseconds (0 without samples)
+        """
+        with self._lock:
+            samples = np.fromiter(self._latencies, dtype="float64")
+        if not len(samples):
+            return 0.0
+        return float(np.percentile(samples, percentile) * 1000)
+    
+    def snapshot(self, pool: Optional[QueuePool] = None) -> Dict[str, Any]:
+        """
+        Current counters, latencies and (with pool) usage.
+        
+        Args:
+            pool: Pool to read the current usage from
+        
+        Returns:
+            Dict of metric name -> value
+        """
+        stats: Dict[str, Any] = {}
+        if pool is not None:
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin(),
+            })
+        with self._lock:
+            stats.update({
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            })
+        stats.update({
+            "checkout_p50_ms": round(self.latency_ms(50), 1),
+            "checkout_p95_ms": round(self.latency_ms(95), 1),
+            "checkout_max_ms": round(self.latency_ms(100), 1),
+        })
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout into its PoolMetrics."""
+    
+    metrics: Optional[PoolMetrics] = None
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_checkout(self, time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(self, time.perf_counter() - started)
+        return connection
+    
+    def recreate(self) -> "InstrumentedQueuePool":
+        # engine.dispose() swaps in a recreated pool: keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def attach_pool_metrics(engine: Engine) -> PoolMetrics:
+    """
+    Start collecting pool metrics for an engine (idempotent).
+    The engine should be created with poolclass=InstrumentedQueuePool for
+    checkout latencies; connects and invalidations are counted for any pool.
+    
+    Args:
+        engine: SQLAlchemy Engine
+    
+    Returns:
+        The engine's PoolMetrics
+    """
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is not None:
+        return metrics
+    
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics
+    # Listeners on the engine follow the pool across engine.dispose()
+    event.listen(engine, "connect", lambda dbapi_conn, record: metrics.record_connect())
+    
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_conn, record, exception) -> None:
+        metrics.record_invalidation()
+        if exception is not None:
+            logger.warning(f"Pooled connection invalidated: {exception}")
+    
+    @event.listens_for(engine, "soft_invalidate")
+    def on_soft_invalidate(dbapi_conn, record, exception) -> None:
+        metrics.record_invalidation()
+    
+    return metrics
+
+
+def get_pool_metrics(engine: Optional[Engine]) -> Dict[str, Any]:
+    """
+    Pool metrics snapshot of an engine, for the diagnostics page.
+    
+    Args:
+        engine: SQLAlchemy Engine (None: not connected)
+    
+    Returns:
+        Dict of metric name -> value (empty if the engine is not instrumented)
+    """
+    if engine is None:
+        return {}
+    metrics = getattr(engine.pool, "metrics", None)
+    if metrics is None:
+        return {}
+    pool = engine.pool if isinstance(engine.pool, QueuePool) else None
+    return metrics.snapshot(pool)
@@ -0,0 +1,323 @@
+"""
+Read replica routing module.
+Sends dataset reads to the replicas in config.DB_REPLICAS, so dashboard scans
+do not compete with the order ingestion writes on the primary:
+
+- balancing: round robin over the usable replicas, or the one with the lowest
+  check latency (config.DB_REPLICA_STRATEGY)
+- lag: each replica is checked every DB_REPLICA_CHECK_INTERVAL seconds
+  (SHOW REPLICA STATUS); a replica more than DB_REPLICA_MAX_LAG_SECONDS behind,
+  with replication stopped, or unreachable is skipped
+- fallback: with no usable replica, or when the chosen one fails with a
+  connection error, the read runs on the primary; a failed replica is retried
+  after DB_REPLICA_RETRY_SECONDS
+
+A server that is not replicating (SHOW REPLICA STATUS returns no row: a
+misconfigured host, a replica after RESET REPLICA, a standalone server) is
+skipped; with DB_REPLICA_ALLOW_STANDALONE (local MySQL stand-ins loaded with a
+copy of the data) it counts as 0 seconds behind.
+
+    router = get_replica_router(engine)
+    df = router.run(lambda target: pd.read_sql(statement, target)) if router else ...
+"""
+
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import config
+from src.db.connection import create_db_engine, parse_endpoint
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+STRATEGIES = ("round_robin", "least_latency")
+# Errors after which a read is retried on the primary (the replica is unusable)
+FALLBACK_ERRORS = (OperationalError, PoolTimeoutError)
+
+
+class Replica:
+    """One replica endpoint with its engine and last check results."""
+    
+    def __init__(self, name: str, engine: Engine):
+        """
+        Args:
+            name: Endpoint ("host:port")
+            engine: SQLAlchemy Engine of the replica
+        """
+        self.name = name
+        self.engine = engine
+        self.lag: Optional[float] = None  # Seconds behind the primary (None: unknown)
+        self.latency: Optional[float] = None  # Check round trip average, seconds
+        self.error: Optional[str] = None
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.reads = 0
+        self.failures = 0
+        self._checking = threading.Lock()
+    
+    def usable(self, now: float) -> bool:
+        """Reachable and no further behind than DB_REPLICA_MAX_LAG_SECONDS."""
+        return (
+            now >= self.down_until
+            and self.lag is not None
+            and self.lag <= config.DB_REPLICA_MAX_LAG_SECONDS
+        )
+    
+    def mark_down(self, error: Exception) -> None:
+        """Skip the replica for DB_REPLICA_RETRY_SECONDS."""
+        self.failures += 1
+        self.error = str(error)
+        self.down_until = time.monotonic() + config.DB_REPLICA_RETRY_SECONDS
+        logger.warning(f"Replica {self.name} unavailable: {error}")
+    
+    def _read_lag(self) -> float:
+        """
+        Seconds behind the primary from SHOW REPLICA STATUS.
+        
+        Raises:
+            RuntimeError: If the server is not replicating (unless
+                DB_REPLICA_ALLOW_STANDALONE) or replication is stopped
+        """
+        with self.engine.connect() as conn:
+            try:
+                row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+            except ProgrammingError:
+                # MySQL before 8.0.22 / MariaDB
+                row = conn.execute(text("SHOW SLAVE STATUS")).mappings().first()
+        if row is None:
+            if config.DB_REPLICA_ALLOW_STANDALONE:
+                return 0.0
+            raise RuntimeError("not a replica (no SHOW REPLICA STATUS row)")
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        if lag is None:
+            raise RuntimeError("replication is not running")
+        return float(lag)
+    
+    def check(self, force: bool = False) -> None:
+        """
+        Refresh lag and latency when the last check is older than
+        DB_REPLICA_CHECK_INTERVAL (one caller checks, others keep the last result).
+        
+        Args:
+            force: Check now regardless of the interval
+        """
+        now = time.monotonic()
+        if not force and (now - self.checked_at < config.DB_REPLICA_CHECK_INTERVAL or now < self.down_until):
+            return
+        if not self._checking.acquire(blocking=False):
+            return
+        try:
+            started = time.perf_counter()
+            self.lag = self._read_lag()
+            elapsed = time.perf_counter() - started
+            self.latency = elapsed if self.latency is None else 0.7 * self.latency + 0.3 * elapsed
+            self.error = None
+            if self.lag > config.DB_REPLICA_MAX_LAG_SECONDS:
+                logger.warning(f"Replica {self.name} is {self.lag:.0f}s behind, reading from primary")
+        except Exception as e:
+            self.lag = None
+            self.mark_down(e)
+        finally:
+            self.checked_at = time.monotonic()
+            self._checking.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Row of the diagnostics table."""
+        return {
+            "endpoint": self.name,
+            "usable": self.usable(time.monotonic()),
+            "lag_s": self.lag,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "reads": self.reads,
+            "failures": self.failures,
+            "error": self.error or "",
+        }
+
+
+class ReplicaRouter:
+    """Chooses the engine of each read: a usable replica, else the primary."""
+    
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Replica],
+        strategy: str = config.DB_REPLICA_STRATEGY,
+    ):
+        """
+        Args:
+            primary: Engine of the primary (fallback)
+            replicas: Replica endpoints
+            strategy: "round_robin" or "least_latency"
+        
+        Raises:
+            ValueError: If strategy is unknown
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.primary_reads = 0
+        self.fallbacks = 0
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+    
+    def choose(self) -> Optional[Replica]:
+        """
+        Pick the replica for the next read.
+        
+        Returns:
+            A usable Replica, or None to read from the primary
+        """
+        for replica in self.replicas:
+            replica.check()
+        now = time.monotonic()
+        usable = [replica for replica in self.replicas if replica.usable(now)]
+        if not usable:
+            return None
+        if self.strategy == "least_latency":
+            return min(usable, key=lambda replica: replica.latency or 0.0)
+        return usable[next(self._turn) % len(usable)]
+    
+    def run(self, read: Callable[[Engine], T]) -> T:
+        """
+        Run a read on a replica, or on the primary when none is usable or the
+        replica fails with a connection error.
+        
+        Args:
+            read: Function running the query on the engine it is given
+        
+        Returns:
+            The result of read
+        """
+        replica = self.choose()
+        if replica is not None:
+            try:
+                result = read(replica.engine)
+                with self._lock:
+                    replica.reads += 1
+                return result
+            except FALLBACK_ERRORS as e:
+                replica.mark_down(e)
+            except DBAPIError as e:
+                if not e.connection_invalidated:
+                    raise
+                replica.mark_down(e)
+            with self._lock:
+                self.fallbacks += 1
+        
+        result = read(self.primary)
+        with self._lock:
+            self.primary_reads += 1
+        return result
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        One row per endpoint for the diagnostics page.
+        
+        Returns:
+            Replica rows followed by the primary (reads and fallbacks)
+        """
+        rows = [replica.stats() for replica in self.replicas]
+        rows.append({
+            "endpoint": "primary",
+            "usable": True,
+            "reads": self.primary_reads,
+            "failures": 0,
+            "error": f"{self.fallbacks} fallbacks from replicas",
+        })
+        return rows
+    
+    def dispose(self) -> None:
+        """Dispose of the replica pools (the primary belongs to its owner)."""
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+def create_replica_router(primary: Engine, endpoints: List[str] = config.DB_REPLICAS) -> Optional[ReplicaRouter]:
+    """
+    Build a router over replica endpoints and check each of them once.
+    Streamlit-free (jobs and scripts).
+    
+    Args:
+        primary: Engine of the primary
+        endpoints: "host:port" replica endpoints
+    
+    Returns:
+        ReplicaRouter, or None without endpoints
+    """
+    if not endpoints:
+        return None
+    replicas = []
+    for endpoint in endpoints:
+        host, port = parse_endpoint(endpoint)
+        replica = Replica(f"{host}:{port}", create_db_engine(host, port, verify=False))
+        replica.check(force=True)
+        replicas.append(replica)
+    return ReplicaRouter(primary, replicas)
+
+
+# Creates the per-engine routers one at a time (see get_replica_router)
+_router_lock = threading.Lock()
+
+
+def serves_primary(engine: Engine) -> bool:
+    """
+    True if an engine connects to the configured primary (config.DB_HOST,
+    DB_PORT, DB_NAME), the server config.DB_REPLICAS replicate.
+    
+    Args:
+        engine: SQLAlchemy Engine
+    
+    Returns:
+        False for other servers (benchmark databases, SQLite, ...)
+    """
+    url = engine.url
+    return (
+        url.get_backend_name() == "mysql"
+        and url.host == config.DB_HOST
+        and (url.port or 3306) == config.DB_PORT
+        and url.database == config.DB_NAME
+    )
+
+
+def get_replica_router(engine: Engine) -> Optional[ReplicaRouter]:
+    """
+    Get or create the router of an engine for config.DB_REPLICAS (once per
+    engine; kept on the engine as engine.replica_router, like the pool
+    metrics). Engines on any other server than the configured primary get
+    no router, so their reads never go to these replicas.
+    
+    Args:
+        engine: Engine of the primary, also the fallback of its router
+    
+    Returns:
+        ReplicaRouter, or None when no replica is configured, the engine is
+        not on the configured primary, or on error
+    """
+    router = getattr(engine, "replica_router", False)
+    if router is not False:
+        return router
+    with _router_lock:
+        router = getattr(engine, "replica_router", False)
+        if router is not False:
+            return router
+        router = None
+        if config.DB_REPLICAS and serves_primary(engine):
+            try:
+                router = create_replica_router(engine)
+            except Exception as e:
+                logger.error(f"✗ Replica setup failed, reading from primary: {e}")
+            else:
+                names = ", ".join(replica.name for replica in router.replicas)
+                logger.info(f"✓ Read replicas: {names} ({router.strategy})")
+        engine.replica_router = router
+        return router
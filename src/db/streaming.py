@@ -0,0 +1,86 @@
+"""
+Streaming query module.
+Reads large result sets through an unbuffered server-side cursor and yields
+fixed-size DataFrame chunks, so rows never sit in memory all at once.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import Engine
+
+import config
+from src.logger import get_logger
+from src.utils.dtypes import compact_dtypes
+from src.utils.query_manager import CompiledQuery
+
+logger = get_logger(__name__)
+
+
+def stream_query(
+    query: Union[str, CompiledQuery],
+    engine: Engine,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    chunk_size: int = config.STREAM_CHUNK_ROWS,
+    categories: Optional[Iterable[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Execute a query with stream_results (pymysql SSCursor) and yield chunks.
+    Each chunk is coerced to compact dtypes as it arrives. The connection stays
+    checked out until the generator is exhausted or closed.
+    
+    Args:
+        query: CompiledQuery, or SQL query string (%s placeholders)
+        engine: SQLAlchemy Engine
+        params: Named parameters dict for a CompiledQuery,
+            parameters tuple for a SQL string (optional)
+        chunk_size: Rows per chunk
+        categories: Columns converted to category in every chunk
+    
+    Yields:
+        DataFrames of at most chunk_size rows (nothing for an empty result)
+    
+    Raises:
+        Exception: Database errors are logged and re-raised, since a partial
+            stream cannot be told apart from a complete one
+    """
+    total_rows = 0
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+            if isinstance(query, CompiledQuery):
+                result = conn.execute(query.statement, params or {})
+            else:
+                result = conn.exec_driver_sql(query, params or ())
+            columns = list(result.keys())
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                total_rows += len(rows)
+                yield compact_dtypes(
+                    pd.DataFrame.from_records(rows, columns=columns),
+                    categories=categories,
+                )
+    except Exception as e:
+        logger.error(f"Error streaming query after {total_rows} rows: {e}")
+        raise
+    logger.info(f"Streamed {total_rows} rows in chunks of {chunk_size}")
+
+
+def concat_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate streamed chunks into one DataFrame.
+    Only compact chunks are held, never the driver's row tuples for the whole
+    result alongside the full DataFrame.
+    
+    Args:
+        chunks: Iterable of DataFrames with the same columns
+    
+    Returns:
+        Single DataFrame (empty if there were no chunks)
+    """
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
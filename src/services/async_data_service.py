@@ -0,0 +1,455 @@
+"""
+Async data service module.
+Asyncio counterparts of data_service.fetch_data and the dataset functions,
+running on the aiomysql AsyncEngine of src/db/async_connection.py.
+
+Results go through the same result cache under the same keys as the sync
+path, and the same fact store / rollup routing applies. Many datasets can be
+in flight at once on one event loop thread instead of one thread (and one
+blocked pooled connection) per query:
+
+    runner = get_async_runner()
+    data = runner.run(gather_datasets({
+        "trend": get_trend_data_async(start_str, end_str, filter_spec, runner.engine),
+        "status": get_status_summary_async(start_str, end_str, filter_spec, runner.engine),
+    }), timeout=config.ASYNC_QUERY_TIMEOUT)
+"""
+
+import asyncio
+import contextvars
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Dict, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import config
+from src.logger import get_logger
+from src.services import metrics
+from src.services.data_service import (
+    _compute_province,
+    _compute_status,
+    _compute_trend,
+    _frame_totals,
+    _kpi_row,
+    _load_fact_slice,
+    _ranked_params,
+    _ranked_query,
+    _slice_totals,
+    _split_ranked,
+    _trend_params,
+)
+from src.services.profiler import instrument_engine, profile_query
+from src.services.result_cache import (
+    frame_nbytes,
+    get_result_cache,
+    make_query_key,
+    refresh_requested,
+)
+from src.services.rollups import WATERMARKS_QUERY, resolve_rollup_query
+from src.utils.dtypes import coerce_columns
+from src.utils.query_manager import CompiledQuery, compile_query
+from src.utils.sql_helpers import FilterSpec
+from src.utils.time_buckets import plan_buckets
+
+logger = get_logger(__name__)
+
+
+async def _read_query_async(
+    query: Union[str, CompiledQuery],
+    engine: AsyncEngine,
+    params: Optional[Union[Tuple, Dict[str, Any]]],
+) -> pd.DataFrame:
+    """
+    Run a query on the async engine (no cache); raises on failure. The result
+    is coerced to the query's column spec, as in the sync path.
+    """
+    instrument_engine(engine.sync_engine)
+    async with engine.connect() as conn:
+        if isinstance(query, CompiledQuery):
+            result = await conn.execute(query.statement, params or {})
+        else:
+            result = await conn.exec_driver_sql(query, params or ())
+        columns = list(result.keys())
+        rows = result.fetchall()
+    # coerce_float turns DECIMAL values into floats, like pd.read_sql
+    df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    logger.info(f"Fetched {len(df)} rows from database (async)")
+    return coerce_columns(df, query.column_spec if isinstance(query, CompiledQuery) else {})
+
+
+async def _revalidate_async(
+    key: str,
+    query: Union[str, CompiledQuery],
+    engine: AsyncEngine,
+    params: Optional[Union[Tuple, Dict[str, Any]]],
+    ttl: int,
+    hard_ttl: int,
+    label: str = "",
+) -> None:
+    """Background refresh of a stale entry (claimed with claim_revalidation)."""
+    cache = get_result_cache()
+    failed = False
+    try:
+        cache.put(key, await _read_query_async(query, engine, params), ttl, hard_ttl, label)
+    except Exception as e:
+        failed = True
+        logger.warning(f"Background refresh of {key[:16]} failed (async): {e}")
+    finally:
+        cache.release_revalidation(key, failed)
+
+
+# Strong references to background refresh tasks (the loop only keeps weak ones)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def fetch_data_async(
+    query: Union[str, CompiledQuery],
+    engine: AsyncEngine,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    query_id: Optional[str] = None,
+    ttl: int = config.CACHE_TTL_DATA,
+    hard_ttl: int = config.CACHE_HARD_TTL_DATA,
+) -> pd.DataFrame:
+    """
+    Execute SQL query on the async engine and return pandas DataFrame.
+    Shares the result cache (and cache keys) with data_service.fetch_data,
+    including its stale-while-revalidate policy: a stale result is returned at
+    once and refreshed by a background task on the same loop.
+    Failed queries are not cached.
+    
+    Args:
+        query: CompiledQuery from the query registry, or SQL query string
+        engine: SQLAlchemy AsyncEngine (from get_async_runner().engine)
+        params: Named parameters dict (CompiledQuery.bind) or parameters
+            tuple for a SQL string (optional)
+        query_id: Readable query name for the cache key and the profiler
+        ttl: Seconds the result stays fresh (soft TTL)
+        hard_ttl: Seconds a stale result may still be served
+    
+    Returns:
+        DataFrame with query results, empty DataFrame on error
+    """
+    sql = query.sql if isinstance(query, CompiledQuery) else query
+    cache = get_result_cache()
+    key = make_query_key(sql, params, query_id)
+    
+    with profile_query(query_id or f"sql:{key[:16]}") as record:
+        hit = None if refresh_requested() else cache.lookup(key)
+        if hit is None:
+            try:
+                df = await _read_query_async(query, engine, params)
+            except Exception as e:
+                logger.error(f"Error fetching data (async): {e}")
+                if record is not None:
+                    record.cache = "error"
+                return pd.DataFrame()
+            cache.put(key, df, ttl, hard_ttl, label=query_id or "")
+        else:
+            df = hit.df
+            if hit.stale and cache.claim_revalidation(key):
+                # Empty context: the refresh is not part of this render's profile
+                task = asyncio.get_running_loop().create_task(
+                    _revalidate_async(key, query, engine, params, ttl, hard_ttl, query_id or ""),
+                    context=contextvars.Context(),
+                )
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+        
+        if record is not None:
+            record.cache = "miss" if hit is None else "stale" if hit.stale else hit.tier
+            record.data_as_of = time.time() if hit is None else hit.stored_at
+            record.rows = len(df)
+            record.nbytes = frame_nbytes(df)
+    return df
+
+
+async def _rollup_watermarks_async(engine: AsyncEngine) -> Dict[str, datetime]:
+    """Rollup watermarks through the result cache (empty if rollups were never built)."""
+    if not config.ROLLUP_ENABLED:
+        return {}
+    df = await fetch_data_async(
+        WATERMARKS_QUERY, engine, query_id="rollup_watermarks", ttl=config.CACHE_TTL_ROLLUP_STATE
+    )
+    if df.empty:
+        return {}
+    return {
+        name: watermark.to_pydatetime() if isinstance(watermark, pd.Timestamp) else watermark
+        for name, watermark in zip(df["RollupName"], df["Watermark"])
+        if not pd.isna(watermark)
+    }
+
+
+async def _fetch_dataset(
+    dataset: str,
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Fetch one dataset from MySQL (rollup if it can answer, raw query otherwise).
+    
+    Args:
+        dataset: QUERY_FILES key of the raw query (e.g. "trend")
+        start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy AsyncEngine
+    
+    Returns:
+        DataFrame (same columns as the sync dataset function)
+    """
+    watermarks = await _rollup_watermarks_async(engine)
+    query = (
+        resolve_rollup_query(dataset, start_date_str, end_date_str, filters, None, watermarks)
+        or compile_query(dataset, filters)
+    )
+    params = query.bind({"start": start_date_str, "end": end_date_str}, filters)
+    return await fetch_data_async(query, engine, params=params, query_id=dataset)
+
+
+async def _load_fact_slice_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+) -> Optional[pd.DataFrame]:
+    """data_service._load_fact_slice off the event loop (Parquet reads block)."""
+    return await asyncio.to_thread(_load_fact_slice, start_date_str, end_date_str, filters)
+
+
+async def get_period_totals_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_period_totals.
+    
+    Args:
+        start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy AsyncEngine
+    
+    Returns:
+        Single-row DataFrame with Revenue and Orders, empty DataFrame on error
+    """
+    try:
+        fact_df = await _load_fact_slice_async(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            revenue, orders = _slice_totals(fact_df, np.ones(len(fact_df), dtype=bool))
+            return pd.DataFrame([{"Revenue": revenue, "Orders": orders}])
+        return await _fetch_dataset("period_totals", start_date_str, end_date_str, filters, engine)
+    except Exception as e:
+        logger.error(f"Error fetching period totals (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_kpi_data_async(
+    start_date_str: str,
+    end_date_str: str,
+    prev_start_str: str,
+    prev_end_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_kpi_data (both periods awaited together).
+    
+    Args:
+        start_date_str: Current period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Current period end (YYYY-MM-DD HH:MM:SS)
+        prev_start_str: Comparison period start
+        prev_end_str: Comparison period end
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy AsyncEngine
+    
+    Returns:
+        DataFrame with KPI metrics
+    """
+    try:
+        current, previous = await asyncio.gather(
+            get_period_totals_async(start_date_str, end_date_str, filters, engine),
+            get_period_totals_async(prev_start_str, prev_end_str, filters, engine),
+        )
+        if current.empty or previous.empty:
+            return pd.DataFrame()
+        return _kpi_row(_frame_totals(current), _frame_totals(previous))
+    except Exception as e:
+        logger.error(f"Error fetching KPI data (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_trend_data_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+    grain: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_trend_data.
+    
+    Returns:
+        DataFrame with columns: BucketStart, Orders, Revenue
+    """
+    try:
+        plan = plan_buckets(start_date_str, end_date_str, grain)
+        fact_df = await _load_fact_slice_async(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_trend(fact_df, plan)
+        
+        rollup = None
+        if plan.grain != "minute":
+            watermarks = await _rollup_watermarks_async(engine)
+            rollup = resolve_rollup_query(
+                "trend", start_date_str, end_date_str, filters, None, watermarks, unit=plan.unit
+            )
+        query = rollup or compile_query("trend", filters, unit=plan.unit)
+        params = query.bind(_trend_params(plan, start_date_str, end_date_str), filters)
+        return await fetch_data_async(query, engine, params=params, query_id="trend")
+    except Exception as e:
+        logger.error(f"Error fetching trend data (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_status_summary_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_status_summary.
+    
+    Returns:
+        DataFrame with Status and Orders columns
+    """
+    try:
+        fact_df = await _load_fact_slice_async(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_status(fact_df)
+        return await _fetch_dataset("status", start_date_str, end_date_str, filters, engine)
+    except Exception as e:
+        logger.error(f"Error fetching status summary (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_province_data_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+    limit: int = 20,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_province_data.
+    
+    Returns:
+        DataFrame with Province and Orders columns (top provinces, then "Others")
+    """
+    try:
+        fact_df = await _load_fact_slice_async(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_province(fact_df, limit)
+        watermarks = await _rollup_watermarks_async(engine)
+        breakdown = (
+            resolve_rollup_query("province", start_date_str, end_date_str, filters, None, watermarks)
+            or compile_query("province", filters)
+        )
+        query = _ranked_query("province", breakdown)
+        params = query.bind(
+            {"start": start_date_str, "end": end_date_str, **_ranked_params(limit)}, filters
+        )
+        df = await fetch_data_async(query, engine, params=params, query_id="province_ranked")
+        return _split_ranked("province", df).to_frame()
+    except Exception as e:
+        logger.error(f"Error fetching province data (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_revenue_by_brand_platform_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_revenue_by_brand_platform.
+    
+    Returns:
+        DataFrame with Brand, Platform, Revenue, Orders
+    """
+    try:
+        return await _fetch_dataset(
+            "revenue_brand_platform", start_date_str, end_date_str, filters, engine
+        )
+    except Exception as e:
+        logger.error(f"Error fetching revenue by brand/platform (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_revenue_by_brand_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_revenue_by_brand.
+    
+    Returns:
+        DataFrame with Brand, Revenue, Orders, RevenuePercent
+    """
+    try:
+        df = await _fetch_dataset("revenue_by_brand", start_date_str, end_date_str, filters, engine)
+        return metrics.with_share(df) if not df.empty else df
+    except Exception as e:
+        logger.error(f"Error fetching revenue by brand (async): {e}")
+        return pd.DataFrame()
+
+
+async def get_revenue_by_platform_async(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: AsyncEngine,
+) -> pd.DataFrame:
+    """
+    Async version of data_service.get_revenue_by_platform.
+    
+    Returns:
+        DataFrame with Platform, Revenue, Orders, RevenuePercent
+    """
+    try:
+        df = await _fetch_dataset("revenue_by_platform", start_date_str, end_date_str, filters, engine)
+        return metrics.with_share(df) if not df.empty else df
+    except Exception as e:
+        logger.error(f"Error fetching revenue by platform (async): {e}")
+        return pd.DataFrame()
+
+
+async def gather_datasets(requests: Dict[str, Awaitable[pd.DataFrame]]) -> Dict[str, pd.DataFrame]:
+    """
+    Await several dataset coroutines concurrently.
+    
+    Args:
+        requests: Mapping of result name to dataset coroutine
+    
+    Returns:
+        Dictionary with the same keys, each mapped to its DataFrame
+        (empty DataFrame if the request failed)
+    """
+    names = list(requests)
+    results = await asyncio.gather(*requests.values(), return_exceptions=True)
+    data = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Async dataset {name} failed: {result}")
+            result = pd.DataFrame()
+        data[name] = result
+    return data
@@ -0,0 +1,253 @@
+"""
+Cache warmer module.
+Precomputes the most common dashboard views into the result cache, so the
+first visitor of the day (and everyone after a TTL expiry) gets cache hits:
+
+- ranges: today, yesterday, last 7 days, last 30 days (config.CACHE_WARM_RANGES)
+- filters: everything selected (the page default) and each of the
+  config.CACHE_WARM_TOP_BRANDS brands with the most orders on its own
+- datasets: the Overview datasets (bundle or the four queries, as the page
+  fetches them) and the Custom Report breakdowns
+
+Warm fetches run inside result_cache.refreshing(), so they go to the database
+and overwrite the entries fetch_data reads, with a fresh TTL, and at warmer
+priority, so the admission controller serves page queries first. The warmer runs
+once at startup and then every CACHE_TTL_DATA - CACHE_WARM_LEAD_SECONDS, so
+entries are renewed before they expire. At most CACHE_WARM_MAX_WORKERS views
+are warmed at a time, leaving the rest of the pool to interactive queries.
+
+Run a one-off warm (e.g. after a deploy; fills the disk tier) with:
+    python -m src.services.cache_warmer
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+from sqlalchemy import Engine
+
+import config
+from src.db.admission import WARMER, query_priority
+from src.logger import get_logger
+from src.services.data_service import (
+    fetch_many,
+    get_filter_options_dict,
+    get_kpi_data,
+    get_overview_bundle,
+    get_province_data,
+    get_revenue_by_brand,
+    get_revenue_by_brand_platform,
+    get_revenue_by_platform,
+    get_status_summary,
+    get_trend_data,
+)
+from src.services.result_cache import refreshing
+from src.utils.date_helpers import get_comparison_period
+from src.utils.sql_helpers import FilterSpec, build_filters
+
+logger = get_logger(__name__)
+
+# Range name -> (first day, last day) relative to today
+WARM_RANGES: Dict[str, Callable[[date], Tuple[date, date]]] = {
+    "today": lambda today: (today, today),
+    "yesterday": lambda today: (today - timedelta(days=1), today - timedelta(days=1)),
+    "last_7_days": lambda today: (today - timedelta(days=6), today),
+    "last_30_days": lambda today: (today - timedelta(days=29), today),
+}
+
+
+@dataclass(frozen=True)
+class WarmView:
+    """One dashboard view to precompute: a date range and a filter selection."""
+    
+    name: str
+    start_str: str
+    end_str: str
+    prev_start_str: str
+    prev_end_str: str
+    filters: FilterSpec
+    # Custom Report breakdowns ignore the filters: warm them with one view per range
+    with_report: bool = False
+
+
+def build_views(engine: Engine, today: Optional[date] = None) -> List[WarmView]:
+    """
+    List the views to warm, with the same strings and filters the pages build.
+    
+    Args:
+        engine: SQLAlchemy Engine (filter options)
+        today: Reference day (default: today)
+    
+    Returns:
+        WarmView list, all-filters views first
+    """
+    today = today or date.today()
+    options = get_filter_options_dict(engine)
+    brand_counts = options["counts"]["brand"]
+    top_brands = sorted(
+        (brand for brand, count in brand_counts.items() if count),
+        key=lambda brand: brand_counts[brand],
+        reverse=True,
+    )[:config.CACHE_WARM_TOP_BRANDS]
+    
+    # The filter checkboxes start with every option selected
+    selections = [("all", options["brand"])] + [(brand, [brand]) for brand in top_brands]
+    filter_specs = [
+        (label, build_filters(
+            brands, options["platform"], options["shop"], options["status"],
+            domains=options["domains"],
+        ))
+        for label, brands in selections
+    ]
+    
+    views = []
+    for range_name in config.CACHE_WARM_RANGES:
+        start, end = WARM_RANGES[range_name](today)
+        prev_start, prev_end = get_comparison_period(start, end, config.DEFAULT_COMPARISON_MODE)
+        for label, filter_spec in filter_specs:
+            views.append(WarmView(
+                name=f"{range_name}/{label}",
+                start_str=start.strftime("%Y-%m-%d 00:00:00"),
+                end_str=end.strftime("%Y-%m-%d 23:59:59"),
+                prev_start_str=prev_start.strftime("%Y-%m-%d 00:00:00"),
+                prev_end_str=prev_end.strftime("%Y-%m-%d 23:59:59"),
+                filters=filter_spec,
+                with_report=label == "all",
+            ))
+    return views
+
+
+def warm_view(view: WarmView, engine: Engine) -> None:
+    """
+    Fetch the datasets of one view, refreshing their cache entries.
+    
+    Args:
+        view: View to warm
+        engine: SQLAlchemy Engine
+    """
+    period = (view.start_str, view.end_str)
+    comparison = (view.prev_start_str, view.prev_end_str)
+    with refreshing(), query_priority(WARMER):
+        bundle = None
+        if config.OVERVIEW_BUNDLE_MODE:
+            bundle = get_overview_bundle(*period, *comparison, view.filters, engine)
+        if bundle is None:
+            fetch_many({
+                "kpi": (get_kpi_data, (*period, *comparison, view.filters, engine)),
+                "trend": (get_trend_data, (*period, view.filters, engine)),
+                "status": (get_status_summary, (*period, view.filters, engine)),
+                "province": (get_province_data, (*period, view.filters, engine)),
+            }, max_workers=1)
+        if view.with_report:
+            for dataset in (get_revenue_by_brand_platform, get_revenue_by_brand, get_revenue_by_platform):
+                dataset(*period, view.filters, engine)
+
+
+class CacheWarmer:
+    """Background thread that re-warms the common views ahead of TTL expiry."""
+    
+    def __init__(
+        self,
+        engine: Engine,
+        interval: float = max(config.CACHE_TTL_DATA - config.CACHE_WARM_LEAD_SECONDS, 60),
+        max_workers: int = config.CACHE_WARM_MAX_WORKERS,
+    ):
+        """
+        Args:
+            engine: SQLAlchemy Engine
+            interval: Seconds between the starts of two warm runs
+            max_workers: Views warmed concurrently
+        """
+        self.engine = engine
+        self.interval = interval
+        self.max_workers = max_workers
+        self.last_run: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def warm_once(self) -> Dict[str, Any]:
+        """
+        Warm every view once.
+        
+        Returns:
+            Run summary: views, failed, seconds, finished_at
+        """
+        started = time.perf_counter()
+        failed = 0
+        try:
+            views = build_views(self.engine)
+        except Exception as e:
+            logger.error(f"Cache warmer could not list views: {e}")
+            views = []
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache_warmer") as pool:
+            futures = {view.name: pool.submit(warm_view, view, self.engine) for view in views}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Cache warmer failed on {name}: {e}")
+        
+        self.last_run = {
+            "views": len(views),
+            "failed": failed,
+            "seconds": round(time.perf_counter() - started, 1),
+            "finished_at": time.strftime("%H:%M:%S"),
+        }
+        logger.info(f"Cache warmer: {self.last_run}")
+        return self.last_run
+    
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.warm_once()
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+    
+    def start(self) -> None:
+        """Start the background thread (first run immediately)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop after the current run."""
+        self._stop.set()
+
+
+@st.cache_resource
+def start_cache_warmer(_engine: Engine) -> CacheWarmer:
+    """
+    Start the process-wide cache warmer (once per server process).
+    
+    Args:
+        _engine: SQLAlchemy Engine (not hashed)
+    
+    Returns:
+        The running CacheWarmer
+    """
+    warmer = CacheWarmer(_engine)
+    warmer.start()
+    logger.info(f"Cache warmer started (every {warmer.interval:.0f}s)")
+    return warmer
+
+
+def main() -> None:
+    """One-off warm entry point."""
+    from src.db.connection import create_db_engine
+    
+    engine = create_db_engine()
+    try:
+        CacheWarmer(engine).warm_once()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
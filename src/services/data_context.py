@@ -0,0 +1,182 @@
+"""
+Render-scoped data context.
+Deduplicates identical dataset requests made during one script run: the first
+request for (function, arguments) runs it, later ones - including ones made
+while it is still in flight - wait for and share that result.
+
+Usage in a page:
+    with DataContext() as data:
+        data.prefetch(get_revenue_by_brand, start_str, end_str, filter_spec, engine)
+        ...
+        brand_df = data.get(get_revenue_by_brand, start_str, end_str, filter_spec, engine)
+"""
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import config
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _request_key(func: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Hashable:
+    """Hashable identity of a dataset request (engines and FilterSpec are hashable)."""
+    key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return repr(key)
+
+
+class DataContext:
+    """Per-render memo of dataset requests, backed by a bounded thread pool."""
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Thread pool size for prefetch / fetch_many
+                (default: config.DATA_FETCH_MAX_WORKERS)
+        """
+        self.max_workers = max_workers or config.DATA_FETCH_MAX_WORKERS
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Worker threads need the script run context to use st.cache_data / st.error
+        self._script_ctx = get_script_run_ctx()
+        self.requested = 0
+        self.executed = 0
+    
+    def __enter__(self) -> "DataContext":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Wait for in-flight requests and release the thread pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.requested:
+            logger.info(
+                f"Data context: {self.requested} requests, {self.executed} executed"
+            )
+    
+    def _run(
+        self,
+        func: Callable[..., pd.DataFrame],
+        args: Tuple,
+        kwargs: Dict[str, Any],
+    ) -> pd.DataFrame:
+        if self._script_ctx is not None:
+            add_script_run_ctx(ctx=self._script_ctx)
+        return func(*args, **kwargs)
+    
+    def _claim(
+        self,
+        key: Hashable,
+        in_pool: bool,
+        func: Callable[..., pd.DataFrame],
+        args: Tuple,
+        kwargs: Dict[str, Any],
+    ) -> Tuple[Future, bool]:
+        """
+        Return the future for a request, creating it if this is the first ask.
+        
+        Returns:
+            (future, owner); owner is True if the caller must run it inline
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                return future, False
+            
+            self.executed += 1
+            if in_pool:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="data_context"
+                    )
+                # Run in a copy of the caller's context (profiler, etc.)
+                context = contextvars.copy_context()
+                future = self._executor.submit(context.run, self._run, func, args, kwargs)
+                self._futures[key] = future
+                return future, False
+            
+            future = Future()
+            self._futures[key] = future
+            return future, True
+    
+    def prefetch(self, func: Callable[..., pd.DataFrame], *args: Any, **kwargs: Any) -> Future:
+        """
+        Start a dataset request in the background (no-op if already requested).
+        
+        Args:
+            func: Dataset function (e.g. get_revenue_by_brand)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Future of the shared result
+        """
+        future, _ = self._claim(_request_key(func, args, kwargs), True, func, args, kwargs)
+        return future
+    
+    def get(self, func: Callable[..., pd.DataFrame], *args: Any, **kwargs: Any) -> pd.DataFrame:
+        """
+        Get a dataset, running func only if no identical request was made yet.
+        
+        Args:
+            func: Dataset function (e.g. get_revenue_by_brand)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        
+        Returns:
+            Copy of the shared DataFrame (callers may modify it),
+            empty DataFrame if the request failed
+        """
+        key = _request_key(func, args, kwargs)
+        with self._lock:
+            self.requested += 1
+        future, owner = self._claim(key, False, func, args, kwargs)
+        if owner:
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        
+        try:
+            return future.result().copy()
+        except Exception as e:
+            logger.error(f"Error fetching dataset {func.__qualname__}: {e}")
+            return pd.DataFrame()
+    
+    def fetch_many(self, requests: Dict[str, Tuple]) -> Dict[str, pd.DataFrame]:
+        """
+        Run several dataset requests concurrently and wait for all of them.
+        
+        Args:
+            requests: Mapping of result name to (function, args) or
+                (function, args, kwargs)
+        
+        Returns:
+            Dictionary with the same keys as requests, each mapped to its DataFrame
+            (empty DataFrame if the request failed)
+        """
+        calls = {
+            name: (request[0], request[1], request[2] if len(request) > 2 else {})
+            for name, request in requests.items()
+        }
+        for func, args, kwargs in calls.values():
+            self.prefetch(func, *args, **kwargs)
+        
+        results = {name: self.get(func, *args, **kwargs) for name, (func, args, kwargs) in calls.items()}
+        logger.info(f"Fetched {len(results)} datasets in parallel (workers={self.max_workers})")
+        return results
@@ -3,54 +3,181 @@ Data service module.
 Handles all data fetching, transformation, and aggregation logic.
 """
 
-from typing import Tuple, Dict, List, Optional
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Tuple, Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
 from sqlalchemy import Engine
 import streamlit as st
 
 import config
+from src.db.admission import WARMER, get_admission_controller, query_priority
+from src.db.replicas import get_replica_router
+from src.db.streaming import concat_chunks, stream_query
 from src.logger import get_logger
-from src.utils.query_manager import load_query, get_query_by_key
-from src.utils.sql_helpers import build_filters, build_inventory_filters
+from src.services.data_context import DataContext
+from src.services import metrics
+from src.services.dimensions import load_dimension_counts
+from src.services.profiler import current_profile, explain_query, instrument_engine, profile_query
+from src.services.result_cache import (
+    frame_nbytes,
+    get_result_cache,
+    make_query_key,
+    refresh_requested,
+)
+from src.services.rollups import resolve_rollup_query
+from src.store.fact_store import get_fact_store
+from src.utils.dtypes import coerce_columns
+from src.utils.query_manager import CompiledQuery, compile_query, compile_ranked
+from src.utils.sql_helpers import FilterSpec
+from src.utils.time_buckets import BucketPlan, plan_buckets
 
 logger = get_logger(__name__)
 
+# Breakdowns served by get_ranked_breakdown: dataset -> (group column, measures
+# in query column order); groups are ranked by the first measure
+RANKED_BREAKDOWNS: Dict[str, Tuple[str, ...]] = {
+    "province": ("Province", "Orders"),
+    "status": ("StatusName", "Orders"),
+    "revenue_by_brand": ("Brand", "Revenue", "Orders"),
+    "revenue_by_platform": ("PlatformName", "Revenue", "Orders"),
+}
+
+
+@dataclass
+class RankedBreakdown:
+    """One page of a ranked breakdown (see get_ranked_breakdown)."""
+    
+    rows: pd.DataFrame  # Groups of the page, highest first
+    others: pd.DataFrame  # 0 or 1 row: measures summed over the groups after the page
+    total_groups: int  # Groups in the whole breakdown (0 if the page is empty)
+    next_after: Optional[Tuple[Any, Any]] = None  # Keyset of the next page (None: last page)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Page rows followed by the "Others" row."""
+        if self.others.empty:
+            return self.rows
+        return pd.concat([self.rows, self.others], ignore_index=True)
+
+
+def _read_query(
+    query: Union[str, CompiledQuery],
+    engine: Engine,
+    params: Optional[Union[Tuple, Dict[str, Any]]],
+    chunk_size: Optional[int],
+) -> pd.DataFrame:
+    """
+    Run a query against the database (no cache) once the admission controller
+    gives it a slot at the context's priority; raises on failure. With read
+    replicas configured, it runs on a replica (primary as fallback). The
+    result is coerced to the query's column spec (config.QUERY_COLUMNS).
+    """
+    statement = query.statement if isinstance(query, CompiledQuery) else query
+    spec = query.column_spec if isinstance(query, CompiledQuery) else {}
+    
+    def read(target: Engine) -> pd.DataFrame:
+        instrument_engine(target)
+        if chunk_size:
+            return concat_chunks(stream_query(query, target, params, chunk_size))
+        return pd.read_sql(statement, target, params=params)
+    
+    router = get_replica_router(engine)
+    with get_admission_controller().admit():
+        df = read(engine) if router is None else router.run(read)
+    logger.info(f"Fetched {len(df)} rows from database")
+    return coerce_columns(df, spec)
+
+
+def _revalidate_query(
+    query: Union[str, CompiledQuery],
+    engine: Engine,
+    params: Optional[Union[Tuple, Dict[str, Any]]],
+    chunk_size: Optional[int],
+) -> pd.DataFrame:
+    """_read_query for a background refresh: queued behind interactive queries."""
+    with query_priority(WARMER):
+        return _read_query(query, engine, params, chunk_size)
+
 
-@st.cache_data(ttl=config.CACHE_TTL_DATA)
 def fetch_data(
-    query: str,
+    query: Union[str, CompiledQuery],
     _engine: Engine,
-    params: Optional[Tuple] = None
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    query_id: Optional[str] = None,
+    ttl: int = config.CACHE_TTL_DATA,
+    chunk_size: Optional[int] = None,
+    hard_ttl: int = config.CACHE_HARD_TTL_DATA,
 ) -> pd.DataFrame:
     """
     Execute SQL query and return pandas DataFrame.
-    Results are cached for performance.
+    Results are cached in the shared result cache (memory LRU + disk).
+    Past ttl the cached result is still returned at once and refreshed in
+    the background; past hard_ttl the caller waits for the database.
+    Failed queries are not cached.
     
     Args:
-        query: SQL query string
-        _engine: SQLAlchemy Engine (prefixed with _ to prevent Streamlit hashing)
-        params: Query parameters tuple (optional)
+        query: CompiledQuery from the query registry, or SQL query string
+        _engine: SQLAlchemy Engine
+        params: Named parameters dict (CompiledQuery.bind) or parameters
+            tuple for a SQL string (optional)
+        query_id: Readable query name for the cache key (e.g. a QUERY_FILES key);
+            a digest of the SQL text is always appended, so rollup and raw
+            variants or different filter columns never share an entry
+        ttl: Seconds the result stays fresh (soft TTL)
+        chunk_size: If set, read through a server-side cursor in chunks of this
+            many rows with compact dtypes (for large fact slices)
+        hard_ttl: Seconds a stale result may still be served
         
     Returns:
         DataFrame with query results, empty DataFrame on error
     """
-    try:
-        df = pd.read_sql(query, _engine, params=params)
-        logger.info(f"Fetched {len(df)} rows from database")
-        return df
-    except Exception as e:
-        logger.error(f"Error fetching data: {e}")
-        return pd.DataFrame()
+    sql = query.sql if isinstance(query, CompiledQuery) else query
+    cache = get_result_cache()
+    key = make_query_key(sql, params, query_id)
+    
+    with profile_query(query_id or f"sql:{key[:16]}") as record:
+        hit = None if refresh_requested() else cache.lookup(key)
+        if hit is None:
+            try:
+                df = _read_query(query, _engine, params, chunk_size)
+            except Exception as e:
+                logger.error(f"Error fetching data: {e}")
+                if record is not None:
+                    record.cache = "error"
+                return pd.DataFrame()
+            cache.put(key, df, ttl, hard_ttl, label=query_id or "")
+        else:
+            df = hit.df
+            if hit.stale:
+                cache.revalidate(
+                    key,
+                    lambda: _revalidate_query(query, _engine, params, chunk_size),
+                    ttl,
+                    hard_ttl,
+                    label=query_id or "",
+                )
+        
+        if record is not None:
+            record.cache = "miss" if hit is None else "stale" if hit.stale else hit.tier
+            record.data_as_of = time.time() if hit is None else hit.stored_at
+            record.rows = len(df)
+            record.nbytes = frame_nbytes(df)
+    
+    if record is not None and record.cache == "miss" and current_profile().explain:
+        record.explain = explain_query(_engine, query, params)
+    return df
 
 
 @st.cache_data(ttl=config.CACHE_TTL_OPTIONS)
-def load_filter_options(query_file: str, column: str, _engine: Engine) -> List[str]:
+def load_filter_options(query_key: str, column: str, _engine: Engine) -> List[str]:
     """
     Load options for filter dropdowns (brand, shop, status, etc.).
     Results cached for 1 hour.
     
     Args:
-        query_file: SQL filename to load
+        query_key: Key in config.QUERY_FILES (e.g. "brand")
         column: Column name to extract unique values
         _engine: SQLAlchemy Engine
         
@@ -58,53 +185,292 @@ def load_filter_options(query_file: str, column: str, _engine: Engine) -> List[s
         Sorted list of unique values from column
     """
     try:
+        query = compile_query(query_key)
         df = fetch_data(
-            load_query(query_file),
+            query,
             _engine,
-            params=(config.MIN_DATE_STR, config.MAX_DATE_STR),
+            params=query.bind({"start": config.MIN_DATE_STR, "end": config.MAX_DATE_STR}),
+            query_id=query_key,
+            ttl=config.CACHE_TTL_OPTIONS,
         )
         if not df.empty and column in df.columns:
             options = sorted(df[column].unique().tolist())
-            logger.info(f"Loaded {len(options)} options from {query_file} column {column}")
+            logger.info(f"Loaded {len(options)} options from {query_key} column {column}")
             return options
         return []
     except Exception as e:
-        logger.error(f"Error loading filter options from {query_file}: {e}")
+        logger.error(f"Error loading filter options from {query_key}: {e}")
         return []
 
 
+def _load_fact_slice(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+) -> Optional[pd.DataFrame]:
+    """
+    Read a filtered omisell_catalogue slice from the local fact store.
+    
+    Args:
+        start_date_str: Range start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Range end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        
+    Returns:
+        DataFrame with OmisellOrderNumber, CreatedTime, StatusName, Province and
+        LineRevenue columns, or None if the store is disabled or cannot answer
+        (caller should query MySQL instead)
+    """
+    if not config.FACT_STORE_ENABLED:
+        return None
+    
+    try:
+        store = get_fact_store()
+        if not store.covers(start_date_str, end_date_str):
+            return None
+        
+        with profile_query("fact_store") as record:
+            df = store.load(
+                start_date_str,
+                end_date_str,
+                columns=[
+                    "OmisellOrderNumber", "CreatedTime", "StatusName", "Province",
+                    "OriginalPrice", "DiscountSeller", "VoucherSeller", "Quantity",
+                ],
+                selection=filters.selection,
+            )
+            if record is not None:
+                record.cache = "store"
+                record.rows = len(df)
+                record.nbytes = frame_nbytes(df)
+        df["LineRevenue"] = (
+            df["OriginalPrice"] - df["DiscountSeller"] - df["VoucherSeller"]
+        ) * df["Quantity"]
+        logger.info(f"Loaded {len(df)} rows from local fact store")
+        return df.drop(columns=["OriginalPrice", "DiscountSeller", "VoucherSeller", "Quantity"])
+    except Exception as e:
+        logger.warning(f"Fact store unavailable, falling back to database: {e}")
+        return None
+
+
+def _period_mask(slice_df: pd.DataFrame, start_str: str, end_str: str) -> np.ndarray:
+    """Boolean mask of slice rows with CreatedTime BETWEEN start AND end."""
+    created = pd.to_datetime(slice_df["CreatedTime"])
+    return created.between(pd.Timestamp(start_str), pd.Timestamp(end_str)).to_numpy()
+
+
+def _slice_totals(slice_df: pd.DataFrame, mask: np.ndarray) -> Tuple[float, int]:
+    """(revenue, distinct orders) of the fact slice rows selected by mask."""
+    revenue = slice_df["LineRevenue"].to_numpy(dtype="float64", na_value=np.nan)
+    return float(np.nansum(revenue[mask])), int(slice_df["OmisellOrderNumber"][mask].nunique())
+
+
+def _frame_totals(totals_df: pd.DataFrame) -> Tuple[float, int]:
+    """(revenue, orders) of a get_period_totals row (SUM over no rows is NULL -> 0)."""
+    row = totals_df.iloc[0]
+    revenue = pd.to_numeric(row["Revenue"], errors="coerce")
+    orders = pd.to_numeric(row["Orders"], errors="coerce")
+    return (
+        0.0 if pd.isna(revenue) else float(revenue),
+        0 if pd.isna(orders) else int(orders),
+    )
+
+
+def _kpi_row(current: Tuple[float, int], previous: Tuple[float, int]) -> pd.DataFrame:
+    """
+    Build the KPI row (same columns as GET_ORDER_REVENUE_AOV.sql) from period totals.
+    
+    Args:
+        current: (revenue, orders) of the current period
+        previous: (revenue, orders) of the comparison period
+        
+    Returns:
+        Single-row DataFrame with Revenue, Orders, AOV and growth columns
+        (Quantity is not part of the KPI query and stays 0)
+    """
+    def totals(revenue: float, orders: int) -> pd.DataFrame:
+        return pd.DataFrame([{"Revenue": revenue, "Orders": orders, "Quantity": 0}])
+    
+    kpi = metrics.compare_periods(totals(*current), totals(*previous))
+    return kpi.astype({"Orders": "int64", "Quantity": "int64"})[metrics.KPI_COLUMNS]
+
+
+def _periods_adjacent(prev_end_str: str, start_date_str: str) -> bool:
+    """True if the comparison period ends right before the current one starts."""
+    prev_end = datetime.strptime(prev_end_str, config.SQL_DATETIME_FORMAT)
+    start = datetime.strptime(start_date_str, config.SQL_DATETIME_FORMAT)
+    return prev_end + timedelta(seconds=1) >= start
+
+
+def _compute_trend(current_df: pd.DataFrame, plan: BucketPlan) -> pd.DataFrame:
+    """Trend per time bucket, empty buckets included (same rows as GET_TREND_BUCKETS.sql)."""
+    buckets = pd.Series(plan.bucket_numbers(current_df["CreatedTime"]), index=current_df.index)
+    trend = (
+        current_df.groupby(buckets.rename("BucketNo"))
+        .agg(Orders=("OmisellOrderNumber", "nunique"), Revenue=("LineRevenue", "sum"))
+        .reindex(range(plan.count), fill_value=0)
+    )
+    return pd.DataFrame({
+        "BucketStart": plan.bucket_starts(),
+        "Orders": trend["Orders"].to_numpy(dtype="int64"),
+        "Revenue": trend["Revenue"].to_numpy(dtype="float64"),
+    })
+
+
+def _trend_params(plan: BucketPlan, start_date_str: str, end_date_str: str) -> Dict[str, Any]:
+    """Bind values of GET_TREND_BUCKETS.sql."""
+    return {
+        "bucket_count": plan.count,
+        "step": plan.step,
+        "start": start_date_str,
+        "end": end_date_str,
+    }
+
+
+def _compute_status(current_df: pd.DataFrame) -> pd.DataFrame:
+    """Order count by status (same columns as GET_ORDER_STATUS.sql)."""
+    status = (
+        current_df.groupby("StatusName", dropna=False, observed=True)["OmisellOrderNumber"]
+        .nunique()
+        .rename("Orders")
+        .reset_index()
+    )
+    return status.sort_values("Orders", ascending=False, ignore_index=True)
+
+
+def _compute_province(current_df: pd.DataFrame, limit: int) -> pd.DataFrame:
+    """Top provinces by orders and an "Others" row (same rows as get_province_data)."""
+    province = current_df["Province"]
+    valid = current_df[province.notna() & (province != "")]
+    provinces = (
+        valid.groupby("Province", observed=True)["OmisellOrderNumber"]
+        .nunique()
+        .rename("Orders")
+        .reset_index()
+        .sort_values(["Orders", "Province"], ascending=[False, True], ignore_index=True)
+    )
+    if len(provinces) <= limit:
+        return provinces
+    others = pd.DataFrame({
+        "Province": [config.BREAKDOWN_OTHERS_LABEL],
+        "Orders": [provinces["Orders"].iloc[limit:].sum()],
+    })
+    return pd.concat([provinces.head(limit), others], ignore_index=True)
+
+
+def _ranked_params(limit: int, after: Optional[Tuple[Any, Any]] = None) -> Dict[str, Any]:
+    """Bind values of the ranked breakdown wrapper (see QueryRegistry.compile_ranked)."""
+    after_value, after_key = after if after is not None else (None, None)
+    return {
+        # Not "after_key IS NULL": the last group of a page may itself be NULL
+        "first_page": after is None,
+        "limit": int(limit),
+        "after_value": after_value,
+        "after_key": after_key,
+        "others_label": config.BREAKDOWN_OTHERS_LABEL,
+    }
+
+
+def _ranked_query(dataset: str, breakdown: CompiledQuery) -> CompiledQuery:
+    """Wrap a dataset's compiled breakdown (raw or rollup) in the ranked query."""
+    column, *measures = RANKED_BREAKDOWNS[dataset]
+    return compile_ranked(breakdown, column, measures)
+
+
+def _split_ranked(dataset: str, df: pd.DataFrame) -> RankedBreakdown:
+    """Turn a ranked query result into a RankedBreakdown."""
+    if df.empty:
+        return RankedBreakdown(df, df, 0)
+    
+    # Counts summed into the "Others" row (DECIMAL) are coerced by the column spec
+    column, order_column = RANKED_BREAKDOWNS[dataset][:2]
+    is_others = df["GroupRank"].isna()
+    rows = df[~is_others].drop(columns=["GroupRank", "TotalGroups"]).reset_index(drop=True)
+    others = df[is_others].drop(columns=["GroupRank", "TotalGroups"]).reset_index(drop=True)
+    total_groups = int(df["TotalGroups"].max())
+    
+    next_after = None
+    if len(rows) and df.loc[~is_others, "GroupRank"].iloc[-1] < total_groups:
+        last = rows.iloc[-1]
+        # Plain Python values: numpy scalars and NaN cannot be bound by the driver
+        next_after = tuple(
+            None if pd.isna(value) else value.item() if isinstance(value, np.generic) else value
+            for value in (last[order_column], last[column])
+        )
+    return RankedBreakdown(rows, others, total_groups, next_after)
+
+
+def get_period_totals(
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: Engine,
+) -> pd.DataFrame:
+    """
+    Fetch revenue and distinct orders of one period.
+    Reads only the period's own range (fact store, rollup or indexed
+    CreatedTime scan), so comparison periods never scan the gap between them.
+    
+    Args:
+        start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy Engine
+        
+    Returns:
+        Single-row DataFrame with Revenue and Orders, empty DataFrame on error
+    """
+    try:
+        fact_df = _load_fact_slice(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            revenue, orders = _slice_totals(fact_df, np.ones(len(fact_df), dtype=bool))
+            return pd.DataFrame([{"Revenue": revenue, "Orders": orders}])
+        
+        query = (
+            resolve_rollup_query("period_totals", start_date_str, end_date_str, filters, engine)
+            or compile_query("period_totals", filters)
+        )
+        params = query.bind({"start": start_date_str, "end": end_date_str}, filters)
+        return fetch_data(query, engine, params=params, query_id="period_totals")
+    except Exception as e:
+        logger.error(f"Error fetching period totals: {e}")
+        return pd.DataFrame()
+
+
 def get_kpi_data(
     start_date_str: str,
     end_date_str: str,
     prev_start_str: str,
     prev_end_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
 ) -> pd.DataFrame:
     """
     Fetch KPI metrics (Revenue, Orders, AOV, Growth).
+    The current and comparison periods are read concurrently with one
+    get_period_totals each and joined here, so any comparison (previous
+    period, WoW, MoM, YoY) costs the same as two scans of the period length.
     
     Args:
         start_date_str: Current period start (YYYY-MM-DD HH:MM:SS)
         end_date_str: Current period end (YYYY-MM-DD HH:MM:SS)
-        prev_start_str: Previous period start
-        prev_end_str: Previous period end
-        filters: SQL WHERE clause
+        prev_start_str: Comparison period start
+        prev_end_str: Comparison period end
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         
     Returns:
         DataFrame with KPI metrics
     """
     try:
-        query = load_query(config.QUERY_FILES["kpi"]).format(filters=filters)
-        params = (
-            start_date_str, end_date_str,
-            start_date_str, end_date_str,
-            prev_start_str, prev_end_str,
-            prev_start_str, prev_end_str,
-            prev_start_str, end_date_str,
-        )
-        df = fetch_data(query, engine, params=params)
+        totals = fetch_many({
+            "current": (get_period_totals, (start_date_str, end_date_str, filters, engine)),
+            "previous": (get_period_totals, (prev_start_str, prev_end_str, filters, engine)),
+        })
+        if totals["current"].empty or totals["previous"].empty:
+            return pd.DataFrame()
+        
+        df = _kpi_row(_frame_totals(totals["current"]), _frame_totals(totals["previous"]))
         logger.info(f"Fetched KPI data: {len(df)} rows")
         return df
     except Exception as e:
@@ -115,26 +481,40 @@ def get_kpi_data(
 def get_trend_data(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
+    grain: Optional[str] = None,
 ) -> pd.DataFrame:
     """
-    Fetch hourly trend data (Revenue and Orders by hour).
+    Fetch the revenue / orders trend in time buckets.
+    The grain (minute ... month) follows the range length unless given, and
+    the number of buckets never exceeds config.TREND_MAX_POINTS; empty
+    buckets are filled with 0 by the query.
     
     Args:
         start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
         end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
+        grain: Bucket grain override (see time_buckets.plan_buckets)
         
     Returns:
-        DataFrame with columns: HOURNUM, Revenue, Orders
+        DataFrame with columns: BucketStart, Orders, Revenue
     """
     try:
-        query = load_query(config.QUERY_FILES["trend"]).format(filters=filters)
-        params = (start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
-        logger.info(f"Fetched trend data: {len(df)} rows")
+        plan = plan_buckets(start_date_str, end_date_str, grain)
+        fact_df = _load_fact_slice(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_trend(fact_df, plan)
+        
+        # Hourly rollups cannot split an hour into minutes
+        rollup = None if plan.grain == "minute" else resolve_rollup_query(
+            "trend", start_date_str, end_date_str, filters, engine, unit=plan.unit
+        )
+        query = rollup or compile_query("trend", filters, unit=plan.unit)
+        params = query.bind(_trend_params(plan, start_date_str, end_date_str), filters)
+        df = fetch_data(query, engine, params=params, query_id="trend")
+        logger.info(f"Fetched trend data: {len(df)} {plan.label} buckets")
         return df
     except Exception as e:
         logger.error(f"Error fetching trend data: {e}")
@@ -144,7 +524,7 @@ def get_trend_data(
 def get_status_summary(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
 ) -> pd.DataFrame:
     """
@@ -153,16 +533,23 @@ def get_status_summary(
     Args:
         start_date_str: Period start
         end_date_str: Period end
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         
     Returns:
         DataFrame with Status and Orders columns
     """
     try:
-        query = load_query(config.QUERY_FILES["status"]).format(filters=filters)
-        params = (start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
+        fact_df = _load_fact_slice(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_status(fact_df)
+        
+        query = (
+            resolve_rollup_query("status", start_date_str, end_date_str, filters, engine)
+            or compile_query("status", filters)
+        )
+        params = query.bind({"start": start_date_str, "end": end_date_str}, filters)
+        df = fetch_data(query, engine, params=params, query_id="status")
         logger.info(f"Fetched status summary: {len(df)} rows")
         return df
     except Exception as e:
@@ -173,38 +560,88 @@ def get_status_summary(
 def get_province_data(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
     limit: int = 20,
 ) -> pd.DataFrame:
     """
-    Fetch top provinces by orders/revenue.
+    Fetch top provinces by orders.
+    Only the top rows and the "Others" remainder are read from MySQL
+    (get_ranked_breakdown).
     
     Args:
         start_date_str: Period start
         end_date_str: Period end
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         limit: Number of top provinces to return
         
     Returns:
-        DataFrame with Province, Orders, and Revenue columns
+        DataFrame with Province and Orders columns: the top provinces, then a
+        config.BREAKDOWN_OTHERS_LABEL row if there are more
     """
     try:
-        query = load_query(config.QUERY_FILES["province"]).format(filters=filters)
-        params = (start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
-        logger.info(f"Fetched province data: {len(df)} rows")
-        return df.head(limit)
+        fact_df = _load_fact_slice(start_date_str, end_date_str, filters)
+        if fact_df is not None:
+            return _compute_province(fact_df, limit)
+        
+        ranked = get_ranked_breakdown("province", start_date_str, end_date_str, filters, engine, limit)
+        logger.info(f"Fetched province data: {len(ranked.rows)} of {ranked.total_groups} provinces")
+        return ranked.to_frame()
     except Exception as e:
         logger.error(f"Error fetching province data: {e}")
         return pd.DataFrame()
 
 
+def get_ranked_breakdown(
+    dataset: str,
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: Engine,
+    limit: int,
+    after: Optional[Tuple[Any, Any]] = None,
+) -> RankedBreakdown:
+    """
+    Fetch one page of a breakdown ranked by its first measure.
+    Ranking, LIMIT, keyset paging, the total group count and the "Others"
+    remainder are computed by MySQL, so only the displayed rows are transferred.
+    
+    Args:
+        dataset: Key of RANKED_BREAKDOWNS (e.g. "province")
+        start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy Engine
+        limit: Groups per page
+        after: next_after of the previous page (None for the first page)
+        
+    Returns:
+        RankedBreakdown (empty on error). The "Others" row sums the measures of
+        the remaining groups; distinct order counts are summed per group, which
+        is exact for groups an order cannot span (province, status, platform)
+    """
+    try:
+        breakdown = (
+            resolve_rollup_query(dataset, start_date_str, end_date_str, filters, engine)
+            or compile_query(dataset, filters)
+        )
+        query = _ranked_query(dataset, breakdown)
+        params = query.bind(
+            {"start": start_date_str, "end": end_date_str, **_ranked_params(limit, after)},
+            filters,
+        )
+        df = fetch_data(query, engine, params=params, query_id=f"{dataset}_ranked")
+        return _split_ranked(dataset, df)
+    except Exception as e:
+        logger.error(f"Error fetching ranked {dataset} breakdown: {e}")
+        return RankedBreakdown(pd.DataFrame(), pd.DataFrame(), 0)
+
+
 def get_revenue_by_brand_platform(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
 ) -> pd.DataFrame:
     """
@@ -213,16 +650,19 @@ def get_revenue_by_brand_platform(
     Args:
         start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
         end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         
     Returns:
         DataFrame with Brand, Platform, Revenue, Orders
     """
     try:
-        query = load_query(config.QUERY_FILES["revenue_brand_platform"]).format(filters=filters)
-        params = (start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
+        query = (
+            resolve_rollup_query("revenue_brand_platform", start_date_str, end_date_str, filters, engine)
+            or compile_query("revenue_brand_platform")
+        )
+        params = query.bind({"start": start_date_str, "end": end_date_str})
+        df = fetch_data(query, engine, params=params, query_id="revenue_brand_platform")
         logger.info(f"Fetched revenue by brand/platform: {len(df)} rows")
         return df
     except Exception as e:
@@ -233,7 +673,7 @@ def get_revenue_by_brand_platform(
 def get_revenue_by_brand(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
 ) -> pd.DataFrame:
     """
@@ -242,16 +682,21 @@ def get_revenue_by_brand(
     Args:
         start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
         end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         
     Returns:
         DataFrame with Brand, Revenue, Orders, RevenuePercent
     """
     try:
-        query = load_query(config.QUERY_FILES["revenue_by_brand"]).format(filters=filters)
-        params = (start_date_str, end_date_str, start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
+        query = (
+            resolve_rollup_query("revenue_by_brand", start_date_str, end_date_str, filters, engine)
+            or compile_query("revenue_by_brand")
+        )
+        params = query.bind({"start": start_date_str, "end": end_date_str})
+        df = fetch_data(query, engine, params=params, query_id="revenue_by_brand")
+        if not df.empty:
+            df = metrics.with_share(df)
         logger.info(f"Fetched revenue by brand: {len(df)} rows")
         return df
     except Exception as e:
@@ -262,7 +707,7 @@ def get_revenue_by_brand(
 def get_revenue_by_platform(
     start_date_str: str,
     end_date_str: str,
-    filters: str,
+    filters: FilterSpec,
     engine: Engine,
 ) -> pd.DataFrame:
     """
@@ -271,16 +716,21 @@ def get_revenue_by_platform(
     Args:
         start_date_str: Period start (YYYY-MM-DD HH:MM:SS)
         end_date_str: Period end (YYYY-MM-DD HH:MM:SS)
-        filters: SQL WHERE clause
+        filters: FilterSpec from build_filters
         engine: SQLAlchemy Engine
         
     Returns:
         DataFrame with Platform, Revenue, Orders, RevenuePercent
     """
     try:
-        query = load_query(config.QUERY_FILES["revenue_by_platform"]).format(filters=filters)
-        params = (start_date_str, end_date_str, start_date_str, end_date_str)
-        df = fetch_data(query, engine, params=params)
+        query = (
+            resolve_rollup_query("revenue_by_platform", start_date_str, end_date_str, filters, engine)
+            or compile_query("revenue_by_platform")
+        )
+        params = query.bind({"start": start_date_str, "end": end_date_str})
+        df = fetch_data(query, engine, params=params, query_id="revenue_by_platform")
+        if not df.empty:
+            df = metrics.with_share(df)
         logger.info(f"Fetched revenue by platform: {len(df)} rows")
         return df
     except Exception as e:
@@ -288,19 +738,164 @@ def get_revenue_by_platform(
         return pd.DataFrame()
 
 
-def get_filter_options_dict(engine: Engine) -> Dict[str, List[str]]:
+def get_overview_bundle(
+    start_date_str: str,
+    end_date_str: str,
+    prev_start_str: str,
+    prev_end_str: str,
+    filters: FilterSpec,
+    engine: Engine,
+    province_limit: int = config.OVERVIEW_PROVINCE_LIMIT,
+    trend_grain: Optional[str] = None,
+) -> Optional[Dict[str, pd.DataFrame]]:
+    """
+    Fetch all Overview datasets from a single scan of omisell_catalogue.
+    Pulls the filtered fact slice once (order number, time, status, province,
+    line revenue) and derives KPI, bucketed trend, status counts and top provinces
+    with vectorized groupbys. Results match get_kpi_data, get_trend_data,
+    get_status_summary and get_province_data.
+    The slice spans both periods only when they are adjacent; otherwise (WoW,
+    MoM, YoY) it covers the current period and the comparison totals come
+    from get_period_totals, so the gap between the periods is never read.
+    The slice comes from the local fact store when it covers the range; when
+    a rollup covers it instead, no slice is read and None is returned, so the
+    caller runs the per-dataset functions (which read the rollup).
+    
+    Args:
+        start_date_str: Current period start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Current period end (YYYY-MM-DD HH:MM:SS)
+        prev_start_str: Comparison period start
+        prev_end_str: Comparison period end
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy Engine
+        province_limit: Number of top provinces to return
+        trend_grain: Trend bucket grain override (as for get_trend_data)
+        
+    Returns:
+        Dictionary with "kpi", "trend", "status" and "province" DataFrames,
+        or None if a rollup covers the range, the slice is empty or a query
+        failed (caller should use the per-dataset functions)
+    """
+    try:
+        adjacent = _periods_adjacent(prev_end_str, start_date_str)
+        scan_start = prev_start_str if adjacent else start_date_str
+        
+        slice_df = _load_fact_slice(scan_start, end_date_str, filters)
+        if slice_df is None:
+            if resolve_rollup_query("period_totals", start_date_str, end_date_str, filters, engine):
+                logger.info("Overview range covered by rollups, skipping the bundle scan")
+                return None
+            query = compile_query("overview_slice", filters)
+            params = query.bind({"start": scan_start, "end": end_date_str}, filters)
+            slice_df = fetch_data(
+                query, engine, params=params,
+                query_id="overview_slice", chunk_size=config.STREAM_CHUNK_ROWS,
+            )
+        if slice_df.empty:
+            # No rows or a failed read: the per-dataset queries give the zero-filled datasets
+            return None
+        
+        slice_df = slice_df.assign(CreatedTime=pd.to_datetime(slice_df["CreatedTime"]))
+        current_mask = _period_mask(slice_df, start_date_str, end_date_str)
+        current_df = slice_df[current_mask]
+        if adjacent:
+            previous = _slice_totals(slice_df, _period_mask(slice_df, prev_start_str, prev_end_str))
+        else:
+            previous_df = get_period_totals(prev_start_str, prev_end_str, filters, engine)
+            if previous_df.empty:
+                return None
+            previous = _frame_totals(previous_df)
+        
+        trend_plan = plan_buckets(start_date_str, end_date_str, trend_grain)
+        bundle = {
+            "kpi": _kpi_row(_slice_totals(slice_df, current_mask), previous),
+            "trend": _compute_trend(current_df, trend_plan),
+            "status": _compute_status(current_df),
+            "province": _compute_province(current_df, province_limit),
+        }
+        logger.info(f"Built overview bundle from {len(slice_df)} fact rows")
+        return bundle
+    except Exception as e:
+        logger.error(f"Error building overview bundle: {e}")
+        return None
+
+
+def fetch_many(
+    requests: Dict[str, Tuple],
+    max_workers: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Run independent dataset requests concurrently on a bounded thread pool.
+    Total latency is roughly that of the slowest request instead of the sum.
+    
+    Args:
+        requests: Mapping of result name to (function, args) or
+            (function, args, kwargs), e.g. {"trend": (get_trend_data, (s, e, f, engine))}
+        max_workers: Thread pool size (default: config.DATA_FETCH_MAX_WORKERS)
+        
+    Returns:
+        Dictionary with the same keys as requests, each mapped to its DataFrame
+        (empty DataFrame if the request failed)
+        
+    Example:
+        results = fetch_many({
+            "trend": (get_trend_data, (start_str, end_str, filter_spec, engine)),
+            "status": (get_status_summary, (start_str, end_str, filter_spec, engine)),
+        })
+    """
+    if not requests:
+        return {}
+    
+    workers = min(max_workers or config.DATA_FETCH_MAX_WORKERS, len(requests))
+    with DataContext(max_workers=workers) as data:
+        return data.fetch_many(requests)
+
+
+def get_filter_options_dict(engine: Engine) -> Dict[str, Any]:
     """
     Load all filter options at startup.
+    Reads the dimension catalog (values + order counts); falls back to
+    SELECT DISTINCT over omisell_catalogue if the catalog has not been built.
     
     Args:
         engine: SQLAlchemy Engine
         
     Returns:
-        Dictionary with brand, shop, platform, status options
+        Dictionary with brand, shop, platform, status options,
+        "counts": {dimension: {value: order count or None}} and
+        "domains": {dimension: every value in the data} for the dimensions
+        whose full value set is known (see build_filters)
     """
-    return {
-        "brand": load_filter_options(config.QUERY_FILES["brand"], "brand", engine),
-        "shop": load_filter_options(config.QUERY_FILES["shop"], "ShopName", engine),
-        "status": load_filter_options(config.QUERY_FILES["order_status"], "StatusName", engine),
+    counts = {
+        dimension: load_dimension_counts(dimension, engine)
+        for dimension in ("brand", "shop", "status", "platform")
+    }
+    
+    if counts["brand"] and counts["shop"] and counts["status"]:
+        return {
+            "brand": list(counts["brand"]),
+            "shop": list(counts["shop"]),
+            "status": list(counts["status"]),
+            "platform": config.PLATFORMS,  # Static list
+            "counts": {
+                **counts,
+                "platform": {p: counts["platform"].get(p, 0) for p in config.PLATFORMS},
+            },
+            # Catalog values, including platforms outside the static list
+            "domains": {dimension: list(values) for dimension, values in counts.items()},
+        }
+    
+    logger.warning("Dimension catalog empty, loading filter options with SELECT DISTINCT")
+    options = {
+        "brand": load_filter_options("brand", "brand", engine),
+        "shop": load_filter_options("shop", "ShopName", engine),
+        "status": load_filter_options("order_status", "StatusName", engine),
         "platform": config.PLATFORMS,  # Static list
     }
+    options["counts"] = {
+        dimension: {value: None for value in values}
+        for dimension, values in options.items()
+    }
+    # The platform options are a static list, not the values in the data
+    options["domains"] = {dimension: options[dimension] for dimension in ("brand", "shop", "status")}
+    return options
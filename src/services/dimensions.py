@@ -0,0 +1,135 @@
+"""
+Dimension catalog.
+Keeps brand / shop / status / platform values with per-value order counts in
+the dim_catalog table, so filter options load from a small table instead of
+SELECT DISTINCT over omisell_catalogue.
+
+The catalog is built once and then refreshed incrementally from rows newer
+than its watermark. Counts are added per refresh, so rows that arrive later
+than DIM_CATALOG_SETTLE_MINUTES after their CreatedTime are not counted until
+the next --rebuild.
+
+Run the refresh job with:
+    python -m src.services.dimensions [--rebuild]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+from sqlalchemy import Engine, text
+
+import config
+from src.logger import get_logger
+from src.services.rollups import WATERMARK_DDL, read_watermark, write_watermark
+from src.utils.query_manager import compile_query
+
+logger = get_logger(__name__)
+
+CATALOG_NAME = "dim_catalog"
+
+CATALOG_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {CATALOG_NAME} ("
+    "Dimension VARCHAR(32) NOT NULL, "
+    "Value VARCHAR(255) NOT NULL, "
+    "ValueId VARCHAR(64) NULL, "
+    "Orders BIGINT NOT NULL DEFAULT 0, "
+    "FirstSeen DATETIME NULL, "
+    "LastSeen DATETIME NULL, "
+    "PRIMARY KEY (Dimension, Value))"
+)
+
+# Catalog dimension -> (omisell_catalogue column, id column or NULL)
+DIMENSIONS: Dict[str, Tuple[str, str]] = {
+    "brand": ("brand", "NULL"),
+    "shop": ("ShopName", "ShopId"),
+    "status": ("StatusName", "StatusID"),
+    "platform": ("PlatformName", "NULL"),
+}
+
+
+@st.cache_data(ttl=config.CACHE_TTL_OPTIONS)
+def load_dimension_counts(dimension: str, _engine: Engine) -> Dict[str, int]:
+    """
+    Load values of one dimension with their order counts.
+    Results cached for 1 hour.
+    
+    Args:
+        dimension: Catalog dimension ("brand", "shop", "status", "platform")
+        _engine: SQLAlchemy Engine
+    
+    Returns:
+        Dictionary of value -> order count sorted by value,
+        empty if the catalog has not been built
+    """
+    try:
+        query = compile_query("dim_catalog")
+        with _engine.connect() as conn:
+            rows = conn.execute(query.statement, query.bind({"dimension": dimension})).fetchall()
+        counts = {value: int(orders) for value, orders in rows}
+        logger.info(f"Loaded {len(counts)} {dimension} values from dimension catalog")
+        return counts
+    except Exception as e:
+        logger.warning(f"Dimension catalog unavailable for {dimension}: {e}")
+        return {}
+
+
+def refresh_dimension_catalog(
+    engine: Engine,
+    rebuild: bool = False,
+    until: Optional[datetime] = None,
+) -> None:
+    """
+    Build or incrementally refresh the dimension catalog.
+    Rows with watermark < CreatedTime <= until are grouped per value and their
+    distinct order counts added to the stored counts.
+    
+    Args:
+        engine: SQLAlchemy Engine
+        rebuild: Drop all counts and recount from config.MIN_DATE_STR
+        until: Count rows up to this moment
+            (default: now - DIM_CATALOG_SETTLE_MINUTES)
+    """
+    with engine.begin() as conn:
+        conn.execute(text(WATERMARK_DDL))
+        conn.execute(text(CATALOG_DDL))
+    
+    watermark = None if rebuild else read_watermark(engine, CATALOG_NAME)
+    if watermark is None:
+        watermark = datetime.strptime(config.MIN_DATE_STR, config.SQL_DATE_FORMAT)
+    until = until or datetime.now() - timedelta(minutes=config.DIM_CATALOG_SETTLE_MINUTES)
+    if until <= watermark:
+        logger.info("Dimension catalog already up to date")
+        return
+    
+    with engine.begin() as conn:
+        if rebuild:
+            conn.execute(text(f"DELETE FROM {CATALOG_NAME}"))
+        for dimension, (column, id_column) in DIMENSIONS.items():
+            query = compile_query(
+                "dim_catalog_refresh", dimension=dimension, column=column, id_column=id_column
+            )
+            conn.execute(query.statement, query.bind({"watermark": watermark, "until": until}))
+        write_watermark(conn, CATALOG_NAME, until)
+    
+    logger.info(f"Dimension catalog refreshed: {watermark} -> {until}")
+
+
+def main() -> None:
+    """Refresh job entry point."""
+    from src.db.connection import create_db_engine
+    
+    parser = argparse.ArgumentParser(description="Refresh the dimension catalog")
+    parser.add_argument("--rebuild", action="store_true", help="Recount from scratch")
+    args = parser.parse_args()
+    
+    engine = create_db_engine()
+    try:
+        refresh_dimension_catalog(engine, rebuild=args.rebuild)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""
+Export service module.
+Streams the omisell_catalogue rows of a date range and filter selection into a
+CSV, XLSX or Parquet file, chunk by chunk, so memory stays bounded by one
+chunk (config.STREAM_CHUNK_ROWS) whatever the number of rows:
+
+- rows come from GET_EXPORT_ROWS.sql through stream_query (server-side cursor)
+  with the same build_filters selection as the report
+- each chunk is coerced to the fixed dtypes of the export column spec and
+  appended to a temp file under EXPORT_DIR (XLSX starts a new sheet every
+  XLSX_MAX_ROWS rows)
+- exports run on a process-wide pool of EXPORT_MAX_WORKERS threads and hold
+  one admission slot at export priority, so they never delay page queries
+- CSV files larger than EXPORT_ZIP_MIN_MB are zipped once written: the page
+  hands the finished file to st.download_button, which holds it in memory,
+  and a million-row CSV shrinks several times (XLSX and Parquet are already
+  compressed)
+
+    job = get_export_manager().submit(engine, start_str, end_str, filter_spec, "parquet")
+    job.status  # "queued", "running", "done" or "error"; job.path when done
+"""
+
+import csv
+import itertools
+import os
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from sqlalchemy import Engine
+
+import config
+from src.db.admission import EXPORT, get_admission_controller, query_priority
+from src.db.streaming import stream_query
+from src.logger import get_logger
+from src.utils.dtypes import coerce_columns
+from src.utils.query_manager import compile_query
+from src.utils.sql_helpers import FilterSpec
+
+logger = get_logger(__name__)
+
+EXPORT_QUERY_KEY = "export_rows"
+# Format -> (file extension, MIME type of the download)
+FORMAT_FILES = {
+    "csv": (".csv", "text/csv"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+ZIP_FILE = (".zip", "application/zip")
+# Rows of one Excel worksheet, header included (format limit)
+XLSX_MAX_ROWS = 1_048_576
+
+
+class _CsvWriter:
+    """UTF-8 CSV with BOM (opens correctly in Excel), header written once."""
+    
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._header = True
+    
+    def write(self, chunk: pd.DataFrame) -> None:
+        chunk.to_csv(self._file, index=False, header=self._header, quoting=csv.QUOTE_MINIMAL)
+        self._header = False
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class _XlsxWriter:
+    """Write-only openpyxl workbook; rows beyond one sheet go to the next sheet."""
+    
+    def __init__(self, path: str):
+        # Only needed for XLSX exports
+        from openpyxl import Workbook
+        
+        self._path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._sheets = itertools.count(1)
+    
+    def _new_sheet(self, columns: Iterable[str]) -> None:
+        self._sheet = self._workbook.create_sheet(f"Data {next(self._sheets)}")
+        self._sheet.append(list(columns))
+        self._sheet_rows = 1
+    
+    def write(self, chunk: pd.DataFrame) -> None:
+        # NaN / NaT would be written as text: use empty cells
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if self._sheet is None or self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet(chunk.columns)
+            self._sheet.append(row)
+            self._sheet_rows += 1
+    
+    def close(self) -> None:
+        if self._sheet is None:
+            self._workbook.create_sheet("Data 1")
+        self._workbook.save(self._path)
+
+
+class _ParquetWriter:
+    """One row group per chunk, schema fixed by the first chunk."""
+    
+    def __init__(self, path: str):
+        self._path = path
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._schema: Optional[pa.Schema] = None
+    
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self._writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # A column that is all NULL in the first chunk holds text in later ones
+            self._schema = pa.schema([
+                f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema
+            ]).remove_metadata()
+            self._writer = pq.ParquetWriter(self._path, self._schema, compression="zstd")
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            pq.write_table(pa.table({}), self._path)
+
+
+_WRITERS = {"csv": _CsvWriter, "xlsx": _XlsxWriter, "parquet": _ParquetWriter}
+
+
+@dataclass
+class ExportJob:
+    """One export request and its progress."""
+    
+    id: str
+    fmt: str
+    path: str
+    start_str: str
+    end_str: str
+    status: str = "queued"  # "queued", "running", "done" or "error"
+    rows: int = 0
+    zipped: bool = False  # path is a .zip holding the file (see zip_export)
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    
+    @property
+    def export_name(self) -> str:
+        """Name of the exported file, e.g. omisell_2024-05-01_2024-05-31.xlsx."""
+        extension = FORMAT_FILES[self.fmt][0]
+        return f"omisell_{self.start_str[:10]}_{self.end_str[:10]}{extension}"
+    
+    @property
+    def file_name(self) -> str:
+        """Download name: export_name, or export_name + ".zip" when zipped."""
+        return self.export_name + (ZIP_FILE[0] if self.zipped else "")
+    
+    @property
+    def mime(self) -> str:
+        """MIME type of the download."""
+        return ZIP_FILE[1] if self.zipped else FORMAT_FILES[self.fmt][1]
+    
+    @property
+    def size(self) -> int:
+        """Bytes written so far (0 if the file does not exist yet)."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+
+def zip_export(job: ExportJob) -> None:
+    """
+    Replace a finished export file with a .zip holding it (deflate, streamed
+    from disk) and point the job at the archive.
+    
+    Args:
+        job: Export whose file is complete
+    """
+    zip_path = os.path.splitext(job.path)[0] + ZIP_FILE[0]
+    try:
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(job.path, arcname=job.export_name)
+    except Exception:
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
+        raise
+    os.remove(job.path)
+    job.path, job.zipped = zip_path, True
+
+
+def export_rows(
+    job: ExportJob,
+    engine: Engine,
+    filters: FilterSpec,
+    chunk_size: int = config.STREAM_CHUNK_ROWS,
+) -> ExportJob:
+    """
+    Stream the selected rows into job.path (runs on the caller's thread).
+    
+    Args:
+        job: Export to run (format, path and range)
+        engine: SQLAlchemy Engine (primary; a long server-side cursor is not
+            moved between replicas)
+        filters: FilterSpec from build_filters
+        chunk_size: Rows per streamed chunk
+    
+    Returns:
+        The job, "done" with its row count (zipped if it is a CSV over
+        EXPORT_ZIP_MIN_MB) or "error" with the message (the partial file is
+        removed)
+    """
+    job.status = "running"
+    started = time.perf_counter()
+    writer = None
+    try:
+        query = compile_query(EXPORT_QUERY_KEY, filters)
+        params = query.bind({"start": job.start_str, "end": job.end_str}, filters)
+        writer = _WRITERS[job.fmt](job.path)
+        with query_priority(EXPORT), get_admission_controller().admit(
+            timeout=config.EXPORT_QUEUE_TIMEOUT
+        ):
+            for chunk in stream_query(query, engine, params, chunk_size):
+                writer.write(coerce_columns(chunk, query.column_spec))
+                job.rows += len(chunk)
+        writer.close()
+        if job.fmt == "csv" and job.size > config.EXPORT_ZIP_MIN_MB * 1024 * 1024:
+            zip_export(job)
+        job.status = "done"
+        logger.info(
+            f"Export {job.id} ({job.fmt}): {job.rows} rows, {job.size} bytes "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    except Exception as e:
+        job.status = "error"
+        job.error = str(e)
+        logger.error(f"Export {job.id} failed after {job.rows} rows: {e}")
+        try:
+            if writer is not None:
+                writer.close()
+            os.remove(job.path)
+        except Exception:
+            pass
+    finally:
+        job.finished_at = time.time()
+    return job
+
+
+class ExportManager:
+    """Runs exports on background threads and removes old export files."""
+    
+    def __init__(
+        self,
+        export_dir: str = config.EXPORT_DIR,
+        max_workers: int = config.EXPORT_MAX_WORKERS,
+        file_ttl: int = config.EXPORT_FILE_TTL_SECONDS,
+    ):
+        """
+        Args:
+            export_dir: Directory of the export files
+            max_workers: Exports running at once
+            file_ttl: Seconds a finished export file is kept
+        """
+        self.export_dir = export_dir
+        self.file_ttl = file_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._jobs: Dict[str, ExportJob] = {}
+        self._lock = threading.Lock()
+        os.makedirs(export_dir, exist_ok=True)
+    
+    def submit(
+        self,
+        engine: Engine,
+        start_str: str,
+        end_str: str,
+        filters: FilterSpec,
+        fmt: str,
+    ) -> ExportJob:
+        """
+        Queue an export of the selected rows.
+        
+        Args:
+            engine: SQLAlchemy Engine
+            start_str: Range start (YYYY-MM-DD HH:MM:SS)
+            end_str: Range end (YYYY-MM-DD HH:MM:SS)
+            filters: FilterSpec from build_filters
+            fmt: "csv", "xlsx" or "parquet"
+        
+        Returns:
+            The queued ExportJob (poll it with get)
+        
+        Raises:
+            ValueError: If fmt is unknown
+        """
+        if fmt not in FORMAT_FILES:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.cleanup()
+        job_id = uuid.uuid4().hex[:12]
+        job = ExportJob(
+            id=job_id,
+            fmt=fmt,
+            path=os.path.join(self.export_dir, f"{job_id}{FORMAT_FILES[fmt][0]}"),
+            start_str=start_str,
+            end_str=end_str,
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+        self._executor.submit(export_rows, job, engine, filters)
+        logger.info(f"Export {job_id} queued: {fmt}, {start_str} -> {end_str}")
+        return job
+    
+    def get(self, job_id: Optional[str]) -> Optional[ExportJob]:
+        """
+        Look an export up by id.
+        
+        Args:
+            job_id: ExportJob.id
+        
+        Returns:
+            The ExportJob, or None if unknown or already cleaned up
+        """
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+    
+    def cleanup(self) -> None:
+        """Forget finished exports older than file_ttl and delete their files."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_at is not None and now - job.finished_at > self.file_ttl
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+
+
+@st.cache_resource
+def get_export_manager() -> ExportManager:
+    """
+    Get the process-wide export manager.
+    
+    Returns:
+        ExportManager instance
+    """
+    return ExportManager()
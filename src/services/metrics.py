@@ -0,0 +1,177 @@
+"""
+Metrics module.
+Derived metrics (growth, AOV, share) computed with NumPy from raw additive
+aggregates: revenue sum, distinct orders and quantity per row of any
+breakdown, for the current and the comparison period.
+
+Zero-division rules are the ones of the SQL CASE expressions they replace
+(GET_ORDER_REVENUE_AOV.sql, GET_BRAND_PERFORMACE.sql, get_Quantity.sql):
+- growth: previous == 0 -> 100 if current > 0 else 0
+- AOV: 0 when orders == 0
+- AOV growth: 0 when the previous AOV is 0
+- share: 0 when the total is 0
+
+All functions accept scalars, arrays or Series and return float64 arrays
+(0-d arrays for scalar input; use float() to unwrap).
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Additive aggregates a breakdown frame may carry; metrics are derived from these
+MEASURES = ("Revenue", "Orders", "Quantity")
+# Column order of the KPI row (same as GET_ORDER_REVENUE_AOV.sql)
+KPI_COLUMNS = [
+    "Revenue", "Orders", "Quantity", "AOV",
+    "RevenueGrowth", "OrdersGrowth", "QuantityGrowth", "AovGrowth",
+]
+
+
+def _as_float(values) -> np.ndarray:
+    """float64 array with NaN (SQL NULL sums) treated as 0."""
+    return np.nan_to_num(np.asarray(values, dtype="float64"), nan=0.0)
+
+
+def growth(current, previous) -> np.ndarray:
+    """
+    Growth % of current over previous.
+    
+    Args:
+        current: Current period values
+        previous: Comparison period values
+    
+    Returns:
+        (current - previous) / previous * 100; 100 where previous is 0 and
+        current > 0, 0 where both are 0 (or current < 0 with previous 0)
+    """
+    curr = _as_float(current)
+    prev = _as_float(previous)
+    safe_prev = np.where(prev == 0, 1.0, prev)
+    return np.where(
+        prev == 0,
+        np.where(curr > 0, 100.0, 0.0),
+        (curr - prev) / safe_prev * 100,
+    )
+
+
+def aov(revenue, orders) -> np.ndarray:
+    """
+    Average order value.
+    
+    Args:
+        revenue: Revenue sums
+        orders: Distinct order counts
+    
+    Returns:
+        revenue / orders, 0 where orders is 0
+    """
+    rev = _as_float(revenue)
+    count = _as_float(orders)
+    return np.where(count == 0, 0.0, rev / np.where(count == 0, 1.0, count))
+
+
+def aov_growth(curr_revenue, curr_orders, prev_revenue, prev_orders) -> np.ndarray:
+    """
+    Growth % of AOV.
+    
+    Args:
+        curr_revenue: Current period revenue
+        curr_orders: Current period orders
+        prev_revenue: Comparison period revenue
+        prev_orders: Comparison period orders
+    
+    Returns:
+        (AOV - previous AOV) / previous AOV * 100, 0 where the previous AOV is 0
+    """
+    curr_aov = aov(curr_revenue, curr_orders)
+    prev_aov = aov(prev_revenue, prev_orders)
+    safe_prev = np.where(prev_aov == 0, 1.0, prev_aov)
+    return np.where(prev_aov == 0, 0.0, (curr_aov - prev_aov) / safe_prev * 100)
+
+
+def share(values, decimals: Optional[int] = None) -> np.ndarray:
+    """
+    Percent share of each value in the total.
+    
+    Args:
+        values: Additive values (e.g. revenue per brand)
+        decimals: Round to this many decimals (None = no rounding)
+    
+    Returns:
+        values / sum(values) * 100, all 0 if the total is 0
+    """
+    vals = _as_float(values)
+    total = vals.sum()
+    result = vals / total * 100 if total else np.zeros_like(vals)
+    return np.round(result, decimals) if decimals is not None else result
+
+
+def with_share(
+    df: pd.DataFrame,
+    column: str = "Revenue",
+    name: Optional[str] = None,
+    decimals: Optional[int] = 1,
+) -> pd.DataFrame:
+    """
+    Add the percent share of a column (e.g. RevenuePercent) to a breakdown.
+    
+    Args:
+        df: Breakdown with one row per group
+        column: Additive column to take shares of
+        name: Output column (default: f"{column}Percent")
+        decimals: Rounding (1 like the former SQL ROUND(..., 1))
+    
+    Returns:
+        Copy of df with the share column
+    """
+    out = df.copy()
+    out[name or f"{column}Percent"] = share(out[column], decimals)
+    return out
+
+
+def compare_periods(
+    current: pd.DataFrame,
+    previous: pd.DataFrame,
+    keys: Sequence[str] = (),
+) -> pd.DataFrame:
+    """
+    Join current and comparison aggregates of a breakdown and derive metrics.
+    Groups present in only one period count as 0 in the other.
+    
+    Args:
+        current: Current period aggregates (keys + any of Revenue, Orders, Quantity)
+        previous: Comparison period aggregates with the same columns
+        keys: Breakdown columns (empty for a single totals row)
+    
+    Returns:
+        DataFrame with keys, the current measures, AOV (when Revenue and
+        Orders are present) and <Measure>Growth / AovGrowth columns
+    """
+    keys = list(keys)
+    measures = [m for m in MEASURES if m in current.columns]
+    
+    if keys:
+        merged = current[keys + measures].merge(
+            previous[keys + measures], on=keys, how="outer", suffixes=("", "_prev")
+        )
+    else:
+        merged = current[measures].reset_index(drop=True).head(1).copy()
+        prev_row = previous[measures].reset_index(drop=True).head(1)
+        for m in measures:
+            merged[f"{m}_prev"] = prev_row[m].to_numpy() if len(prev_row) else 0.0
+    
+    out = merged[keys].copy() if keys else pd.DataFrame(index=merged.index)
+    for m in measures:
+        out[m] = _as_float(merged[m])
+    if "Revenue" in measures and "Orders" in measures:
+        out["AOV"] = aov(merged["Revenue"], merged["Orders"])
+    for m in measures:
+        out[f"{m}Growth"] = growth(merged[m], merged[f"{m}_prev"])
+    if "Revenue" in measures and "Orders" in measures:
+        out["AovGrowth"] = aov_growth(
+            merged["Revenue"], merged["Orders"], merged["Revenue_prev"], merged["Orders_prev"]
+        )
+    return out
+
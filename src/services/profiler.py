@@ -0,0 +1,228 @@
+"""
+Query profiler module.
+Records, for every dataset fetched during a render, the query id, wall time,
+server time, rows, result bytes and cache outcome (optionally EXPLAIN output).
+
+The active RenderProfile lives in a contextvar: page renders open one with
+profile_render(), fetch_data() adds records to it, and worker threads started
+through DataContext run in a copy of the caller's context so their queries land
+in the same profile. Server time is the time spent inside cursor.execute,
+measured with SQLAlchemy cursor events.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import Engine, event
+
+import config
+from src.logger import get_logger
+from src.utils.query_manager import CompiledQuery
+
+logger = get_logger(__name__)
+
+HISTORY_KEY = "profiler_history"
+EXPLAIN_KEY = "profiler_explain"
+
+
+@dataclass
+class QueryRecord:
+    """Profile of one dataset fetch."""
+    
+    query_id: str
+    start_ms: float = 0.0  # Offset from the start of the render
+    wall_ms: float = 0.0
+    server_ms: Optional[float] = None
+    rows: int = 0
+    nbytes: int = 0
+    cache: str = "miss"  # "memory", "disk", "stale", "miss", "store" or "error"
+    data_as_of: Optional[float] = None  # When the result was read from the database (epoch)
+    thread: str = ""
+    explain: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class RenderProfile:
+    """All query records of one script run of one page."""
+    
+    page: str
+    explain: bool = False
+    started_at: datetime = field(default_factory=datetime.now)
+    total_ms: float = 0.0
+    records: List[QueryRecord] = field(default_factory=list)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    
+    def add(self, record: QueryRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Records as a DataFrame (one row per query, ordered by start)."""
+        rows = [
+            {key: value for key, value in asdict(record).items() if key != "explain"}
+            for record in self.records
+        ]
+        if not rows:
+            columns = [name for name in QueryRecord.__dataclass_fields__ if name != "explain"]
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(rows).sort_values("start_ms", ignore_index=True)
+    
+    def data_as_of(self) -> Optional[float]:
+        """Read time of the oldest result shown by this render (None if unknown)."""
+        times = [r.data_as_of for r in self.records if r.data_as_of is not None]
+        return min(times) if times else None
+    
+    def serves_stale(self) -> bool:
+        """True if any result came from a stale cache entry (refresh running)."""
+        return any(r.cache == "stale" for r in self.records)
+    
+    def summary(self) -> Dict[str, Any]:
+        """One-line summary used by the session history table."""
+        return {
+            "page": self.page,
+            "started_at": self.started_at.strftime("%H:%M:%S"),
+            "total_ms": round(self.total_ms, 1),
+            "queries": len(self.records),
+            "cache_hits": sum(r.cache in ("memory", "disk", "stale") for r in self.records),
+            "db_ms": round(sum(r.wall_ms for r in self.records if r.cache == "miss"), 1),
+            "rows": sum(r.rows for r in self.records),
+        }
+
+
+_current_profile: contextvars.ContextVar[Optional[RenderProfile]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+# Cursor time accumulated by the query currently running in this context
+_server_time: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "server_time", default=None
+)
+_instrument_lock = threading.Lock()
+
+
+def current_profile() -> Optional[RenderProfile]:
+    """The RenderProfile of the running render, or None outside profile_render()."""
+    return _current_profile.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info["profiler_t0"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop("profiler_t0", None)
+    server_time = _server_time.get()
+    if started is not None and server_time is not None:
+        server_time.append((time.perf_counter() - started) * 1000)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the cursor timing listeners to an engine (once per engine)."""
+    with _instrument_lock:
+        if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def profile_render(page: str) -> Iterator[RenderProfile]:
+    """
+    Profile one page render and append it to the session history.
+    Renders that fetched nothing are not kept.
+    
+    Args:
+        page: Page key (config.SIDEBAR_MENU)
+    
+    Yields:
+        The RenderProfile collecting this render's queries
+    """
+    profile = RenderProfile(page=page, explain=bool(st.session_state.get(EXPLAIN_KEY, False)))
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        profile.total_ms = (time.perf_counter() - profile._t0) * 1000
+        if profile.records:
+            history = st.session_state.setdefault(HISTORY_KEY, [])
+            history.append(profile)
+            del history[:-config.PROFILER_HISTORY_SIZE]
+
+
+@contextmanager
+def profile_query(query_id: str) -> Iterator[Optional[QueryRecord]]:
+    """
+    Time one dataset fetch and add it to the current profile.
+    The caller fills rows / nbytes / cache on the yielded record.
+    
+    Args:
+        query_id: Query identifier shown on the diagnostics page
+    
+    Yields:
+        QueryRecord, or None when no render is being profiled
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield None
+        return
+    
+    record = QueryRecord(
+        query_id=query_id,
+        start_ms=(time.perf_counter() - profile._t0) * 1000,
+        thread=threading.current_thread().name,
+    )
+    server_time: List[float] = []
+    token = _server_time.set(server_time)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception:
+        record.cache = "error"
+        raise
+    finally:
+        _server_time.reset(token)
+        record.wall_ms = (time.perf_counter() - started) * 1000
+        if server_time:
+            record.server_ms = sum(server_time)
+        profile.add(record)
+
+
+def explain_query(
+    engine: Engine,
+    query: Union[str, CompiledQuery],
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Run EXPLAIN for a query.
+    
+    Args:
+        engine: SQLAlchemy Engine
+        query: CompiledQuery, or SQL query string (%s placeholders)
+        params: Named parameters dict or parameters tuple (as for fetch_data)
+    
+    Returns:
+        EXPLAIN rows as dictionaries, or None if EXPLAIN failed
+    """
+    try:
+        if isinstance(query, CompiledQuery):
+            statement = query.explain_statement()
+        else:
+            statement = f"EXPLAIN {query.rstrip().rstrip(';')}"
+        explain_df = pd.read_sql(statement, engine, params=params)
+        return explain_df.to_dict(orient="records")
+    except Exception as e:
+        logger.warning(f"EXPLAIN failed: {e}")
+        return None
+
+
+def get_history() -> List[RenderProfile]:
+    """Profiles of this session's recent renders, oldest first."""
+    return st.session_state.get(HISTORY_KEY, [])
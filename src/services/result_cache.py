@@ -0,0 +1,576 @@
+"""
+Result cache module.
+Two-tier cache for query results shared by all sessions of the server process:
+
+- memory: LRU bounded by the total stored bytes (RESULT_CACHE_MEMORY_MAX_MB)
+- disk: the same payloads under RESULT_CACHE_DIR, survives restarts
+  (bounded by RESULT_CACHE_DISK_MAX_MB, oldest entries removed first)
+
+Entries are stored encoded, not as DataFrames: an Arrow IPC stream compressed
+with RESULT_CACHE_COMPRESSION (lz4 / zstd / none), decoded on every read. The
+decoded columns are fresh, writable arrays per read (no defensive copy), so
+callers may edit a returned frame in place. Frames Arrow cannot encode
+(mixed-type object columns) are pickled.
+
+Entries are keyed by (query id, normalized params) and carry their own TTLs,
+with a stale-while-revalidate policy:
+
+- before the soft TTL: fresh hit
+- between the soft and the hard TTL: the stale result is returned at once and
+  one background refresh per key is started (revalidate)
+- past the hard TTL: miss, the caller waits for the database
+"""
+
+import contextvars
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import config
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_cache_key(query_id: str, params: Optional[Union[Tuple, Dict[str, Any]]] = None) -> str:
+    """
+    Build a cache key from a query id and its parameters.
+    
+    Args:
+        query_id: Stable query identifier (see data_service.fetch_data)
+        params: Positional parameters tuple or named parameters dict
+            (order-independent; list values such as filter binds are
+            treated as tuples); None and () are equivalent
+    
+    Returns:
+        Hex digest usable as a file name
+    """
+    if isinstance(params, dict):
+        params = tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in params.items()
+        ))
+    raw = repr((query_id, tuple(params or ())))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def make_query_key(
+    sql: str,
+    params: Optional[Union[Tuple, Dict[str, Any]]] = None,
+    query_id: Optional[str] = None,
+) -> str:
+    """
+    Cache key of a query result, shared by the sync and async fetch paths.
+    A digest of the SQL text is always included, so rollup and raw variants
+    or different filter shapes of one query id never share an entry.
+    
+    Args:
+        sql: Final SQL text
+        params: Query parameters (see make_cache_key)
+        query_id: Readable query name (e.g. a QUERY_FILES key)
+    
+    Returns:
+        Hex digest usable as a file name
+    """
+    digest = hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+    return make_cache_key(f"{query_id or 'sql'}:{digest}", params)
+
+
+# Set by refreshing(): fetches skip cache reads and overwrite the entry
+_refresh = contextvars.ContextVar("result_cache_refresh", default=False)
+
+
+@contextmanager
+def refreshing() -> Iterator[None]:
+    """
+    Make fetches in this context bypass cache reads and store fresh results.
+    Used by the cache warmer to renew entries before they expire; worker
+    threads started through DataContext inherit the setting.
+    """
+    token = _refresh.set(True)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+
+def refresh_requested() -> bool:
+    """True inside refreshing()."""
+    return _refresh.get()
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memory footprint of a DataFrame, including object (string) payloads."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# Payload format -> disk file extension
+FORMATS = {"arrow": ".arrow", "pickle": ".pkl"}
+
+
+def encode_frame(df: pd.DataFrame, compression: Optional[str] = None) -> Tuple[pa.Buffer, str]:
+    """
+    Serialize a DataFrame for the cache.
+    
+    Args:
+        df: Frame to encode
+        compression: Arrow IPC buffer codec ("lz4", "zstd"; None or "none" = raw)
+    
+    Returns:
+        (payload, format): an Arrow IPC stream ("arrow"), or pickle bytes
+        ("pickle") for frames Arrow cannot represent
+    """
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        logger.debug(f"Result cache falls back to pickle: {e}")
+        return pa.py_buffer(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)), "pickle"
+    
+    options = pa.ipc.IpcWriteOptions(
+        compression=None if compression in (None, "none") else compression
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue(), "arrow"
+
+
+def decode_frame(payload: pa.Buffer, fmt: str) -> pd.DataFrame:
+    """
+    Rebuild a DataFrame from encode_frame output.
+    Columns are copied out of the Arrow buffers into writable pandas blocks
+    (no zero-copy views: those are read-only and in-place edits would fail).
+    
+    Args:
+        payload: Encoded frame
+        fmt: "arrow" or "pickle"
+    
+    Returns:
+        The DataFrame (dtypes, categories and index as encoded)
+    """
+    if fmt == "pickle":
+        return pickle.loads(payload)
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+@dataclass
+class CacheEntry:
+    """One cached result, stored encoded (see encode_frame)."""
+    
+    payload: pa.Buffer
+    fmt: str  # "arrow" or "pickle"
+    frame_bytes: int  # Size of the decoded DataFrame (frame_nbytes)
+    rows: int
+    stored_at: float
+    stale_at: float  # Soft TTL: served stale and revalidated after this
+    expires_at: float  # Hard TTL: not served after this
+    label: str = ""  # Query id, for the diagnostics entry table
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory by the entry."""
+        return self.payload.size
+
+
+@dataclass
+class CacheHit:
+    """Result of a successful lookup."""
+    
+    df: pd.DataFrame
+    tier: str  # "memory" or "disk"
+    stored_at: float  # When the result was read from the database (epoch seconds)
+    stale: bool  # Past the soft TTL: the caller should revalidate
+
+
+class ResultCache:
+    """Thread-safe memory LRU + disk cache of DataFrames."""
+    
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+        revalidate_workers: int = 2,
+        compression: Optional[str] = "lz4",
+    ):
+        """
+        Args:
+            memory_max_bytes: Budget of the memory tier
+            disk_dir: Directory of the disk tier (None disables it)
+            disk_max_bytes: Budget of the disk tier
+            revalidate_workers: Background refreshes run at the same time
+            compression: Codec of the Arrow payloads ("lz4", "zstd", None)
+        """
+        self.memory_max_bytes = memory_max_bytes
+        self.compression = compression
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (path, stored_at, stale_at, expires_at, file size); the format
+        # follows from the extension (FORMATS)
+        self._disk: Dict[str, Tuple[str, float, float, float, int]] = {}
+        self._lock = threading.Lock()
+        self.revalidate_workers = revalidate_workers
+        self._revalidating: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "revalidations": 0,
+            "revalidation_errors": 0,
+        }
+        if disk_dir:
+            self._scan_disk()
+    
+    def _scan_disk(self) -> None:
+        """Index entries left on disk by a previous process, removing expired ones."""
+        os.makedirs(self.disk_dir, exist_ok=True)
+        now = time.time()
+        for name in os.listdir(self.disk_dir):
+            stem, ext = os.path.splitext(name)
+            if ext not in FORMATS.values():
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                # {key}-{stale_at}-{expires_at}.arrow (older files: .pkl, {key}-{expires_at}.pkl)
+                key, *times = stem.split("-")
+                stale_at, expires_at = float(times[0]), float(times[-1])
+                if expires_at <= now:
+                    os.remove(path)
+                    continue
+                self._disk[key] = (
+                    path, os.path.getmtime(path), stale_at, expires_at, os.path.getsize(path)
+                )
+            except (ValueError, OSError):
+                logger.warning(f"Ignoring unexpected file in result cache: {name}")
+        logger.info(f"Result cache disk tier: {len(self._disk)} entries in {self.disk_dir}")
+    
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Look a key up in memory, then on disk (disk hits are promoted to memory).
+        
+        Args:
+            key: Key from make_cache_key
+        
+        Returns:
+            Cached DataFrame (possibly stale), or None on miss / expiry
+        """
+        hit = self.lookup(key)
+        return hit.df if hit is not None else None
+    
+    def lookup(self, key: str) -> Optional[CacheHit]:
+        """
+        Same as get, but also report the tier, the age and the staleness.
+        
+        Args:
+            key: Key from make_cache_key
+        
+        Returns:
+            CacheHit with the decoded DataFrame, or None on miss / expiry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count_hit(entry, "memory", now)
+                else:
+                    self._drop_memory(key)
+                    self._counters["expired"] += 1
+                    entry = None
+            disk_entry = self._disk.get(key) if entry is None else None
+        
+        if entry is not None:
+            # Decode outside the lock: the payload is immutable
+            df = decode_frame(entry.payload, entry.fmt)
+            return CacheHit(df, "memory", entry.stored_at, entry.stale_at <= now)
+        
+        if disk_entry is not None:
+            path, stored_at, stale_at, expires_at, _ = disk_entry
+            if expires_at > now:
+                try:
+                    fmt = next(f for f, ext in FORMATS.items() if path.endswith(ext))
+                    with pa.OSFile(path) as source:
+                        payload = source.read_buffer()
+                    df = decode_frame(payload, fmt)
+                except Exception as e:
+                    logger.warning(f"Unreadable result cache file {path}: {e}")
+                    self._drop_disk(key)
+                else:
+                    entry = CacheEntry(
+                        payload, fmt, frame_nbytes(df), len(df), stored_at, stale_at, expires_at
+                    )
+                    with self._lock:
+                        self._put_memory(key, entry)
+                        self._count_hit(entry, "disk", now)
+                    return CacheHit(df, "disk", stored_at, entry.stale_at <= now)
+            else:
+                self._drop_disk(key)
+                with self._lock:
+                    self._counters["expired"] += 1
+        
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+    
+    def _count_hit(self, entry: CacheEntry, tier: str, now: float) -> None:
+        """Count a memory / disk / stale hit (lock held)."""
+        stale = entry.stale_at <= now
+        self._counters["stale_hits" if stale else f"{tier}_hits"] += 1
+    
+    def put(
+        self,
+        key: str,
+        df: pd.DataFrame,
+        ttl: int,
+        hard_ttl: Optional[int] = None,
+        label: str = "",
+    ) -> None:
+        """
+        Store a result in both tiers (encoded, so later edits of df do not
+        reach the cache).
+        
+        Args:
+            key: Key from make_cache_key
+            df: Result to cache
+            ttl: Soft TTL: seconds before the entry is stale
+            hard_ttl: Seconds before the entry is no longer served at all
+                (default: ttl, i.e. no stale window)
+            label: Readable name of the entry (query id) for entries()
+        """
+        payload, fmt = encode_frame(df, self.compression)
+        now = time.time()
+        entry = CacheEntry(
+            payload, fmt, frame_nbytes(df), len(df),
+            now, now + ttl, now + max(ttl, hard_ttl or 0), label,
+        )
+        with self._lock:
+            self._put_memory(key, entry)
+        if self.disk_dir:
+            self._put_disk(key, entry)
+    
+    def claim_revalidation(self, key: str) -> bool:
+        """
+        Mark a key as being refreshed; only the first caller gets True.
+        The claimer must call release_revalidation when done.
+        
+        Args:
+            key: Key from make_cache_key
+        
+        Returns:
+            True if the caller should refresh the entry
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            self._counters["revalidations"] += 1
+            return True
+    
+    def release_revalidation(self, key: str, failed: bool = False) -> None:
+        """
+        End a refresh started with claim_revalidation.
+        
+        Args:
+            key: Key from make_cache_key
+            failed: The refresh failed (the stale entry is kept until its hard TTL)
+        """
+        with self._lock:
+            self._revalidating.discard(key)
+            if failed:
+                self._counters["revalidation_errors"] += 1
+    
+    def revalidate(
+        self,
+        key: str,
+        loader: Callable[[], pd.DataFrame],
+        ttl: int,
+        hard_ttl: Optional[int] = None,
+        label: str = "",
+    ) -> bool:
+        """
+        Refresh a stale entry on a background thread, once per key at a time.
+        
+        Args:
+            key: Key from make_cache_key
+            loader: Reads the result from the database (raises on failure)
+            ttl: Soft TTL of the refreshed entry
+            hard_ttl: Hard TTL of the refreshed entry
+            label: Readable name of the entry (see put)
+        
+        Returns:
+            True if a refresh was started, False if one is already running
+        """
+        if not self.claim_revalidation(key):
+            return False
+        
+        def refresh() -> None:
+            failed = False
+            try:
+                self.put(key, loader(), ttl, hard_ttl, label)
+            except Exception as e:
+                failed = True
+                logger.warning(f"Background refresh of {key[:16]} failed: {e}")
+            finally:
+                self.release_revalidation(key, failed)
+        
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.revalidate_workers, thread_name_prefix="cache_revalidate"
+                )
+            executor = self._executor
+        executor.submit(refresh)
+        return True
+    
+    def _put_memory(self, key: str, entry: CacheEntry) -> None:
+        """Insert into the LRU and evict least recently used entries (lock held)."""
+        if key in self._memory:
+            self._drop_memory(key)
+        if entry.nbytes > self.memory_max_bytes:
+            # Larger than the whole budget: keep it on disk only
+            return
+        self._memory[key] = entry
+        self._memory_bytes += entry.nbytes
+        while self._memory_bytes > self.memory_max_bytes:
+            oldest = next(iter(self._memory))
+            self._drop_memory(oldest)
+            self._counters["memory_evictions"] += 1
+    
+    def _drop_memory(self, key: str) -> None:
+        entry = self._memory.pop(key)
+        self._memory_bytes -= entry.nbytes
+    
+    def _put_disk(self, key: str, entry: CacheEntry) -> None:
+        """Write one entry atomically and trim the disk tier to its budget."""
+        self._drop_disk(key)
+        path = os.path.join(
+            self.disk_dir,
+            f"{key}-{int(entry.stale_at)}-{int(entry.expires_at)}{FORMATS[entry.fmt]}",
+        )
+        tmp_path = f"{path}.tmp"
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                sink.write(entry.payload)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write result cache file {path}: {e}")
+            return
+        
+        with self._lock:
+            self._disk[key] = (
+                path, entry.stored_at, entry.stale_at, entry.expires_at, os.path.getsize(path)
+            )
+            total = sum(disk_entry[-1] for disk_entry in self._disk.values())
+            # Oldest first
+            victims = sorted(self._disk, key=lambda k: self._disk[k][1])
+        for victim in victims:
+            if total <= self.disk_max_bytes:
+                break
+            total -= self._disk.get(victim, ("", 0.0, 0.0, 0.0, 0))[-1]
+            self._drop_disk(victim)
+            with self._lock:
+                self._counters["disk_evictions"] += 1
+    
+    def _drop_disk(self, key: str) -> None:
+        with self._lock:
+            disk_entry = self._disk.pop(key, None)
+        if disk_entry is not None:
+            try:
+                os.remove(disk_entry[0])
+            except FileNotFoundError:
+                pass
+    
+    def clear(self) -> None:
+        """Remove every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            keys = list(self._disk)
+        for key in keys:
+            self._drop_disk(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of counters and tier sizes.
+        
+        Returns:
+            Dictionary with hit/miss/eviction counters, entry counts and bytes
+        """
+        with self._lock:
+            frame_bytes = sum(entry.frame_bytes for entry in self._memory.values())
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_bytes_per_entry": self._memory_bytes // max(len(self._memory), 1),
+                # Decoded size of the memory entries over their stored size
+                "compression_ratio": (
+                    round(frame_bytes / self._memory_bytes, 2) if self._memory_bytes else 0.0
+                ),
+                "disk_entries": len(self._disk),
+                "disk_bytes": sum(disk_entry[-1] for disk_entry in self._disk.values()),
+                "revalidating": len(self._revalidating),
+            }
+    
+    def entries(self) -> pd.DataFrame:
+        """
+        Memory tier entries, most recently used first.
+        
+        Returns:
+            DataFrame with label, key, format, rows, stored bytes, decoded
+            DataFrame bytes, age and staleness of every entry
+        """
+        now = time.time()
+        with self._lock:
+            rows = [
+                {
+                    "label": entry.label,
+                    "key": key[:12],
+                    "format": entry.fmt,
+                    "rows": entry.rows,
+                    "stored_bytes": entry.nbytes,
+                    "frame_bytes": entry.frame_bytes,
+                    "age_s": round(now - entry.stored_at),
+                    "stale": entry.stale_at <= now,
+                }
+                for key, entry in reversed(self._memory.items())
+            ]
+        return pd.DataFrame(rows, columns=[
+            "label", "key", "format", "rows", "stored_bytes", "frame_bytes", "age_s", "stale",
+        ])
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """
+    Get the process-wide ResultCache.
+    
+    Returns:
+        ResultCache sized from config (disk tier only if RESULT_CACHE_DISK_ENABLED)
+    """
+    return ResultCache(
+        memory_max_bytes=config.RESULT_CACHE_MEMORY_MAX_MB * 1024 * 1024,
+        disk_dir=config.RESULT_CACHE_DIR if config.RESULT_CACHE_DISK_ENABLED else None,
+        disk_max_bytes=config.RESULT_CACHE_DISK_MAX_MB * 1024 * 1024,
+        revalidate_workers=config.CACHE_REVALIDATE_MAX_WORKERS,
+        compression=config.RESULT_CACHE_COMPRESSION,
+    )
@@ -0,0 +1,373 @@
+"""
+Hourly rollup subsystem.
+Builds and incrementally refreshes hour-grain summary tables in MySQL and
+routes dataset queries to them when the requested dimensions are covered.
+
+Distinct order counts are stored per cell and summed when reading, which is
+exact as long as one order falls into a single cell. An order lives in one
+hour, shop, platform, status and province, but its lines can span several
+brands, so tables keyed by brand are only used when the query groups by brand
+or pins it to a single value.
+
+Run the refresh job with:
+    python -m src.services.rollups
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+from sqlalchemy import Connection, Engine, text
+
+import config
+from src.logger import get_logger
+from src.utils.query_manager import CompiledQuery, compile_query
+from src.utils.sql_helpers import FilterSpec
+
+logger = get_logger(__name__)
+
+# Refresh watermarks of rollups and other incremental jobs (dimension catalog)
+WATERMARK_TABLE = "rollup_watermark"
+WATERMARK_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} ("
+    "RollupName VARCHAR(64) NOT NULL PRIMARY KEY, "
+    "Watermark DATETIME NULL, "
+    "RefreshedAt DATETIME NULL)"
+)
+
+
+@dataclass(frozen=True)
+class RollupTable:
+    """Definition of one hour-grain summary table."""
+    
+    name: str
+    dimensions: Tuple[str, ...]
+    measures: Tuple[str, ...]
+    refresh_query_key: str
+    # Dimensions along which one order can be split across several cells
+    split_dimensions: Tuple[str, ...] = ()
+
+
+ROLLUP_TABLES: Dict[str, RollupTable] = {
+    table.name: table
+    for table in (
+        RollupTable(
+            name="rollup_catalogue_orders_hourly",
+            dimensions=("PlatformName", "ShopName", "StatusName", "Province"),
+            measures=("Revenue", "Quantity", "Orders"),
+            refresh_query_key="rollup_refresh_catalogue",
+        ),
+        RollupTable(
+            name="rollup_catalogue_hourly",
+            dimensions=("brand", "PlatformName", "ShopName", "StatusName", "Province"),
+            measures=("Revenue", "Quantity", "Orders"),
+            refresh_query_key="rollup_refresh_catalogue",
+            split_dimensions=("brand",),
+        ),
+        RollupTable(
+            name="rollup_order_platform_hourly",
+            dimensions=("PlatformName",),
+            measures=("Revenue", "Orders"),
+            refresh_query_key="rollup_refresh_order",
+        ),
+        RollupTable(
+            name="rollup_order_hourly",
+            dimensions=("brand", "PlatformName"),
+            measures=("Revenue", "Orders"),
+            refresh_query_key="rollup_refresh_order",
+            split_dimensions=("brand",),
+        ),
+    )
+}
+
+_MEASURE_TYPES = {
+    "Revenue": "DECIMAL(20, 4) NULL",
+    "Quantity": "DECIMAL(20, 4) NULL",
+    "Orders": "INT NOT NULL",
+}
+
+
+@dataclass(frozen=True)
+class RollupRoute:
+    """How a dataset can be answered from rollups."""
+    
+    query_key: str
+    candidates: Tuple[str, ...]  # Rollup tables in order of preference
+    group_by: Tuple[str, ...]
+    applies_filters: bool = True
+
+
+# Dataset name -> route. Rollup queries keep the parameter order of the raw query.
+ROLLUP_ROUTES: Dict[str, RollupRoute] = {
+    "period_totals": RollupRoute(
+        "period_totals_rollup", ("rollup_catalogue_orders_hourly", "rollup_catalogue_hourly"), ()
+    ),
+    "trend": RollupRoute(
+        "trend_rollup", ("rollup_catalogue_orders_hourly", "rollup_catalogue_hourly"), ()
+    ),
+    "status": RollupRoute(
+        "status_rollup",
+        ("rollup_catalogue_orders_hourly", "rollup_catalogue_hourly"),
+        ("StatusName",),
+    ),
+    "province": RollupRoute(
+        "province_rollup",
+        ("rollup_catalogue_orders_hourly", "rollup_catalogue_hourly"),
+        ("Province",),
+    ),
+    # omisell_order queries ignore the filter selection
+    "revenue_brand_platform": RollupRoute(
+        "revenue_brand_platform_rollup", ("rollup_order_hourly",),
+        ("brand", "PlatformName"), applies_filters=False,
+    ),
+    "revenue_by_brand": RollupRoute(
+        "revenue_by_brand_rollup", ("rollup_order_hourly",),
+        ("brand",), applies_filters=False,
+    ),
+    "revenue_by_platform": RollupRoute(
+        "revenue_by_platform_rollup", ("rollup_order_platform_hourly", "rollup_order_hourly"),
+        ("PlatformName",), applies_filters=False,
+    ),
+}
+
+
+def _table_covers(
+    table: RollupTable,
+    group_by: Tuple[str, ...],
+    selection: Dict[str, list],
+) -> bool:
+    """
+    Check that a rollup table can answer a query exactly.
+    
+    Args:
+        table: Candidate rollup table
+        group_by: Dimensions the query groups by
+        selection: Filter selection (column -> values)
+    
+    Returns:
+        True if all dimensions are present and distinct order counts stay exact
+    """
+    needed = set(group_by) | set(selection)
+    if not needed.issubset(table.dimensions):
+        return False
+    for dimension in table.split_dimensions:
+        if dimension not in group_by and len(selection.get(dimension, [])) != 1:
+            return False
+    return True
+
+
+def _is_hour_aligned(start_date_str: str, end_date_str: str) -> bool:
+    """Rollups hold whole hours: start must be HH:00:00 and end HH:59:59."""
+    return start_date_str.endswith(":00:00") and end_date_str.endswith(":59:59")
+
+
+WATERMARKS_QUERY = f"SELECT RollupName, Watermark FROM {WATERMARK_TABLE}"
+
+
+@st.cache_data(ttl=config.CACHE_TTL_ROLLUP_STATE)
+def get_rollup_watermarks(_engine: Engine) -> Dict[str, datetime]:
+    """
+    Load the refresh watermark of every rollup table.
+    
+    Args:
+        _engine: SQLAlchemy Engine (prefixed with _ to prevent Streamlit hashing)
+    
+    Returns:
+        Dictionary of table name -> watermark, empty if rollups were never built
+    """
+    try:
+        with _engine.connect() as conn:
+            rows = conn.execute(text(WATERMARKS_QUERY)).fetchall()
+        return {name: watermark for name, watermark in rows if watermark is not None}
+    except Exception as e:
+        logger.warning(f"Rollup watermarks unavailable: {e}")
+        return {}
+
+
+def resolve_rollup_query(
+    dataset: str,
+    start_date_str: str,
+    end_date_str: str,
+    filters: FilterSpec,
+    engine: Optional[Engine],
+    watermarks: Optional[Dict[str, datetime]] = None,
+    **fields: str,
+) -> Optional[CompiledQuery]:
+    """
+    Pick a rollup query for a dataset if rollups can answer it.
+    
+    Args:
+        dataset: Dataset name (key of ROLLUP_ROUTES, e.g. "trend")
+        start_date_str: Range start (YYYY-MM-DD HH:MM:SS)
+        end_date_str: Range end (YYYY-MM-DD HH:MM:SS)
+        filters: FilterSpec from build_filters
+        engine: SQLAlchemy Engine (used to load the watermarks)
+        watermarks: Already loaded rollup watermarks (async path); engine may
+            then be None
+        **fields: Extra template fields of the rollup query (e.g. unit)
+    
+    Returns:
+        CompiledQuery with the same named parameters as the raw query
+        (and the filter binds where the raw query applies filters),
+        or None if the raw tables must be queried
+    """
+    route = ROLLUP_ROUTES.get(dataset)
+    if not config.ROLLUP_ENABLED or route is None:
+        return None
+    if not _is_hour_aligned(start_date_str, end_date_str):
+        return None
+    
+    selection = filters.selection if route.applies_filters else {}
+    
+    if watermarks is None:
+        watermarks = get_rollup_watermarks(engine)
+    range_end = datetime.strptime(end_date_str, config.SQL_DATETIME_FORMAT)
+    fresh_after = datetime.now() - timedelta(minutes=config.ROLLUP_MAX_LAG_MINUTES)
+    
+    for name in route.candidates:
+        watermark = watermarks.get(name)
+        if watermark is None or (watermark < range_end and watermark < fresh_after):
+            continue
+        if _table_covers(ROLLUP_TABLES[name], route.group_by, selection):
+            logger.debug(f"Routing {dataset} to rollup {name}")
+            return compile_query(
+                route.query_key, filters if route.applies_filters else None, table=name, **fields
+            )
+    return None
+
+
+def read_watermark(engine: Engine, name: str) -> Optional[datetime]:
+    """
+    Read the stored watermark of an incremental job.
+    
+    Args:
+        engine: SQLAlchemy Engine
+        name: Job / rollup table name
+        
+    Returns:
+        Watermark datetime or None if the job never ran
+    """
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT Watermark FROM {WATERMARK_TABLE} WHERE RollupName = :name"),
+            {"name": name},
+        ).scalar()
+
+
+def write_watermark(conn: Connection, name: str, watermark: datetime) -> None:
+    """
+    Store the watermark of an incremental job (inside the caller's transaction).
+    
+    Args:
+        conn: Open SQLAlchemy Connection
+        name: Job / rollup table name
+        watermark: New watermark
+    """
+    conn.execute(
+        text(
+            f"INSERT INTO {WATERMARK_TABLE} (RollupName, Watermark, RefreshedAt) "
+            "VALUES (:name, :watermark, NOW()) "
+            "ON DUPLICATE KEY UPDATE Watermark = VALUES(Watermark), RefreshedAt = NOW()"
+        ),
+        {"name": name, "watermark": watermark},
+    )
+
+
+def _create_table_sql(table: RollupTable) -> str:
+    """Build CREATE TABLE IF NOT EXISTS statement for a rollup table."""
+    columns = ["HourStart DATETIME NOT NULL"]
+    columns += [f"{dimension} VARCHAR(255) NULL" for dimension in table.dimensions]
+    columns += [f"{measure} {_MEASURE_TYPES[measure]}" for measure in table.measures]
+    columns.append(f"KEY idx_{table.name}_hour (HourStart)")
+    return f"CREATE TABLE IF NOT EXISTS {table.name} (\n    " + ",\n    ".join(columns) + "\n)"
+
+
+def ensure_rollup_tables(engine: Engine) -> None:
+    """
+    Create rollup and watermark tables if they do not exist.
+    
+    Args:
+        engine: SQLAlchemy Engine
+    """
+    with engine.begin() as conn:
+        conn.execute(text(WATERMARK_DDL))
+        for table in ROLLUP_TABLES.values():
+            conn.execute(text(_create_table_sql(table)))
+
+
+def refresh_rollup(
+    table: RollupTable,
+    engine: Engine,
+    resync_hours: int = config.ROLLUP_RESYNC_HOURS,
+    until: Optional[datetime] = None,
+) -> None:
+    """
+    Incrementally rebuild one rollup table.
+    Rebuilds every hour from (watermark - resync_hours) up to `until`, one
+    DELETE + INSERT ... SELECT transaction per batch, so readers never see a
+    half-built window and late updates inside the window are picked up.
+    
+    Args:
+        table: Rollup table to refresh
+        engine: SQLAlchemy Engine
+        resync_hours: Hours behind the watermark to rebuild
+        until: Refresh up to this moment (default: now)
+    """
+    watermark = read_watermark(engine, table.name)
+    
+    if watermark is None:
+        window_start = datetime.strptime(config.ROLLUP_START_DATE, config.SQL_DATE_FORMAT)
+    else:
+        window_start = (watermark - timedelta(hours=resync_hours)).replace(
+            minute=0, second=0, microsecond=0
+        )
+    until = until or datetime.now()
+    
+    refresh = compile_query(
+        table.refresh_query_key, table=table.name, dimensions=", ".join(table.dimensions)
+    )
+    
+    batch_start = window_start
+    while batch_start < until:
+        batch_end = min(batch_start + timedelta(days=config.ROLLUP_BATCH_DAYS), until)
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {table.name} WHERE HourStart >= :start AND HourStart < :end"),
+                {"start": batch_start, "end": batch_end},
+            )
+            conn.execute(refresh.statement, refresh.bind({"start": batch_start, "end": batch_end}))
+        logger.info(f"Refreshed {table.name}: {batch_start} -> {batch_end}")
+        batch_start = batch_end
+    
+    with engine.begin() as conn:
+        write_watermark(conn, table.name, until)
+
+
+def refresh_rollups(engine: Engine) -> None:
+    """
+    Create (if needed) and refresh all rollup tables.
+    
+    Args:
+        engine: SQLAlchemy Engine
+    """
+    ensure_rollup_tables(engine)
+    until = datetime.now()
+    for table in ROLLUP_TABLES.values():
+        refresh_rollup(table, engine, until=until)
+    logger.info(f"Rollup refresh done up to {until}")
+
+
+def main() -> None:
+    """Refresh job entry point."""
+    from src.db.connection import create_db_engine
+    
+    engine = create_db_engine()
+    try:
+        refresh_rollups(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Local storage module initialization.
+"""
@@ -0,0 +1,385 @@
+"""
+Local columnar fact store.
+Keeps a Parquet copy of omisell_catalogue partitioned by day and syncs it
+incrementally from MySQL using a CreatedTime watermark.
+
+Layout:
+    {FACT_STORE_DIR}/omisell_catalogue/day=YYYY-MM-DD/part.parquet
+    {FACT_STORE_DIR}/omisell_catalogue/_watermark.json
+
+A range is only answered locally when the last sync reached its end, or ran
+less than FACT_STORE_MAX_LAG_MINUTES ago; a late or failed sync sends
+queries back to MySQL instead of serving incomplete data.
+
+Run the sync job with:
+    python -m src.store.fact_store
+"""
+
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pads
+import pyarrow.parquet as pq
+import streamlit as st
+from sqlalchemy import Engine
+
+import config
+from src.db.streaming import stream_query
+from src.logger import get_logger
+from src.utils.query_manager import CompiledQuery, compile_query
+
+logger = get_logger(__name__)
+
+# Columns kept in the store (order matches SYNC_CATALOGUE.sql)
+STORE_SCHEMA = pa.schema([
+    ("OmisellOrderNumber", pa.string()),
+    ("CreatedTime", pa.timestamp("us")),
+    ("brand", pa.string()),
+    ("PlatformName", pa.string()),
+    ("ShopName", pa.string()),
+    ("StatusName", pa.string()),
+    ("Province", pa.string()),
+    ("OriginalPrice", pa.float64()),
+    ("DiscountSeller", pa.float64()),
+    ("VoucherSeller", pa.float64()),
+    ("Quantity", pa.float64()),
+    ("Revenue", pa.float64()),
+])
+
+
+def _to_datetime(value: Union[str, datetime]) -> datetime:
+    """Parse SQL datetime strings (YYYY-MM-DD HH:MM:SS) used across data_service."""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, config.SQL_DATETIME_FORMAT)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Coerce a raw MySQL batch to STORE_SCHEMA dtypes.
+    pymysql returns DECIMAL as Decimal objects; without this every partition
+    would infer its own decimal precision and the dataset schema would not unify.
+    """
+    out = pd.DataFrame(index=df.index)
+    for field in STORE_SCHEMA:
+        column = df[field.name] if field.name in df.columns else pd.Series(None, index=df.index)
+        if pa.types.is_timestamp(field.type):
+            out[field.name] = pd.to_datetime(column)
+        elif pa.types.is_floating(field.type):
+            out[field.name] = pd.to_numeric(column, errors="coerce").astype("float64")
+        else:
+            out[field.name] = column.astype("string")
+    return out
+
+
+class FactStore:
+    """Day-partitioned Parquet copy of one fact table."""
+    
+    def __init__(self, root: str, table: str = "omisell_catalogue"):
+        """
+        Args:
+            root: Store root directory
+            table: Source table name (used as the sub-directory)
+        """
+        self.path = os.path.join(root, table)
+        self.watermark_file = os.path.join(self.path, "_watermark.json")
+    
+    def partition_path(self, day: date) -> str:
+        """Path of the Parquet file holding one day of rows."""
+        return os.path.join(self.path, f"day={day.isoformat()}", "part.parquet")
+    
+    def available_days(self) -> List[date]:
+        """Sorted list of days that have a partition on disk."""
+        if not os.path.isdir(self.path):
+            return []
+        days = []
+        for name in os.listdir(self.path):
+            if name.startswith("day=") and os.path.exists(
+                os.path.join(self.path, name, "part.parquet")
+            ):
+                days.append(date.fromisoformat(name[len("day="):]))
+        return sorted(days)
+    
+    def _read_state(self) -> Dict[str, str]:
+        """
+        Sync state ({"watermark": ..., "first_day": ..., "synced_until": ...}),
+        empty before the first sync.
+        """
+        try:
+            with open(self.watermark_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def read_watermark(self) -> Optional[datetime]:
+        """Latest CreatedTime synced so far, or None before the first sync."""
+        state = self._read_state()
+        return datetime.fromisoformat(state["watermark"]) if state else None
+    
+    def read_synced_until(self) -> Optional[datetime]:
+        """Moment the last successful sync pulled up to, or None before the first sync."""
+        state = self._read_state()
+        if not state:
+            return None
+        # State files written before synced_until was recorded: the watermark is a lower bound
+        return datetime.fromisoformat(state.get("synced_until", state["watermark"]))
+    
+    def _write_watermark(self, watermark: datetime, first_day: date, synced_until: datetime) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = f"{self.watermark_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "watermark": watermark.isoformat(),
+                    "first_day": first_day.isoformat(),
+                    "synced_until": synced_until.isoformat(),
+                },
+                f,
+            )
+        os.replace(tmp_path, self.watermark_file)
+    
+    def covers(
+        self,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        max_lag_minutes: int = config.FACT_STORE_MAX_LAG_MINUTES,
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Check whether the store holds the complete range [start, end].
+        
+        Args:
+            start: Range start (datetime or YYYY-MM-DD HH:MM:SS)
+            end: Range end (datetime or YYYY-MM-DD HH:MM:SS)
+            max_lag_minutes: A range reaching past the last sync is still
+                served if that sync ran less than this many minutes ago
+            now: Current time (default: datetime.now())
+        
+        Returns:
+            True if the store's first day is <= start and the last sync reached
+            end, or is recent enough (same rule as the rollup freshness check)
+        """
+        state = self._read_state()
+        if not state:
+            return False
+        if date.fromisoformat(state["first_day"]) > _to_datetime(start).date():
+            return False
+        synced_until = self.read_synced_until()
+        fresh_after = (now or datetime.now()) - timedelta(minutes=max_lag_minutes)
+        return synced_until >= _to_datetime(end) or synced_until >= fresh_after
+    
+    def write_day(self, day: date, df: pd.DataFrame) -> None:
+        """
+        Replace one day partition atomically (write temp file, then rename).
+        An empty frame removes the partition.
+        
+        Args:
+            day: Partition day
+            df: Rows for that day, already normalized to STORE_SCHEMA
+        """
+        if df.empty:
+            self._remove_day(day)
+            return
+        
+        writer = self._open_day(day)
+        writer.write_table(pa.Table.from_pandas(df, schema=STORE_SCHEMA, preserve_index=False))
+        self._commit_day(day, writer)
+    
+    def _remove_day(self, day: date) -> None:
+        path = self.partition_path(day)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def _open_day(self, day: date) -> pq.ParquetWriter:
+        """Open a writer on the temp file of a day partition."""
+        path = self.partition_path(day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return pq.ParquetWriter(f"{path}.tmp", STORE_SCHEMA, compression="zstd")
+    
+    def _commit_day(self, day: date, writer: pq.ParquetWriter) -> None:
+        """Close a day writer and move its temp file over the partition."""
+        writer.close()
+        path = self.partition_path(day)
+        os.replace(f"{path}.tmp", path)
+    
+    def _abort_day(self, day: date, writer: pq.ParquetWriter) -> None:
+        """Close a day writer and drop its temp file (partition left untouched)."""
+        writer.close()
+        os.remove(f"{self.partition_path(day)}.tmp")
+    
+    def load(
+        self,
+        start: Union[str, datetime],
+        end: Union[str, datetime],
+        columns: List[str],
+        selection: Optional[Dict[str, List[str]]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read rows with CreatedTime BETWEEN start AND end from the store.
+        Only partitions inside the range are opened; column projection and
+        filters are pushed down to the Parquet reader.
+        
+        Args:
+            start: Range start (datetime or YYYY-MM-DD HH:MM:SS)
+            end: Range end (datetime or YYYY-MM-DD HH:MM:SS)
+            columns: Columns to return
+            selection: Column name -> allowed values (same as FilterSpec.selection)
+        
+        Returns:
+            DataFrame with the requested columns
+        """
+        start_dt, end_dt = _to_datetime(start), _to_datetime(end)
+        paths = [
+            self.partition_path(day)
+            for day in self.available_days()
+            if start_dt.date() <= day <= end_dt.date()
+        ]
+        if not paths:
+            return STORE_SCHEMA.empty_table().select(columns).to_pandas()
+        
+        dataset = pads.dataset(paths, format="parquet", schema=STORE_SCHEMA)
+        ts_type = STORE_SCHEMA.field("CreatedTime").type
+        expression = (
+            (pads.field("CreatedTime") >= pa.scalar(start_dt, type=ts_type))
+            & (pads.field("CreatedTime") <= pa.scalar(end_dt, type=ts_type))
+        )
+        for column, values in (selection or {}).items():
+            expression = expression & pads.field(column).isin(list(values))
+        
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+    
+    def sync(
+        self,
+        engine: Engine,
+        resync_hours: int = config.FACT_STORE_RESYNC_HOURS,
+        until: Optional[datetime] = None,
+    ) -> int:
+        """
+        Pull new rows from MySQL into the store.
+        Starts at (watermark - resync_hours), rounded down to the start of that
+        day so every touched partition is rewritten whole. The re-sync window
+        picks up rows updated after they were first synced (status changes etc.).
+        The first sync starts at config.FACT_STORE_START_DATE.
+        
+        Args:
+            engine: SQLAlchemy Engine for the source database
+            resync_hours: Hours behind the watermark to pull again
+            until: Last moment to sync (default: now)
+        
+        Returns:
+            Number of rows pulled
+        """
+        state = self._read_state()
+        watermark = self.read_watermark()
+        if watermark is None:
+            first_day = date.fromisoformat(config.FACT_STORE_START_DATE)
+            day = first_day
+        else:
+            first_day = date.fromisoformat(state["first_day"])
+            day = max((watermark - timedelta(hours=resync_hours)).date(), first_day)
+        synced_until = until or datetime.now()
+        last_day = synced_until.date()
+        
+        query = compile_query("catalogue_sync")
+        total_rows = 0
+        new_watermark = watermark
+        
+        while day <= last_day:
+            batch_end = min(day + timedelta(days=config.FACT_STORE_SYNC_BATCH_DAYS - 1), last_day)
+            params = query.bind({"start": f"{day} 00:00:00", "end": f"{batch_end} 23:59:59"})
+            batch_rows, batch_max, written = self._sync_window(query, engine, params)
+            
+            current = day
+            while current <= batch_end:
+                if current not in written:
+                    self._remove_day(current)
+                current += timedelta(days=1)
+            
+            if batch_max is not None:
+                new_watermark = max(new_watermark, batch_max) if new_watermark else batch_max
+            total_rows += batch_rows
+            logger.info(f"Synced {batch_rows} rows for {params['start']} -> {params['end']}")
+            day = batch_end + timedelta(days=1)
+        
+        if new_watermark is not None:
+            self._write_watermark(new_watermark, first_day, synced_until)
+        logger.info(f"Fact store sync done: {total_rows} rows, watermark={new_watermark}")
+        return total_rows
+    
+    def _sync_window(
+        self,
+        query: CompiledQuery,
+        engine: Engine,
+        params: Dict[str, str],
+    ) -> Tuple[int, Optional[datetime], Set[date]]:
+        """
+        Stream one sync window from MySQL into day partitions.
+        Rows arrive ordered by CreatedTime, so each day is written chunk by chunk
+        through one open Parquet writer and committed when the next day starts;
+        memory stays at about one chunk whatever the window size.
+        
+        Args:
+            query: SYNC_CATALOGUE.sql
+            engine: SQLAlchemy Engine for the source database
+            params: {"start": window start, "end": window end}
+        
+        Returns:
+            (rows pulled, max CreatedTime or None, days written)
+        """
+        rows, batch_max = 0, None
+        written: Set[date] = set()
+        writer, writer_day = None, None
+        try:
+            for chunk in stream_query(query, engine, params=params):
+                chunk = _normalize(chunk)
+                for current, day_rows in chunk.groupby(chunk["CreatedTime"].dt.date, sort=True):
+                    if current != writer_day:
+                        if current in written:
+                            raise RuntimeError("Sync rows are not ordered by CreatedTime")
+                        if writer is not None:
+                            self._commit_day(writer_day, writer)
+                        writer, writer_day = self._open_day(current), current
+                        written.add(current)
+                    writer.write_table(
+                        pa.Table.from_pandas(day_rows, schema=STORE_SCHEMA, preserve_index=False)
+                    )
+                rows += len(chunk)
+                chunk_max = chunk["CreatedTime"].max().to_pydatetime()
+                batch_max = max(batch_max, chunk_max) if batch_max else chunk_max
+        except Exception:
+            if writer is not None:
+                self._abort_day(writer_day, writer)
+            raise
+        if writer is not None:
+            self._commit_day(writer_day, writer)
+        return rows, batch_max, written
+
+
+@st.cache_resource
+def get_fact_store() -> FactStore:
+    """
+    Get the shared FactStore for omisell_catalogue.
+    
+    Returns:
+        FactStore rooted at config.FACT_STORE_DIR
+    """
+    return FactStore(config.FACT_STORE_DIR)
+
+
+def main() -> None:
+    """Sync job entry point: pull new omisell_catalogue rows into the local store."""
+    from src.db.connection import create_db_engine
+    
+    engine = create_db_engine()
+    try:
+        FactStore(config.FACT_STORE_DIR).sync(engine)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
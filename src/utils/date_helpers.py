@@ -2,8 +2,11 @@
 Date/time helper utilities.
 """
 
-from datetime import datetime, timedelta
-from typing import Tuple
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Tuple, TypeVar
+
+_D = TypeVar("_D", date, datetime)
 
 
 def get_previous_period(start_date: datetime, end_date: datetime) -> Tuple[datetime, datetime]:
@@ -27,6 +30,61 @@ def get_previous_period(start_date: datetime, end_date: datetime) -> Tuple[datet
     return prev_start, prev_end
 
 
+def shift_months(value: _D, months: int) -> _D:
+    """
+    Move a date by whole months, clamping the day to the target month's length.
+    
+    Args:
+        value: Date or datetime
+        months: Months to add (negative to go back)
+        
+    Returns:
+        Shifted value of the same type
+        
+    Example:
+        shift_months(date(2024, 3, 31), -1) -> date(2024, 2, 29)
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return value.replace(year=year, month=month + 1, day=day)
+
+
+def get_comparison_period(
+    start_date: datetime,
+    end_date: datetime,
+    mode: str = "previous",
+) -> Tuple[datetime, datetime]:
+    """
+    Calculate the period the current one is compared against.
+    
+    Args:
+        start_date: Start date of current period
+        end_date: End date of current period
+        mode: "previous" (period of the same length right before),
+            "wow" (week over week), "mom" (month over month)
+            or "yoy" (year over year)
+        
+    Returns:
+        Tuple of (comparison_start_date, comparison_end_date)
+        
+    Raises:
+        ValueError: If mode is unknown
+        
+    Example:
+        For 2024-03-10 to 2024-03-15, "mom" returns 2024-02-10 to 2024-02-15
+    """
+    if mode == "previous":
+        return get_previous_period(start_date, end_date)
+    if mode == "wow":
+        return start_date - timedelta(days=7), end_date - timedelta(days=7)
+    if mode == "mom":
+        return shift_months(start_date, -1), shift_months(end_date, -1)
+    if mode == "yoy":
+        return shift_months(start_date, -12), shift_months(end_date, -12)
+    raise ValueError(f"Unknown comparison mode: {mode}")
+
+
 def format_date_range(start_date: datetime, end_date: datetime, format_str: str = "%Y-%m-%d %H:%M:%S") -> Tuple[str, str]:
     """
     Format date range to SQL datetime strings.
@@ -44,3 +102,22 @@ def format_date_range(start_date: datetime, end_date: datetime, format_str: str
     # End: end of day
     end_str = end_date.strftime("%Y-%m-%d 23:59:59")
     return start_str, end_str
+
+
+def format_age(seconds: float) -> str:
+    """
+    Format the age of a result for display.
+    
+    Args:
+        seconds: Age in seconds
+        
+    Returns:
+        Vietnamese relative time, e.g. "vừa xong", "5 phút trước", "1 giờ 20 phút trước"
+    """
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "vừa xong"
+    if minutes < 60:
+        return f"{minutes} phút trước"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} giờ {minutes} phút trước" if minutes else f"{hours} giờ trước"
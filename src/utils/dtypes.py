@@ -0,0 +1,95 @@
+"""
+Dtype utilities.
+Shrink query results to compact pandas dtypes.
+"""
+
+from decimal import Decimal
+from typing import Iterable, Mapping, Optional
+import pandas as pd
+
+# Column kinds of the query column specs (config.QUERY_COLUMNS):
+# - float: DECIMAL sums, ratios -> float64
+# - int: int64 (float64 if the column has NULLs)
+# - count: smallest integer dtype that holds the values (order counts; sum()
+#   upcasts, but convert to float64 before multiplying, see metrics._as_float)
+# - category: low-cardinality dimension (brand, platform, status, province)
+# - datetime: datetime64 (e.g. TIMESTAMPADD results that arrive as text)
+COLUMN_KINDS = ("float", "int", "count", "category", "datetime")
+
+
+def _is_decimal_column(column: pd.Series) -> bool:
+    """True if the first non-null value is a Decimal (pymysql DECIMAL columns)."""
+    first = column.first_valid_index()
+    return first is not None and isinstance(column[first], Decimal)
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    categories: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Coerce a query result to compact dtypes, column by column.
+    - DECIMAL (Decimal objects) -> float64
+    - integers -> smallest integer dtype that holds the values
+    - listed columns -> category
+    Floats and strings are left as they are.
+    
+    Args:
+        df: Raw DataFrame (e.g. one chunk of a streamed query)
+        categories: Columns to convert to category (low-cardinality dimensions)
+    
+    Returns:
+        DataFrame with the same columns and compact dtypes
+    """
+    out = df.copy()
+    for name in out.columns:
+        column = out[name]
+        if column.dtype == object and _is_decimal_column(column):
+            out[name] = pd.to_numeric(column, errors="coerce").astype("float64")
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            out[name] = pd.to_numeric(column, downcast="integer")
+    
+    for name in categories or ():
+        if name in out.columns:
+            out[name] = out[name].astype("category")
+    return out
+
+
+def coerce_columns(df: pd.DataFrame, spec: Mapping[str, str]) -> pd.DataFrame:
+    """
+    Coerce a query result to the dtypes of its column spec.
+    Columns missing from the spec only get DECIMAL -> float64; spec columns
+    missing from the frame are ignored.
+    
+    Args:
+        df: Raw DataFrame from the driver (Decimal objects, Python strings)
+        spec: Column name -> kind (COLUMN_KINDS)
+    
+    Returns:
+        DataFrame with the same columns and the coerced dtypes
+    
+    Raises:
+        ValueError: If a kind is not in COLUMN_KINDS
+    """
+    converted = {}
+    for name in df.columns:
+        column = df[name]
+        kind = spec.get(name)
+        if kind is None:
+            if column.dtype == object and _is_decimal_column(column):
+                converted[name] = pd.to_numeric(column, errors="coerce").astype("float64")
+        elif kind == "float":
+            converted[name] = pd.to_numeric(column, errors="coerce").astype("float64")
+        elif kind == "int":
+            values = pd.to_numeric(column, errors="coerce")
+            converted[name] = values.astype("float64" if values.isna().any() else "int64")
+        elif kind == "count":
+            # Floats with NULLs stay float64
+            converted[name] = pd.to_numeric(column, errors="coerce", downcast="integer")
+        elif kind == "category":
+            converted[name] = column.astype("category")
+        elif kind == "datetime":
+            converted[name] = pd.to_datetime(column)
+        else:
+            raise ValueError(f"Unknown column kind for {name}: {kind}")
+    return df.assign(**converted) if converted else df
@@ -1,19 +1,394 @@
 """
 Query file management utilities.
 Load SQL queries from query directory.
+
+All .sql files are read once into a QueryRegistry, validated against
+config.QUERY_FILES / config.QUERY_PARAMS, and compiled on demand into
+SQLAlchemy text() statements with named binds:
+
+    compiled = get_query_registry().compile("trend", filters=filter_spec)
+    df = pd.read_sql(
+        compiled.statement, engine,
+        params=compiled.bind({"start": start_str, "end": end_str}, filter_spec),
+    )
+
+Each %s placeholder becomes the :name listed for it in config.QUERY_PARAMS,
+and {filters} becomes "AND column IN :filter_<field>" with expanding binds, so
+one statement serves every selection size of the same filter shape. Compiled
+queries also carry their column spec (config.QUERY_COLUMNS), the dtypes
+fetch_data coerces the result to.
 """
 
 import os
-from typing import Optional
+import re
+import string
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
 import streamlit as st
+from sqlalchemy import TextClause, bindparam, text
+
 import config
 from src.logger import get_logger
+from src.utils.dtypes import COLUMN_KINDS
+from src.utils.sql_helpers import FilterSpec
 
 logger = get_logger(__name__)
 
 # Query directory path
 QUERY_DIR = "query"
 
+PLACEHOLDER = "%s"
+# "% s", "%  s": broken placeholders that the driver would not substitute
+_MALFORMED_PLACEHOLDER = re.compile(r"%\s+s\b")
+# Template fields filled by compile(); {filters} comes from the FilterSpec.
+# {breakdown}, {order_column} and {measure_sums} are filled by compile_ranked()
+TEMPLATE_FIELDS = frozenset({
+    "filters", "table", "dimensions", "dimension", "column", "id_column", "unit",
+    "breakdown", "order_column", "measure_sums",
+})
+# Identifier fields only take table / column names (and comma lists of them)
+_IDENTIFIER = re.compile(r"^[\w, ]+$")
+_COLUMN = re.compile(r"^\w+$")
+# Query key of the ranked breakdown wrapper
+RANKED_QUERY_KEY = "ranked_breakdown"
+
+
+class QueryValidationError(Exception):
+    """Raised when query files do not match config.QUERY_FILES / QUERY_PARAMS."""
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """One query template compiled to a text() statement with named binds."""
+    
+    key: str
+    sql: str
+    param_names: Tuple[str, ...]
+    expanding: Tuple[str, ...] = ()  # Filter binds (lists of values)
+    columns: Tuple[Tuple[str, str], ...] = ()  # Result column -> dtype kind (QUERY_COLUMNS)
+    statement: TextClause = field(default=None, compare=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        statement = text(self.sql)
+        if self.expanding:
+            statement = statement.bindparams(
+                *(bindparam(name, expanding=True) for name in self.expanding)
+            )
+        object.__setattr__(self, "statement", statement)
+    
+    def bind(
+        self,
+        values: Dict[str, Any],
+        filters: Optional[FilterSpec] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the parameter dictionary for this statement.
+        
+        Args:
+            values: Named parameter values (config.QUERY_PARAMS names)
+            filters: FilterSpec the query was compiled with (if it has {filters})
+        
+        Returns:
+            Dictionary of bind name -> value
+        
+        Raises:
+            KeyError: If a named parameter is missing from values
+        """
+        params = {name: values[name] for name in dict.fromkeys(self.param_names)}
+        if filters is not None and self.expanding:
+            params.update(filters.bind_params)
+        return params
+    
+    @property
+    def column_spec(self) -> Dict[str, str]:
+        """Result column -> dtype kind, for dtypes.coerce_columns."""
+        return dict(self.columns)
+    
+    def explain_statement(self) -> TextClause:
+        """EXPLAIN of this statement, with the same binds."""
+        statement = text(f"EXPLAIN {self.sql.rstrip().rstrip(';')}")
+        if self.expanding:
+            statement = statement.bindparams(
+                *(bindparam(name, expanding=True) for name in self.expanding)
+            )
+        return statement
+
+
+def _template_fields(template: str) -> List[str]:
+    """Names of the {field} placeholders of a template."""
+    return [name for _, name, _, _ in string.Formatter().parse(template) if name is not None]
+
+
+def _to_named_binds(sql: str, names: Tuple[str, ...]) -> str:
+    """Replace the i-th %s placeholder with :names[i]."""
+    parts = sql.split(PLACEHOLDER)
+    out = [parts[0]]
+    for name, part in zip(names, parts[1:]):
+        out.append(f":{name}")
+        out.append(part)
+    return "".join(out)
+
+
+class QueryRegistry:
+    """
+    Loads every .sql file of the query directory once and compiles templates.
+    
+    Files are validated on load: every config.QUERY_FILES entry must exist,
+    declare its parameter names in config.QUERY_PARAMS with one name per %s,
+    and use only known template fields; column specs (config.QUERY_COLUMNS)
+    must name known queries and dtype kinds. With hot reload on, files whose mtime
+    changed are read again (and re-validated) on the next access.
+    """
+    
+    def __init__(
+        self,
+        query_dir: str = QUERY_DIR,
+        query_files: Optional[Dict[str, str]] = None,
+        query_params: Optional[Dict[str, Tuple[str, ...]]] = None,
+        hot_reload: bool = config.QUERY_HOT_RELOAD,
+        query_columns: Optional[Dict[str, Dict[str, str]]] = None,
+    ):
+        """
+        Args:
+            query_dir: Directory holding the .sql files
+            query_files: Query key -> filename (default: config.QUERY_FILES)
+            query_params: Query key -> parameter names (default: config.QUERY_PARAMS)
+            hot_reload: Re-read changed files on access
+            query_columns: Query key -> column spec (default: config.QUERY_COLUMNS)
+        """
+        self.query_dir = query_dir
+        self.query_files = query_files if query_files is not None else config.QUERY_FILES
+        self.query_params = query_params if query_params is not None else config.QUERY_PARAMS
+        self.query_columns = query_columns if query_columns is not None else config.QUERY_COLUMNS
+        self.hot_reload = hot_reload
+        self._texts: Dict[str, str] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._compiled: Dict[Tuple, CompiledQuery] = {}
+        self._lock = threading.RLock()
+    
+    def load(self) -> None:
+        """
+        Read and validate every .sql file.
+        
+        Raises:
+            QueryValidationError: If any query is missing or malformed
+                (all problems are reported at once)
+        """
+        texts, mtimes = self._read_files()
+        problems = self._validate(texts)
+        if problems:
+            raise QueryValidationError(
+                "Invalid query files:\n" + "\n".join(f"- {problem}" for problem in problems)
+            )
+        with self._lock:
+            self._texts, self._mtimes = texts, mtimes
+            self._compiled.clear()
+        logger.info(f"Query registry loaded {len(texts)} files from {self.query_dir}")
+    
+    def _read_files(self) -> Tuple[Dict[str, str], Dict[str, float]]:
+        texts, mtimes = {}, {}
+        for filename in sorted(os.listdir(self.query_dir)):
+            if not filename.endswith(".sql"):
+                continue
+            path = os.path.join(self.query_dir, filename)
+            with open(path, "r", encoding="utf-8") as f:
+                texts[filename] = f.read().strip()
+            mtimes[filename] = os.path.getmtime(path)
+        return texts, mtimes
+    
+    def _validate(self, texts: Dict[str, str]) -> List[str]:
+        """Return one message per problem found in the loaded files."""
+        problems = []
+        for filename, sql in texts.items():
+            if _MALFORMED_PLACEHOLDER.search(sql):
+                problems.append(f"{filename}: malformed placeholder (use %s)")
+        
+        for key, filename in self.query_files.items():
+            if filename not in texts:
+                problems.append(f"{key}: file {filename} not found in {self.query_dir}")
+                continue
+            names = self.query_params.get(key)
+            if names is None:
+                problems.append(f"{key}: no parameter names in config.QUERY_PARAMS")
+                continue
+            count = texts[filename].count(PLACEHOLDER)
+            if count != len(names):
+                problems.append(
+                    f"{key}: {filename} has {count} placeholders, "
+                    f"config.QUERY_PARAMS lists {len(names)}"
+                )
+            unknown = set(_template_fields(texts[filename])) - TEMPLATE_FIELDS
+            if unknown:
+                problems.append(f"{key}: unknown template fields {sorted(unknown)}")
+        
+        for key in set(self.query_params) - set(self.query_files):
+            problems.append(f"{key}: in config.QUERY_PARAMS but not in config.QUERY_FILES")
+        for key, spec in self.query_columns.items():
+            if key not in self.query_files:
+                problems.append(f"{key}: in config.QUERY_COLUMNS but not in config.QUERY_FILES")
+            unknown = sorted(set(spec.values()) - set(COLUMN_KINDS))
+            if unknown:
+                problems.append(f"{key}: unknown column kinds {unknown}")
+        return problems
+    
+    def _reload_if_changed(self) -> None:
+        """Hot reload: re-load everything if any .sql file was added, removed or edited."""
+        try:
+            mtimes = {
+                filename: os.path.getmtime(os.path.join(self.query_dir, filename))
+                for filename in os.listdir(self.query_dir)
+                if filename.endswith(".sql")
+            }
+            if mtimes != self._mtimes:
+                logger.info("Query files changed, reloading registry")
+                self.load()
+        except QueryValidationError as e:
+            # Keep serving the last valid version until the files are fixed
+            logger.error(str(e))
+            self._mtimes = mtimes
+        except OSError as e:
+            logger.error(f"Error checking query files: {e}")
+    
+    def text_of(self, filename: str) -> str:
+        """
+        Raw text of a query file (%s placeholders, unfilled template fields).
+        
+        Args:
+            filename: SQL file name (e.g., "GET_BRAND.sql")
+        
+        Returns:
+            SQL text
+        
+        Raises:
+            KeyError: If the file was not found in the query directory
+        """
+        if self.hot_reload:
+            self._reload_if_changed()
+        return self._texts[filename]
+    
+    def compile(
+        self,
+        key: str,
+        filters: Optional[FilterSpec] = None,
+        **fields: str,
+    ) -> CompiledQuery:
+        """
+        Compile a query to a text() statement with named binds.
+        Compiled statements are cached per (key, filter shape, fields).
+        
+        Args:
+            key: Key in config.QUERY_FILES (e.g. "trend")
+            filters: FilterSpec for {filters} (only which fields are set matters)
+            **fields: Identifier template fields (table, dimensions, column, ...)
+        
+        Returns:
+            CompiledQuery
+        
+        Raises:
+            KeyError: If the key is unknown
+            ValueError: If an identifier field is not a plain name list
+        """
+        template = self.text_of(self.query_files[key])
+        filter_names = tuple(filters.bind_params) if filters is not None else ()
+        cache_key = (key, filter_names, tuple(sorted(fields.items())))
+        
+        with self._lock:
+            compiled = self._compiled.get(cache_key)
+        if compiled is not None:
+            return compiled
+        
+        for name, value in fields.items():
+            if not _IDENTIFIER.match(value):
+                raise ValueError(f"Invalid identifier for {{{name}}}: {value!r}")
+        
+        values = dict(fields)
+        if "filters" in _template_fields(template):
+            values["filters"] = filters.bind_sql if filters is not None else ""
+        sql = _to_named_binds(template.format(**values), self.query_params[key])
+        
+        compiled = CompiledQuery(
+            key=key,
+            sql=sql,
+            param_names=self.query_params[key],
+            expanding=filter_names if "filters" in values else (),
+            columns=tuple(self.query_columns.get(key, {}).items()),
+        )
+        with self._lock:
+            self._compiled[cache_key] = compiled
+        return compiled
+    
+    def compile_ranked(
+        self,
+        breakdown: CompiledQuery,
+        column: str,
+        measures: Sequence[str],
+    ) -> CompiledQuery:
+        """
+        Wrap a breakdown query in GET_RANKED_BREAKDOWN.sql: groups ranked by the
+        first measure (descending), one keyset page, the total group count and
+        an "Others" row with the measures summed over the groups after the page.
+        
+        Args:
+            breakdown: Compiled breakdown (one row per group, group column first,
+                then the measures in this order)
+            column: Group column (e.g. "Province")
+            measures: Measure columns of the breakdown, ranked by the first
+        
+        Returns:
+            CompiledQuery with the breakdown's binds plus first_page, after_key,
+            after_value, limit and others_label and the breakdown's column spec; rows carry
+            GroupRank (NULL for "Others") and TotalGroups columns
+        
+        Raises:
+            ValueError: If a column name is not a plain identifier
+        """
+        cache_key = (RANKED_QUERY_KEY, breakdown, column, tuple(measures))
+        with self._lock:
+            compiled = self._compiled.get(cache_key)
+        if compiled is not None:
+            return compiled
+        
+        for name in (column, *measures):
+            if not _COLUMN.match(name):
+                raise ValueError(f"Invalid column for ranked breakdown: {name!r}")
+        
+        names = self.query_params[RANKED_QUERY_KEY]
+        template = _to_named_binds(self.text_of(self.query_files[RANKED_QUERY_KEY]), names)
+        sql = template.format(
+            breakdown=breakdown.sql.rstrip().rstrip(";"),
+            column=column,
+            order_column=measures[0],
+            measure_sums=", ".join(f"SUM({name}) AS {name}" for name in measures),
+        )
+        compiled = CompiledQuery(
+            key=f"{breakdown.key}_ranked",
+            sql=sql,
+            param_names=breakdown.param_names + names,
+            expanding=breakdown.expanding,
+            columns=breakdown.columns + tuple(self.query_columns.get(RANKED_QUERY_KEY, {}).items()),
+        )
+        with self._lock:
+            self._compiled[cache_key] = compiled
+        return compiled
+
+
+@st.cache_resource
+def get_query_registry() -> QueryRegistry:
+    """
+    Get the process-wide query registry (loaded and validated once).
+    
+    Returns:
+        QueryRegistry instance
+    
+    Raises:
+        QueryValidationError: If the query files are invalid
+    """
+    registry = QueryRegistry()
+    registry.load()
+    return registry
+
 
 def load_query(filename: str) -> str:
     """
@@ -21,21 +396,16 @@ def load_query(filename: str) -> str:
     
     Args:
         filename: SQL file name (e.g., "GET_BRAND.sql")
-        
+    
     Returns:
         SQL query string
-        
+    
     Raises:
         FileNotFoundError: If query file not found
     """
-    file_path = os.path.join(QUERY_DIR, filename)
-    
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            query = f.read().strip()
-            logger.debug(f"Loaded query: {filename}")
-            return query
-    except FileNotFoundError:
+        return get_query_registry().text_of(filename)
+    except KeyError:
         error_msg = config.ERROR_MESSAGES["query_not_found"].format(filename=filename)
         logger.error(error_msg)
         st.error(error_msg)
@@ -52,7 +422,7 @@ def get_query_by_key(key: str) -> str:
     
     Args:
         key: Key in config.QUERY_FILES (e.g., 'kpi', 'trend')
-        
+    
     Returns:
         SQL query string
     """
@@ -62,3 +432,33 @@ def get_query_by_key(key: str) -> str:
     
     filename = config.QUERY_FILES[key]
     return load_query(filename)
+
+
+def compile_query(key: str, filters: Optional[FilterSpec] = None, **fields: str) -> CompiledQuery:
+    """
+    Compile a query from the registry (see QueryRegistry.compile).
+    
+    Args:
+        key: Key in config.QUERY_FILES (e.g., 'kpi', 'trend')
+        filters: FilterSpec for {filters}
+        **fields: Identifier template fields
+    
+    Returns:
+        CompiledQuery
+    """
+    return get_query_registry().compile(key, filters, **fields)
+
+
+def compile_ranked(breakdown: CompiledQuery, column: str, measures: Sequence[str]) -> CompiledQuery:
+    """
+    Wrap a compiled breakdown in the ranked breakdown query (see QueryRegistry.compile_ranked).
+    
+    Args:
+        breakdown: Compiled breakdown query
+        column: Group column
+        measures: Measure columns, ranked by the first
+    
+    Returns:
+        CompiledQuery
+    """
+    return get_query_registry().compile_ranked(breakdown, column, measures)
@@ -1,9 +1,10 @@
 """
 SQL helper utilities.
-Handles SQL filtering, escaping, and WHERE clause building.
+Handles SQL filtering, escaping, and WHERE clause building (bound parameters).
 """
 
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Iterable, List, Mapping, Optional, Tuple
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,14 +25,131 @@ def escape_sql_string(value: str) -> str:
     return value
 
 
+ALL_OPTION = "Tất cả"
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """
+    Filter selection rendered as bound parameters.
+    Values are normalized (deduplicated, sorted, "Tất cả" removed) so the same
+    logical selection always produces the same SQL text, the same params and the
+    same cache key, whatever order the user ticked the checkboxes in. Given the
+    domain of a field (every value in the data, from the dimension catalog), a
+    selection covering it is dropped: "everything ticked" is no filter, so the
+    query needs no IN list and can be answered from the rollups. Unlike an IN
+    list of every value, no filter also keeps the rows whose value is NULL or
+    '' and values added since the catalog was built.
+    
+    Example:
+        spec = build_filters(["B", "A"], [], [], [])
+        spec.sql          # "AND brand IN (%s, %s)"
+        spec.params       # ("A", "B")
+        spec.bind_sql     # "AND brand IN :filter_brand"  (SQLAlchemy text())
+        spec.bind_params  # {"filter_brand": ["A", "B"]}
+    """
+    
+    brand: Tuple[str, ...] = ()
+    platform: Tuple[str, ...] = ()
+    shop: Tuple[str, ...] = ()
+    status: Tuple[str, ...] = ()
+    
+    # Field name -> omisell_catalogue column
+    COLUMNS: ClassVar[Dict[str, str]] = {
+        "brand": "brand",
+        "platform": "PlatformName",
+        "shop": "ShopName",
+        "status": "StatusName",
+    }
+    
+    @classmethod
+    def from_lists(
+        cls,
+        domains: Optional[Mapping[str, Iterable[str]]] = None,
+        **values: Iterable[str],
+    ) -> "FilterSpec":
+        """
+        Build a normalized FilterSpec from raw selections.
+        
+        Args:
+            domains: Field name -> every value of the field (optional); a
+                selection containing all of them becomes no filter
+            **values: Field name (brand, platform, shop, status) -> selected values
+            
+        Returns:
+            FilterSpec with deduplicated, sorted values
+        """
+        normalized = {}
+        for field, selected in values.items():
+            chosen = {v for v in selected if v != ALL_OPTION}
+            domain = set((domains or {}).get(field) or ())
+            normalized[field] = () if domain and chosen >= domain else tuple(sorted(chosen))
+        return cls(**normalized)
+    
+    def _active(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        """(column, values) pairs for fields with a selection, in fixed order."""
+        return [
+            (column, getattr(self, field))
+            for field, column in self.COLUMNS.items()
+            if getattr(self, field)
+        ]
+    
+    @property
+    def selection(self) -> Dict[str, List[str]]:
+        """Selected values keyed by column name (used by non-SQL backends)."""
+        return {column: list(values) for column, values in self._active()}
+    
+    @property
+    def sql(self) -> str:
+        """WHERE fragment with one %s placeholder per value, empty if no filters."""
+        clauses = [
+            f"{column} IN ({', '.join(['%s'] * len(values))})"
+            for column, values in self._active()
+        ]
+        return "AND " + " AND ".join(clauses) if clauses else ""
+    
+    @property
+    def params(self) -> Tuple[str, ...]:
+        """Values bound to the placeholders of .sql, in the same order."""
+        return tuple(value for _, values in self._active() for value in values)
+    
+    @property
+    def bind_sql(self) -> str:
+        """WHERE fragment with one expanding named bind per column (:filter_<field>)."""
+        clauses = [f"{column} IN :{name}" for name, column, _ in self._active_binds()]
+        return "AND " + " AND ".join(clauses) if clauses else ""
+    
+    @property
+    def bind_params(self) -> Dict[str, List[str]]:
+        """Values of the named binds used by .bind_sql."""
+        return {name: list(values) for name, _, values in self._active_binds()}
+    
+    def _active_binds(self) -> List[Tuple[str, str, Tuple[str, ...]]]:
+        """(bind name, column, values) for fields with a selection, in fixed order."""
+        return [
+            (f"filter_{field}", column, getattr(self, field))
+            for field, column in self.COLUMNS.items()
+            if getattr(self, field)
+        ]
+    
+    @property
+    def cache_key(self) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+        """Normalized, order-insensitive key of this selection."""
+        return tuple(self._active())
+    
+    def __bool__(self) -> bool:
+        return bool(self._active())
+
+
 def build_filters(
     brand: List[str],
     platform: List[str],
     shop: List[str],
     status: List[str],
-) -> str:
+    domains: Optional[Mapping[str, Iterable[str]]] = None,
+) -> FilterSpec:
     """
-    Build SQL WHERE clause from selected filters.
+    Build filter spec from selected filters.
     Used for Sales/Orders table queries.
     
     Args:
@@ -39,48 +157,26 @@ def build_filters(
         platform: List of selected platforms
         shop: List of selected shops
         status: List of selected order statuses
+        domains: Every value of each field (get_filter_options_dict()["domains"]);
+            a field with all its values selected is not filtered, so rows with
+            a NULL / '' value in it are counted too
         
     Returns:
-        WHERE clause string (e.g., "AND brand IN (...) AND platform IN (...)")
-        Returns empty string if no filters selected
+        FilterSpec; .sql gives the WHERE clause
+        (e.g., "AND brand IN (%s, %s) AND PlatformName IN (%s)") and .params its values.
+        Empty spec if no filters selected, or all of them
     """
-    filters = []
-    
-    # Brand filter
-    actual_brands = [b for b in brand if b != "Tất cả"]
-    if actual_brands:
-        brands_str = "', '".join([escape_sql_string(b) for b in actual_brands])
-        filters.append(f"brand IN ('{brands_str}')")
-    
-    # Platform filter
-    actual_platforms = [p for p in platform if p != "Tất cả"]
-    if actual_platforms:
-        platforms_str = "', '".join([escape_sql_string(p) for p in actual_platforms])
-        filters.append(f"PlatformName IN ('{platforms_str}')")
-    
-    # Shop filter
-    actual_shops = [s for s in shop if s != "Tất cả"]
-    if actual_shops:
-        shops_str = "', '".join([escape_sql_string(s) for s in actual_shops])
-        filters.append(f"ShopName IN ('{shops_str}')")
-    
-    # Status filter
-    actual_statuses = [st for st in status if st != "Tất cả"]
-    if actual_statuses:
-        statuses_str = "', '".join([escape_sql_string(st) for st in actual_statuses])
-        filters.append(f"StatusName IN ('{statuses_str}')")
-    
-    if filters:
-        where_clause = "AND " + " AND ".join(filters)
-        logger.debug(f"Built filters: {where_clause}")
-        return where_clause
-    
-    return ""
+    spec = FilterSpec.from_lists(
+        domains, brand=brand, platform=platform, shop=shop, status=status
+    )
+    if spec:
+        logger.debug(f"Built filters: {spec.sql} {spec.params}")
+    return spec
 
 
-def build_inventory_filters(brand: List[str], shop: List[str]) -> str:
+def build_inventory_filters(brand: List[str], shop: List[str]) -> FilterSpec:
     """
-    Build SQL WHERE clause for Inventory table queries.
+    Build filter spec for Inventory table queries.
     Inventory table only has Brand and Shop (no Platform or Status).
     
     Args:
@@ -88,25 +184,9 @@ def build_inventory_filters(brand: List[str], shop: List[str]) -> str:
         shop: List of selected shops
         
     Returns:
-        WHERE clause string
+        FilterSpec with brand and shop selections
     """
-    filters = []
-    
-    # Brand filter
-    actual_brands = [b for b in brand if b != "Tất cả"]
-    if actual_brands:
-        brands_str = "', '".join([escape_sql_string(b) for b in actual_brands])
-        filters.append(f"brand IN ('{brands_str}')")
-    
-    # Shop filter
-    actual_shops = [s for s in shop if s != "Tất cả"]
-    if actual_shops:
-        shops_str = "', '".join([escape_sql_string(s) for s in actual_shops])
-        filters.append(f"ShopName IN ('{shops_str}')")
-    
-    if filters:
-        where_clause = "AND " + " AND ".join(filters)
-        logger.debug(f"Built inventory filters: {where_clause}")
-        return where_clause
-    
-    return ""
+    spec = FilterSpec.from_lists(brand=brand, shop=shop)
+    if spec:
+        logger.debug(f"Built inventory filters: {spec.sql} {spec.params}")
+    return spec
@@ -0,0 +1,135 @@
+"""
+Time bucket utilities.
+Plan the buckets of a trend chart: the grain (minute, hour, day, week, month)
+is chosen from the length of the range, or given as an override, and a step
+of several grain units is used when needed so a chart never has more than
+config.TREND_MAX_POINTS points.
+
+Bucket n covers [start + n * step units, start + (n + 1) * step units), so
+buckets are aligned to the range start (local midnight for the date picker),
+in SQL (TIMESTAMPDIFF / TIMESTAMPADD, see GET_TREND_BUCKETS.sql) and in pandas
+(BucketPlan.bucket_numbers) alike.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.utils.date_helpers import shift_months
+
+# Grain -> MySQL interval unit (TIMESTAMPDIFF / TIMESTAMPADD), finest first
+GRAIN_UNITS = {
+    "minute": "MINUTE",
+    "hour": "HOUR",
+    "day": "DAY",
+    "week": "WEEK",
+    "month": "MONTH",
+}
+_GRAIN_SECONDS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+def _to_datetime(value: Union[datetime, str]) -> datetime:
+    if isinstance(value, str):
+        return datetime.strptime(value, config.SQL_DATETIME_FORMAT)
+    return value
+
+
+def _units_spanned(start: datetime, end: datetime, grain: str) -> int:
+    """Number of grain units from start up to and including end."""
+    if grain == "month":
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    # end is inclusive (HH:59:59), so add the last second
+    return max(math.ceil(((end - start).total_seconds() + 1) / _GRAIN_SECONDS[grain]), 1)
+
+
+@dataclass(frozen=True)
+class BucketPlan:
+    """Buckets of one range: step grain units each, count of them from start."""
+    
+    grain: str
+    step: int
+    count: int
+    start: datetime
+    
+    @property
+    def unit(self) -> str:
+        """MySQL interval unit of the grain (e.g. "HOUR")."""
+        return GRAIN_UNITS[self.grain]
+    
+    @property
+    def label(self) -> str:
+        """Axis label, e.g. "Giờ" or "15 Phút"."""
+        name = config.TREND_GRAINS[self.grain]
+        return name if self.step == 1 else f"{self.step} {name}"
+    
+    def bucket_starts(self) -> pd.DatetimeIndex:
+        """Start time of every bucket."""
+        offsets = np.arange(self.count) * self.step
+        if self.grain == "month":
+            return pd.DatetimeIndex([shift_months(self.start, int(n)) for n in offsets])
+        return pd.Timestamp(self.start) + pd.to_timedelta(
+            offsets * _GRAIN_SECONDS[self.grain], unit="s"
+        )
+    
+    def bucket_numbers(self, times: pd.Series) -> np.ndarray:
+        """
+        Bucket of each timestamp (same rule as TIMESTAMPDIFF in SQL: whole
+        units elapsed since start, divided by step).
+        
+        Args:
+            times: datetime64 Series within the range
+        
+        Returns:
+            int64 array of bucket numbers
+        """
+        start = pd.Timestamp(self.start)
+        if self.grain == "month":
+            months = (times.dt.year - start.year) * 12 + (times.dt.month - start.month)
+            # A month only counts once the start's day and time of day are reached
+            offset = times - times.dt.normalize() + pd.to_timedelta(times.dt.day, unit="D")
+            start_offset = start - start.normalize() + pd.Timedelta(days=start.day)
+            units = months - (offset < start_offset).astype("int64")
+        else:
+            units = (times - start).dt.total_seconds() // _GRAIN_SECONDS[self.grain]
+        return (units.to_numpy() // self.step).astype("int64")
+
+
+def plan_buckets(
+    start: Union[datetime, str],
+    end: Union[datetime, str],
+    grain: Optional[str] = None,
+    max_points: int = config.TREND_MAX_POINTS,
+) -> BucketPlan:
+    """
+    Choose the buckets of a trend over [start, end].
+    
+    Args:
+        start: Range start (datetime or YYYY-MM-DD HH:MM:SS)
+        end: Range end, inclusive
+        grain: Override ("minute" ... "month"); None picks the finest grain
+            that fits in max_points
+        max_points: Upper bound of the number of buckets
+    
+    Returns:
+        BucketPlan; with an override that would exceed max_points the step
+        grows (e.g. 8-minute buckets) instead
+    
+    Raises:
+        ValueError: If grain is not a known grain
+    """
+    start, end = _to_datetime(start), _to_datetime(end)
+    if grain is None:
+        grain = next(
+            (g for g in GRAIN_UNITS if _units_spanned(start, end, g) <= max_points), "month"
+        )
+    elif grain not in GRAIN_UNITS:
+        raise ValueError(f"Unknown time grain: {grain}")
+    
+    units = _units_spanned(start, end, grain)
+    step = max(math.ceil(units / max_points), 1)
+    return BucketPlan(grain=grain, step=step, count=math.ceil(units / step), start=start)
@@ -12,6 +12,7 @@ import pandas as pd
 import config
 from src.db.connection import get_engine
 from src.services.data_service import get_kpi_data
+from src.utils.sql_helpers import FilterSpec
 from ui.styles import inject_styles
 from ui.kpi_cards import render_kpi_section
 
@@ -26,7 +27,7 @@ if engine:
     kpi_df = get_kpi_data(
         '2026-02-13 00:00:00', '2026-02-13 23:59:59',
         '2026-02-12 00:00:00', '2026-02-12 23:59:59',
-        '', engine
+        FilterSpec(), engine
     )
     
     st.write(f"KPI DataFrame shape: {kpi_df.shape}")
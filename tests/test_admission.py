@@ -0,0 +1,117 @@
+"""Tests for admission control (src/db/admission.py)."""
+
+import threading
+import time
+
+import pytest
+
+import config
+from src.db.admission import (
+    EXPORT,
+    INTERACTIVE,
+    WARMER,
+    AdmissionController,
+    AdmissionTimeout,
+    current_priority,
+    query_priority,
+)
+
+
+def _controller(**kwargs):
+    options = dict(max_concurrency=4, min_concurrency=1, target_latency_ms=1000, queue_timeout=5)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+def _wait_for(predicate, seconds=5.0):
+    deadline = time.monotonic() + seconds
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_priority_follows_the_context():
+    assert current_priority() == INTERACTIVE
+    with query_priority(WARMER):
+        assert current_priority() == WARMER
+    assert current_priority() == INTERACTIVE
+    with pytest.raises(ValueError):
+        with query_priority("batch"):
+            pass
+
+
+def test_waiting_queries_are_admitted_by_priority():
+    controller = _controller(max_concurrency=1)
+    order = []
+    
+    def run(priority):
+        with controller.admit(priority):
+            order.append(priority)
+    
+    def waiting():
+        return sum(v for name, v in controller.stats().items() if name.startswith("waiting_"))
+    
+    with controller.admit(INTERACTIVE):
+        threads = []
+        # Queue the lowest priority first, so arrival order alone would be wrong
+        for priority in (EXPORT, WARMER, INTERACTIVE):
+            threads.append(threading.Thread(target=run, args=(priority,)))
+            threads[-1].start()
+            _wait_for(lambda: waiting() == len(threads))
+    for thread in threads:
+        thread.join(5)
+    assert order == [INTERACTIVE, WARMER, EXPORT]
+    assert controller.stats()["queued"] == 3
+
+
+def test_background_priorities_hold_only_their_share():
+    controller = _controller(shares={INTERACTIVE: 1.0, WARMER: 0.5, EXPORT: 0.25})
+    with controller.admit(WARMER), controller.admit(WARMER):
+        with pytest.raises(AdmissionTimeout):
+            with controller.admit(WARMER, timeout=0.05):
+                pass
+        # Interactive queries still get the remaining slots
+        with controller.admit(INTERACTIVE, timeout=0.05), controller.admit(INTERACTIVE, timeout=0.05):
+            assert controller.stats()["running_interactive"] == 2
+    assert controller.stats()["rejected"] == 1
+
+
+def test_timeout_leaves_the_queue_clean():
+    controller = _controller(max_concurrency=1)
+    with controller.admit(INTERACTIVE):
+        with pytest.raises(AdmissionTimeout):
+            with controller.admit(INTERACTIVE, timeout=0.05):
+                pass
+    stats = controller.stats()
+    assert stats["waiting_interactive"] == 0 and stats["running_interactive"] == 0
+    with controller.admit(INTERACTIVE, timeout=0.05):
+        pass
+
+
+def test_limit_shrinks_on_failure_and_grows_back_on_fast_queries():
+    controller = _controller()
+    with pytest.raises(RuntimeError):
+        with controller.admit(INTERACTIVE):
+            raise RuntimeError("query failed")
+    assert controller.limit == pytest.approx(4 * config.ADMISSION_DECREASE_FACTOR)
+    
+    for _ in range(20):
+        with controller.admit(INTERACTIVE):
+            pass
+    assert controller.limit == 4
+
+
+def test_limit_shrinks_while_latency_is_above_target():
+    controller = _controller(target_latency_ms=1)
+    for _ in range(10):
+        with controller.admit(INTERACTIVE):
+            time.sleep(0.005)
+    assert controller.limit == 1
+
+
+def test_export_slots_do_not_feed_the_latency_average():
+    controller = _controller(target_latency_ms=1)
+    with controller.admit(EXPORT):
+        time.sleep(0.005)
+    assert controller.limit == 4
+    assert controller.latency_avg == 0.0
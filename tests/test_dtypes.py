@@ -0,0 +1,60 @@
+"""Tests for result dtype coercion (src/utils/dtypes.py)."""
+
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from src.utils.dtypes import coerce_columns, compact_dtypes
+
+
+def _raw():
+    return pd.DataFrame({
+        "Revenue": [Decimal("10.50"), Decimal("2.25"), None],
+        "Quantity": [1, 2, 3],
+        "Orders": [3, 5, 7],
+        "brand": ["A", "B", "A"],
+        "BucketStart": ["2024-05-01 00:00:00", "2024-05-01 01:00:00", "2024-05-01 02:00:00"],
+        "Margin": [Decimal("0.1"), Decimal("0.2"), Decimal("0.3")],
+    })
+
+
+def test_spec_kinds_are_applied():
+    out = coerce_columns(_raw(), {
+        "Revenue": "float",
+        "Quantity": "int",
+        "Orders": "count",
+        "brand": "category",
+        "BucketStart": "datetime",
+    })
+    assert out["Revenue"].dtype == "float64"
+    assert out["Revenue"].iloc[0] == 10.5 and pd.isna(out["Revenue"].iloc[2])
+    assert out["Quantity"].dtype == "int64"
+    assert out["Orders"].dtype == "int8"
+    assert isinstance(out["brand"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_dtype(out["BucketStart"])
+
+
+def test_columns_outside_the_spec_only_lose_decimals():
+    out = coerce_columns(_raw(), {"Extra": "float"})
+    assert out["Margin"].dtype == "float64"
+    assert out["Quantity"].dtype == "int64"
+    assert out["brand"].dtype == _raw()["brand"].dtype
+    assert list(out.columns) == list(_raw().columns)
+
+
+def test_int_with_nulls_stays_float():
+    out = coerce_columns(pd.DataFrame({"Quantity": [1, None, 3]}), {"Quantity": "int"})
+    assert out["Quantity"].dtype == "float64"
+
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        coerce_columns(_raw(), {"Revenue": "money"})
+
+
+def test_compact_dtypes_downcasts_and_categorizes():
+    out = compact_dtypes(_raw(), categories=["brand", "Missing"])
+    assert out["Revenue"].dtype == "float64"
+    assert out["Orders"].dtype == "int8"
+    assert isinstance(out["brand"].dtype, pd.CategoricalDtype)
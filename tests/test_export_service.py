@@ -0,0 +1,44 @@
+"""Tests for export file handling (src/services/export_service.py)."""
+
+import zipfile
+
+import pandas as pd
+
+from src.services.export_service import ExportJob, _CsvWriter, zip_export
+
+
+def _job(tmp_path, fmt="csv"):
+    return ExportJob(
+        id="job1",
+        fmt=fmt,
+        path=str(tmp_path / f"job1.{fmt}"),
+        start_str="2024-05-01 00:00:00",
+        end_str="2024-05-31 23:59:59",
+    )
+
+
+def test_zipped_csv_replaces_the_file(tmp_path):
+    job = _job(tmp_path)
+    writer = _CsvWriter(job.path)
+    chunk = pd.DataFrame({"OmisellOrderNumber": [f"OM{i:08d}" for i in range(5000)], "Revenue": 1.5})
+    writer.write(chunk)
+    writer.write(chunk)
+    writer.close()
+    csv_bytes = open(job.path, "rb").read()
+    
+    zip_export(job)
+    assert job.zipped and job.path.endswith(".zip")
+    assert not (tmp_path / "job1.csv").exists()
+    assert job.file_name == "omisell_2024-05-01_2024-05-31.csv.zip"
+    assert job.mime == "application/zip"
+    assert job.size < len(csv_bytes) / 4
+    with zipfile.ZipFile(job.path) as archive:
+        assert archive.namelist() == [job.export_name]
+        assert archive.read(job.export_name) == csv_bytes
+
+
+def test_unzipped_job_keeps_its_format(tmp_path):
+    job = _job(tmp_path, "parquet")
+    assert job.file_name == job.export_name == "omisell_2024-05-01_2024-05-31.parquet"
+    assert job.mime == "application/vnd.apache.parquet"
+    assert job.size == 0
@@ -0,0 +1,46 @@
+"""Tests for the fact store coverage check (src/store/fact_store.py)."""
+
+from datetime import date, datetime
+
+from src.store.fact_store import FactStore
+
+NOW = datetime(2024, 5, 10, 12, 0, 0)
+
+
+def _store(tmp_path, synced_until=None, watermark=datetime(2024, 5, 10, 11, 58, 0)):
+    store = FactStore(str(tmp_path))
+    if synced_until is not None:
+        store._write_watermark(watermark, date(2024, 1, 1), synced_until)
+    return store
+
+
+def test_never_synced_store_covers_nothing(tmp_path):
+    assert not _store(tmp_path).covers("2024-05-01 00:00:00", "2024-05-01 23:59:59", now=NOW)
+
+
+def test_range_before_first_day_is_not_covered(tmp_path):
+    store = _store(tmp_path, synced_until=NOW)
+    assert not store.covers("2023-12-31 00:00:00", "2024-01-02 23:59:59", now=NOW)
+
+
+def test_range_ending_before_last_sync_is_covered(tmp_path):
+    store = _store(tmp_path, synced_until=datetime(2024, 5, 8, 0, 0, 0))
+    assert store.covers("2024-05-01 00:00:00", "2024-05-07 23:59:59", now=NOW)
+
+
+def test_range_past_a_recent_sync_is_covered(tmp_path):
+    store = _store(tmp_path, synced_until=datetime(2024, 5, 10, 11, 50, 0))
+    assert store.covers("2024-05-10 00:00:00", "2024-05-10 23:59:59", max_lag_minutes=15, now=NOW)
+
+
+def test_range_past_a_late_sync_is_not_covered(tmp_path):
+    store = _store(tmp_path, synced_until=datetime(2024, 5, 9, 6, 0, 0))
+    assert not store.covers("2024-05-09 00:00:00", "2024-05-10 23:59:59", max_lag_minutes=15, now=NOW)
+
+
+def test_state_without_synced_until_uses_the_watermark(tmp_path):
+    store = _store(tmp_path, synced_until=NOW, watermark=datetime(2024, 5, 9, 6, 0, 0))
+    with open(store.watermark_file, "w", encoding="utf-8") as f:
+        f.write('{"watermark": "2024-05-09T06:00:00", "first_day": "2024-01-01"}')
+    assert store.read_synced_until() == datetime(2024, 5, 9, 6, 0, 0)
+    assert not store.covers("2024-05-09 00:00:00", "2024-05-10 23:59:59", now=NOW)
@@ -0,0 +1,48 @@
+"""Tests for the chart figure builders (ui/figures.py)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from ui.figures import build_pie_figure, build_stacked_bar_figure, pivot_stack
+
+MISSING = config.CHART_MISSING_LABEL
+
+
+@pytest.fixture(params=["object", "category"])
+def revenue(request):
+    # Brand and platform come from LEFT JOINs, so either may be NULL
+    df = pd.DataFrame({
+        "brand": ["A", "A", None, "B", "B"],
+        "PlatformName": ["Shopee", "Lazada", "Shopee", "Shopee", None],
+        "Revenue": [10.0, 5.0, 4.0, 3.0, 2.0],
+    })
+    if request.param == "category":
+        df = df.astype({"brand": "category", "PlatformName": "category"})
+    return df
+
+
+def test_pivot_keeps_missing_categories_and_series(revenue):
+    table = pivot_stack(revenue, "brand", "PlatformName")
+    assert list(table.index) == ["A", MISSING, "B"]
+    assert list(table.columns) == ["Shopee", "Lazada", MISSING]
+    assert table.loc[MISSING, "Shopee"] == 4.0
+    assert table.loc["B", MISSING] == 2.0
+    assert np.nansum(table.to_numpy()) == revenue["Revenue"].sum()
+
+
+def test_pivot_without_series_keeps_missing_categories(revenue):
+    table = pivot_stack(revenue, "brand", None)
+    assert table["Revenue"].to_dict() == {"A": 15.0, MISSING: 4.0, "B": 5.0}
+
+
+def test_stacked_bar_plots_every_row(revenue):
+    fig = build_stacked_bar_figure(revenue, "brand", "PlatformName")
+    assert sum(np.nansum(trace.y) for trace in fig.data) == revenue["Revenue"].sum()
+    assert MISSING in fig.data[0].x
+
+
+def test_pie_labels_missing_values():
+    fig = build_pie_figure(pd.DataFrame({"brand": ["A", None], "Revenue": [1.0, 2.0]}), "brand")
+    assert list(fig.data[0].labels) == ["A", MISSING]
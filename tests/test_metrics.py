@@ -0,0 +1,45 @@
+"""Tests for the derived metrics (src/services/metrics.py)."""
+
+import numpy as np
+import pandas as pd
+
+from src.services.metrics import aov, aov_growth, compare_periods, growth, share, with_share
+
+
+def test_growth_handles_zero_and_null_baselines():
+    result = growth([150, 5, 0, 10], [100, 0, 0, np.nan])
+    np.testing.assert_allclose(result, [50.0, 100.0, 0.0, 100.0])
+
+
+def test_aov_is_zero_without_orders():
+    np.testing.assert_allclose(aov([100, 50], [4, 0]), [25.0, 0.0])
+    np.testing.assert_allclose(aov_growth([120], [4], [100], [4]), [20.0])
+    np.testing.assert_allclose(aov_growth([120], [4], [0], [0]), [0.0])
+
+
+def test_share_rounds_and_survives_a_zero_total():
+    np.testing.assert_allclose(share([1, 2], decimals=1), [33.3, 66.7])
+    np.testing.assert_allclose(share([0, 0]), [0.0, 0.0])
+    out = with_share(pd.DataFrame({"Revenue": [30, 70]}))
+    assert list(out["RevenuePercent"]) == [30.0, 70.0]
+
+
+def test_compare_periods_outer_joins_the_groups():
+    current = pd.DataFrame({"brand": ["A", "B"], "Revenue": [200.0, 50.0], "Orders": [4, 1]})
+    previous = pd.DataFrame({"brand": ["A", "C"], "Revenue": [100.0, 80.0], "Orders": [4, 2]})
+    out = compare_periods(current, previous, keys=["brand"]).set_index("brand")
+    
+    assert out.loc["A", "RevenueGrowth"] == 100.0
+    assert out.loc["A", "AovGrowth"] == 100.0
+    assert out.loc["B", "RevenueGrowth"] == 100.0  # New group
+    assert out.loc["C", "Revenue"] == 0.0
+    assert out.loc["C", "RevenueGrowth"] == -100.0  # Gone
+    assert out.loc["B", "AOV"] == 50.0
+
+
+def test_compare_periods_totals_with_an_empty_comparison():
+    current = pd.DataFrame({"Revenue": [100.0], "Orders": [2], "Quantity": [3]})
+    out = compare_periods(current, current.iloc[0:0])
+    assert len(out) == 1
+    assert out.loc[0, "AOV"] == 50.0
+    assert out.loc[0, "OrdersGrowth"] == 100.0 and out.loc[0, "QuantityGrowth"] == 100.0
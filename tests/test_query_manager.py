@@ -0,0 +1,104 @@
+"""Tests for query registry validation and compilation (src/utils/query_manager.py)."""
+
+import pytest
+
+from src.utils.query_manager import QueryRegistry, QueryValidationError
+from src.utils.sql_helpers import build_filters
+
+FILES = {"totals": "TOTALS.sql", "by_dim": "BY_DIM.sql"}
+PARAMS = {"totals": ("start", "end"), "by_dim": ("start", "end", "start")}
+COLUMNS = {"totals": {"Revenue": "float", "Orders": "count"}}
+
+
+def _registry(tmp_path, files=None, params=None, columns=None, **sql):
+    sql = sql or {
+        "TOTALS.sql": "SELECT SUM(x) AS Revenue FROM {table} WHERE t BETWEEN %s AND %s {filters}",
+        "BY_DIM.sql": "SELECT {dimension} FROM t WHERE a BETWEEN %s AND %s AND b >= %s",
+    }
+    for name, text in sql.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    return QueryRegistry(
+        query_dir=str(tmp_path),
+        query_files=FILES if files is None else files,
+        query_params=PARAMS if params is None else params,
+        hot_reload=False,
+        query_columns=COLUMNS if columns is None else columns,
+    )
+
+
+def test_valid_files_load(tmp_path):
+    _registry(tmp_path).load()
+
+
+def test_all_problems_are_reported_at_once(tmp_path):
+    registry = _registry(
+        tmp_path,
+        files={**FILES, "missing": "MISSING.sql", "unlisted": "BY_DIM.sql"},
+        params={**PARAMS, "by_dim": ("start",), "orphan": ()},
+        columns={"totals": {"Revenue": "money"}},
+        **{
+            "TOTALS.sql": "SELECT {bogus} WHERE t BETWEEN %s AND % s",
+            "BY_DIM.sql": "SELECT 1 WHERE a BETWEEN %s AND %s AND b >= %s",
+        },
+    )
+    with pytest.raises(QueryValidationError) as excinfo:
+        registry.load()
+    message = str(excinfo.value)
+    for problem in (
+        "TOTALS.sql: malformed placeholder",
+        "missing: file MISSING.sql not found",
+        "unlisted: no parameter names",
+        "by_dim: BY_DIM.sql has 3 placeholders, config.QUERY_PARAMS lists 1",
+        "totals: unknown template fields ['bogus']",
+        "orphan: in config.QUERY_PARAMS but not in config.QUERY_FILES",
+        "totals: unknown column kinds ['money']",
+    ):
+        assert problem in message
+
+
+def test_compile_uses_named_and_expanding_binds(tmp_path):
+    registry = _registry(tmp_path)
+    registry.load()
+    filters = build_filters(["B", "A"], [], [], ["Done"])
+    compiled = registry.compile("totals", filters=filters, table="omisell_catalog")
+    
+    assert compiled.sql == (
+        "SELECT SUM(x) AS Revenue FROM omisell_catalog WHERE t BETWEEN :start AND :end "
+        "AND brand IN :filter_brand AND StatusName IN :filter_status"
+    )
+    assert compiled.expanding == ("filter_brand", "filter_status")
+    assert compiled.bind({"start": "s", "end": "e"}, filters) == {
+        "start": "s", "end": "e", "filter_brand": ["A", "B"], "filter_status": ["Done"],
+    }
+    assert compiled.column_spec == {"Revenue": "float", "Orders": "count"}
+
+
+def test_compiled_statement_is_shared_by_filter_shape(tmp_path):
+    registry = _registry(tmp_path)
+    registry.load()
+    one = registry.compile("totals", filters=build_filters(["A"], [], [], []), table="t")
+    many = registry.compile("totals", filters=build_filters(["A", "B", "C"], [], [], []), table="t")
+    other = registry.compile("totals", filters=build_filters([], [], [], ["Done"]), table="t")
+    assert one is many
+    assert other is not one
+
+
+def test_repeated_placeholder_name_binds_once(tmp_path):
+    registry = _registry(tmp_path)
+    registry.load()
+    compiled = registry.compile("by_dim", dimension="brand")
+    assert compiled.sql.endswith("BETWEEN :start AND :end AND b >= :start")
+    assert compiled.bind({"start": "s", "end": "e"}) == {"start": "s", "end": "e"}
+    with pytest.raises(KeyError):
+        compiled.bind({"start": "s"})
+
+
+def test_identifier_fields_reject_sql(tmp_path):
+    registry = _registry(tmp_path)
+    registry.load()
+    with pytest.raises(ValueError):
+        registry.compile("by_dim", dimension="brand; DROP TABLE t")
+
+
+def test_shipped_query_files_are_valid():
+    QueryRegistry(hot_reload=False).load()
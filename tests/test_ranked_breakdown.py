@@ -0,0 +1,86 @@
+"""Tests for ranked breakdown keyset paging (query/GET_RANKED_BREAKDOWN.sql)."""
+
+import shutil
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+import config
+from src.services.data_service import _ranked_params, _split_ranked
+from src.utils.query_manager import QUERY_DIR, RANKED_QUERY_KEY, QueryRegistry
+
+RANKED_FILE = config.QUERY_FILES[RANKED_QUERY_KEY]
+# Brand is NULL for orders whose brand row is missing (LEFT JOIN omisell_brand)
+ORDERS = [
+    ("A", 60.0), ("A", 40.0), ("B", 50.0), (None, 20.0), (None, 30.0), ("C", 50.0), ("D", 10.0),
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE orders (Brand TEXT, Revenue REAL)"))
+        conn.execute(
+            text("INSERT INTO orders VALUES (:brand, :revenue)"),
+            [{"brand": brand, "revenue": revenue} for brand, revenue in ORDERS],
+        )
+    return engine
+
+
+@pytest.fixture
+def ranked(tmp_path):
+    shutil.copy(f"{QUERY_DIR}/{RANKED_FILE}", tmp_path / RANKED_FILE)
+    (tmp_path / "BY_BRAND.sql").write_text(
+        "SELECT Brand, SUM(Revenue) AS Revenue, COUNT(*) AS Orders FROM orders GROUP BY Brand",
+        encoding="utf-8",
+    )
+    registry = QueryRegistry(
+        query_dir=str(tmp_path),
+        query_files={"revenue_by_brand": "BY_BRAND.sql", RANKED_QUERY_KEY: RANKED_FILE},
+        query_params={"revenue_by_brand": (), RANKED_QUERY_KEY: config.QUERY_PARAMS[RANKED_QUERY_KEY]},
+        hot_reload=False,
+        query_columns={},
+    )
+    registry.load()
+    return registry.compile_ranked(registry.compile("revenue_by_brand"), "Brand", ["Revenue", "Orders"])
+
+
+def _page(engine, query, limit, after=None):
+    df = pd.read_sql(query.statement, engine, params=query.bind(_ranked_params(limit, after)))
+    return _split_ranked("revenue_by_brand", df)
+
+
+def _groups(page):
+    return [None if pd.isna(group) else group for group in page.rows["Brand"]]
+
+
+def test_pages_visit_every_group_once_with_a_null_group(engine, ranked):
+    pages, after = [], None
+    for _ in range(10):
+        page = _page(engine, ranked, limit=2, after=after)
+        pages.append(_groups(page))
+        after = page.next_after
+        if after is None:
+            break
+    
+    # The NULL group ranks after the named groups of equal revenue
+    assert pages == [["A", "B"], ["C", None], ["D"]]
+    assert page.total_groups == 5
+
+
+def test_page_ending_on_the_null_group_continues(engine, ranked):
+    first = _page(engine, ranked, limit=3)
+    assert first.next_after == (50.0, "C")
+    second = _page(engine, ranked, limit=1, after=first.next_after)
+    assert _groups(second) == [None]
+    assert second.next_after == (50.0, None)
+    
+    third = _page(engine, ranked, limit=1, after=second.next_after)
+    assert _groups(third) == ["D"]
+    assert third.next_after is None
+    assert third.others.empty
+    
+    # "Others" sums the groups after the page, the NULL group included
+    assert first.others["Revenue"].tolist() == [60.0]
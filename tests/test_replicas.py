@@ -0,0 +1,187 @@
+"""Tests for read replica routing (src/db/replicas.py) with stub engines."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+import config
+from src.db import replicas
+from src.db.replicas import Replica, ReplicaRouter, get_replica_router, serves_primary
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+    
+    def mappings(self):
+        return self
+    
+    def first(self):
+        return self._row
+
+
+class StubEngine:
+    """Answers SHOW REPLICA STATUS with a fixed row (None: not replicating)."""
+    
+    def __init__(self, name, status=None, fail=False):
+        self.name = name
+        self.status = status
+        self.fail = fail
+    
+    def connect(self):
+        if self.fail:
+            raise OperationalError("connect", {}, Exception(f"{self.name} is down"))
+        return self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def execute(self, statement):
+        return _Result(self.status)
+    
+    def dispose(self):
+        pass
+
+
+def _replica(name, lag=0):
+    status = None if lag is None else {"Seconds_Behind_Source": lag}
+    replica = Replica(name, StubEngine(name, status))
+    replica.check(force=True)
+    return replica
+
+
+def _read(engine):
+    return engine.name
+
+
+@pytest.fixture(autouse=True)
+def replica_config(monkeypatch):
+    monkeypatch.setattr(config, "DB_REPLICA_MAX_LAG_SECONDS", 30)
+    monkeypatch.setattr(config, "DB_REPLICA_CHECK_INTERVAL", 3600)
+    monkeypatch.setattr(config, "DB_REPLICA_RETRY_SECONDS", 60)
+    monkeypatch.setattr(config, "DB_REPLICA_ALLOW_STANDALONE", False)
+
+
+def test_round_robin_alternates_between_replicas():
+    router = ReplicaRouter(StubEngine("primary"), [_replica("r1"), _replica("r2")], "round_robin")
+    assert [router.run(_read) for _ in range(4)] == ["r1", "r2", "r1", "r2"]
+    assert router.primary_reads == 0
+
+
+def test_least_latency_picks_the_fastest_replica():
+    r1, r2 = _replica("r1"), _replica("r2")
+    r1.latency, r2.latency = 0.050, 0.005
+    router = ReplicaRouter(StubEngine("primary"), [r1, r2], "least_latency")
+    assert {router.run(_read) for _ in range(3)} == {"r2"}
+
+
+def test_lagging_replica_is_skipped():
+    router = ReplicaRouter(StubEngine("primary"), [_replica("r1", lag=120), _replica("r2", lag=2)])
+    assert {router.run(_read) for _ in range(3)} == {"r2"}
+
+
+def test_all_replicas_lagging_falls_back_to_primary():
+    router = ReplicaRouter(StubEngine("primary"), [_replica("r1", lag=120), _replica("r2", lag=45)])
+    assert router.run(_read) == "primary"
+    assert router.primary_reads == 1
+
+
+def test_stopped_replication_is_unusable():
+    replica = Replica("r1", StubEngine("r1", {"Seconds_Behind_Source": None}))
+    replica.check(force=True)
+    assert replica.lag is None and not replica.usable(0)
+    assert "replication is not running" in replica.error
+
+
+def test_server_that_is_not_replicating_is_unusable():
+    replica = _replica("r1", lag=None)
+    assert replica.lag is None
+    router = ReplicaRouter(StubEngine("primary"), [replica])
+    assert router.run(_read) == "primary"
+
+
+def test_standalone_server_is_used_when_allowed(monkeypatch):
+    monkeypatch.setattr(config, "DB_REPLICA_ALLOW_STANDALONE", True)
+    router = ReplicaRouter(StubEngine("primary"), [_replica("r1", lag=None)])
+    assert router.run(_read) == "r1"
+
+
+def test_legacy_status_column_is_read():
+    replica = Replica("r1", StubEngine("r1", {"Seconds_Behind_Master": 3}))
+    replica.check(force=True)
+    assert replica.lag == 3.0
+
+
+def test_connection_error_marks_replica_down_and_retries_after_delay():
+    r1 = _replica("r1")
+    router = ReplicaRouter(StubEngine("primary"), [r1])
+    
+    def read(engine):
+        if engine.name == "r1":
+            raise OperationalError("SELECT 1", {}, Exception("lost connection"))
+        return engine.name
+    
+    assert router.run(read) == "primary"
+    assert router.fallbacks == 1 and r1.failures == 1
+    # Skipped while down, even for reads that would succeed
+    assert router.run(_read) == "primary"
+    
+    # Retry delay over: the replica is used again
+    r1.down_until = 0.0
+    assert router.run(_read) == "r1"
+
+
+def test_unreachable_replica_fails_its_check():
+    replica = Replica("r1", StubEngine("r1", fail=True))
+    replica.check(force=True)
+    assert replica.failures == 1 and not replica.usable(0)
+
+
+def test_query_errors_are_not_retried_on_primary():
+    router = ReplicaRouter(StubEngine("primary"), [_replica("r1")])
+    
+    def read(engine):
+        raise ValueError("bad result")
+    
+    with pytest.raises(ValueError):
+        router.run(read)
+    assert router.fallbacks == 0
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ReplicaRouter(StubEngine("primary"), [], "random")
+
+
+@pytest.fixture
+def primary_config(monkeypatch):
+    """DB_REPLICAS configured; routers are built from stub replicas."""
+    monkeypatch.setattr(config, "DB_HOST", "db.internal")
+    monkeypatch.setattr(config, "DB_PORT", 3306)
+    monkeypatch.setattr(config, "DB_NAME", "omisell_db")
+    monkeypatch.setattr(config, "DB_REPLICAS", ["r1:3306"])
+    monkeypatch.setattr(
+        replicas, "create_replica_router", lambda primary: ReplicaRouter(primary, [_replica("r1")])
+    )
+
+
+def test_each_primary_engine_gets_its_own_router(primary_config):
+    first = create_engine("mysql+pymysql://user:pw@db.internal:3306/omisell_db")
+    second = create_engine("mysql+pymysql://user:pw@db.internal/omisell_db")
+    router = get_replica_router(first)
+    assert router is get_replica_router(first)
+    assert router.primary is first
+    assert get_replica_router(second).primary is second
+
+
+def test_engines_on_other_servers_are_not_routed(primary_config):
+    assert serves_primary(create_engine("mysql+pymysql://user:pw@db.internal:3306/omisell_db"))
+    for url in (
+        "mysql+pymysql://root@127.0.0.1:3306/omisell_db",  # Benchmark database
+        "mysql+pymysql://user:pw@db.internal:3306/other_db",
+        "sqlite://",
+    ):
+        assert get_replica_router(create_engine(url)) is None
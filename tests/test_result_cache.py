@@ -0,0 +1,174 @@
+"""Tests for the result cache (src/services/result_cache.py)."""
+
+import threading
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.result_cache import (
+    ResultCache,
+    decode_frame,
+    encode_frame,
+    make_cache_key,
+    make_query_key,
+)
+
+
+def _frame(rows=100):
+    return pd.DataFrame({
+        "Revenue": np.arange(rows, dtype="float64"),
+        "Orders": np.arange(rows, dtype="int64"),
+        "BucketStart": pd.date_range("2024-05-01", periods=rows, freq="h"),
+        "Province": pd.Categorical(np.where(np.arange(rows) % 2, "HN", "HCM")),
+        "StatusName": [f"S{i % 3}" for i in range(rows)],
+    })
+
+
+@pytest.mark.parametrize("compression", [None, "lz4", "zstd"])
+def test_arrow_round_trip_keeps_values_and_dtypes(compression):
+    df = _frame()
+    payload, fmt = encode_frame(df, compression)
+    assert fmt == "arrow"
+    pd.testing.assert_frame_equal(decode_frame(payload, fmt), df)
+
+
+def test_mixed_object_column_falls_back_to_pickle():
+    df = pd.DataFrame({"value": [1, "a", Decimal("2.5")]})
+    payload, fmt = encode_frame(df, "lz4")
+    assert fmt == "pickle"
+    pd.testing.assert_frame_equal(decode_frame(payload, fmt), df)
+
+
+def test_decoded_columns_are_writable():
+    payload, fmt = encode_frame(_frame(), "lz4")
+    df = decode_frame(payload, fmt)
+    for column in ("Revenue", "Orders", "BucketStart"):
+        assert df[column].array._ndarray.flags.writeable, column
+
+
+def test_cached_frame_can_be_edited_in_place():
+    cache = ResultCache(memory_max_bytes=10 << 20)
+    cache.put("k", _frame(), ttl=60)
+    df = cache.get("k")
+    df["Revenue"] *= 2
+    df.loc[0, "Orders"] = 7
+    df["Revenue"] = df["Revenue"].where(df["Revenue"] > 10)
+    df.fillna({"Revenue": 0.0}, inplace=True)
+    assert df.loc[0, "Orders"] == 7
+    # Every read decodes its own copy: the cached entry is unchanged
+    pd.testing.assert_frame_equal(cache.get("k"), _frame())
+
+
+class _Clock:
+    """Stand-in for time.time that tests move forward by hand."""
+    
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("src.services.result_cache.time.time", clock)
+    return clock
+
+
+def _small(value):
+    return pd.DataFrame({"Revenue": [float(value)] * 10})
+
+
+def test_cache_keys_ignore_param_order_and_list_types():
+    assert make_cache_key("q", {"a": 1, "b": [1, 2]}) == make_cache_key("q", {"b": (1, 2), "a": 1})
+    assert make_cache_key("q", None) == make_cache_key("q", ())
+    assert make_query_key("SELECT 1", {}, "q") != make_query_key("SELECT 2", {}, "q")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    payload, _ = encode_frame(_small(0), "lz4")
+    cache = ResultCache(memory_max_bytes=int(payload.size * 2.5))
+    cache.put("a", _small(1), ttl=60)
+    cache.put("b", _small(2), ttl=60)
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    cache.put("c", _small(3), ttl=60)
+    
+    assert cache.get("b") is None
+    assert cache.get("a")["Revenue"].iloc[0] == 1.0
+    assert cache.get("c")["Revenue"].iloc[0] == 3.0
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_entry_larger_than_memory_budget_is_kept_on_disk(tmp_path):
+    cache = ResultCache(memory_max_bytes=16, disk_dir=str(tmp_path), disk_max_bytes=10 << 20)
+    cache.put("big", _frame(), ttl=60)
+    assert cache.stats()["memory_entries"] == 0
+    
+    hit = cache.lookup("big")
+    assert hit.tier == "disk"
+    pd.testing.assert_frame_equal(hit.df, _frame())
+
+
+def test_stale_entry_is_served_until_hard_ttl(clock):
+    cache = ResultCache(memory_max_bytes=10 << 20)
+    cache.put("k", _small(1), ttl=10, hard_ttl=100)
+    assert not cache.lookup("k").stale
+    
+    clock.now += 50
+    hit = cache.lookup("k")
+    assert hit.stale and hit.tier == "memory"
+    
+    clock.now += 60
+    assert cache.lookup("k") is None
+    stats = cache.stats()
+    assert stats["stale_hits"] == 1 and stats["expired"] == 1 and stats["misses"] == 1
+
+
+def test_disk_tier_survives_a_new_process(tmp_path, clock):
+    ResultCache(memory_max_bytes=10 << 20, disk_dir=str(tmp_path), disk_max_bytes=10 << 20).put(
+        "k", _frame(), ttl=60
+    )
+    cache = ResultCache(memory_max_bytes=10 << 20, disk_dir=str(tmp_path), disk_max_bytes=10 << 20)
+    hit = cache.lookup("k")
+    assert hit.tier == "disk"
+    pd.testing.assert_frame_equal(hit.df, _frame())
+    # Promoted to memory
+    assert cache.lookup("k").tier == "memory"
+    
+    clock.now += 120
+    assert ResultCache(memory_max_bytes=10 << 20, disk_dir=str(tmp_path)).stats()["disk_entries"] == 0
+
+
+def test_revalidation_runs_once_per_key():
+    cache = ResultCache(memory_max_bytes=10 << 20)
+    started, release = threading.Event(), threading.Event()
+    
+    def loader():
+        started.set()
+        release.wait(5)
+        return _small(2)
+    
+    assert cache.revalidate("k", loader, ttl=60)
+    started.wait(5)
+    assert not cache.revalidate("k", loader, ttl=60)
+    release.set()
+    for _ in range(100):
+        if not cache.stats()["revalidating"]:
+            break
+        time.sleep(0.01)
+    assert cache.get("k")["Revenue"].iloc[0] == 2.0
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_failed_revalidation_keeps_the_stale_entry():
+    cache = ResultCache(memory_max_bytes=10 << 20)
+    cache.put("k", _small(1), ttl=60)
+    assert cache.claim_revalidation("k")
+    cache.release_revalidation("k", failed=True)
+    assert cache.get("k")["Revenue"].iloc[0] == 1.0
+    assert cache.stats()["revalidation_errors"] == 1
+    assert cache.claim_revalidation("k")
@@ -0,0 +1,73 @@
+"""Tests for rollup routing (src/services/rollups.py)."""
+
+from datetime import datetime
+
+import pytest
+
+import config
+from src.services.rollups import ROLLUP_TABLES, _table_covers, resolve_rollup_query
+from src.utils.sql_helpers import build_filters
+
+START, END = "2024-05-01 00:00:00", "2024-05-07 23:59:59"
+FRESH = {name: datetime(2024, 5, 8, 0, 0, 0) for name in ROLLUP_TABLES}
+DOMAINS = {
+    "brand": ["A", "B", "C"],
+    "platform": ["Shopee", "Lazada"],
+    "shop": ["S1", "S2"],
+    "status": ["Done", "Cancelled"],
+}
+
+
+@pytest.fixture(autouse=True)
+def rollups_enabled(monkeypatch):
+    monkeypatch.setattr(config, "ROLLUP_ENABLED", True)
+
+
+def _route(dataset, filters, watermarks=FRESH, start=START, end=END, **fields):
+    query = resolve_rollup_query(dataset, start, end, filters, None, watermarks=watermarks, **fields)
+    return None if query is None else query.sql
+
+
+@pytest.mark.parametrize("dataset", ["period_totals", "status", "province"])
+def test_page_default_selection_routes_to_rollup(dataset):
+    # Every checkbox ticked, as the filter section starts
+    filters = build_filters(
+        DOMAINS["brand"], DOMAINS["platform"], DOMAINS["shop"], DOMAINS["status"],
+        domains=DOMAINS,
+    )
+    assert "rollup_catalogue_orders_hourly" in _route(dataset, filters)
+
+
+def test_trend_routes_with_its_unit():
+    filters = build_filters(DOMAINS["brand"], [], [], [], domains=DOMAINS)
+    assert "rollup_catalogue_orders_hourly" in _route("trend", filters, unit="DAY")
+
+
+def test_single_brand_uses_brand_table():
+    assert "rollup_catalogue_hourly" in _route("period_totals", build_filters(["A"], [], [], []))
+
+
+def test_several_brands_stay_on_raw_table():
+    # An order can span brands: summed per-brand distinct counts would overcount
+    assert _route("period_totals", build_filters(["A", "B"], [], [], [])) is None
+
+
+def test_stale_watermark_skips_rollup():
+    stale = {name: datetime(2024, 5, 3, 0, 0, 0) for name in ROLLUP_TABLES}
+    assert _route("period_totals", build_filters([], [], [], []), watermarks=stale) is None
+
+
+def test_range_not_hour_aligned_skips_rollup():
+    filters = build_filters([], [], [], [])
+    assert _route("period_totals", filters, start="2024-05-01 00:30:00") is None
+
+
+def test_disabled_rollups_are_never_used(monkeypatch):
+    monkeypatch.setattr(config, "ROLLUP_ENABLED", False)
+    assert _route("period_totals", build_filters([], [], [], [])) is None
+
+
+def test_table_covers_checks_dimensions():
+    table = ROLLUP_TABLES["rollup_order_platform_hourly"]
+    assert _table_covers(table, ("PlatformName",), {})
+    assert not _table_covers(table, ("PlatformName",), {"StatusName": ["Done"]})
@@ -0,0 +1,56 @@
+"""Tests for FilterSpec normalization and binds (src/utils/sql_helpers.py)."""
+
+from src.utils.sql_helpers import ALL_OPTION, FilterSpec, build_filters
+
+DOMAINS = {
+    "brand": ["A", "B", "C"],
+    "platform": ["Shopee", "Lazada"],
+    "shop": ["S1", "S2"],
+    "status": ["Done", "Cancelled"],
+}
+
+
+def test_values_are_deduplicated_and_sorted():
+    spec = build_filters(["B", "A", "B", ALL_OPTION], [], [], [])
+    assert spec.brand == ("A", "B")
+    assert spec.cache_key == build_filters(["A", "B"], [], [], []).cache_key
+
+
+def test_empty_selection_is_no_filter():
+    spec = build_filters([], [], [], [])
+    assert not spec
+    assert spec.sql == "" and spec.bind_sql == "" and spec.bind_params == {}
+
+
+def test_bind_sql_and_params_follow_column_order():
+    spec = build_filters(["A"], [], [], ["Done", "Cancelled"])
+    assert spec.bind_sql == "AND brand IN :filter_brand AND StatusName IN :filter_status"
+    assert spec.bind_params == {"filter_brand": ["A"], "filter_status": ["Cancelled", "Done"]}
+    assert spec.sql == "AND brand IN (%s) AND StatusName IN (%s, %s)"
+    assert spec.params == ("A", "Cancelled", "Done")
+    assert spec.selection == {"brand": ["A"], "StatusName": ["Cancelled", "Done"]}
+
+
+def test_full_selection_is_no_filter():
+    spec = build_filters(
+        DOMAINS["brand"], DOMAINS["platform"], DOMAINS["shop"], DOMAINS["status"],
+        domains=DOMAINS,
+    )
+    assert not spec
+    assert spec == FilterSpec()
+
+
+def test_partial_selection_keeps_its_filter():
+    spec = build_filters(["A", "B"], DOMAINS["platform"], [], [], domains=DOMAINS)
+    assert spec.brand == ("A", "B")
+    assert spec.platform == ()
+
+
+def test_field_without_domain_is_kept():
+    spec = build_filters([], ["Shopee", "Lazada"], [], [], domains={"brand": DOMAINS["brand"]})
+    assert spec.platform == ("Lazada", "Shopee")
+
+
+def test_empty_domain_does_not_drop_the_selection():
+    spec = FilterSpec.from_lists({"brand": []}, brand=["A"])
+    assert spec.brand == ("A",)
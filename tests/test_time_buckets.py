@@ -0,0 +1,67 @@
+"""Tests for trend bucket planning (src/utils/time_buckets.py)."""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.utils.time_buckets import plan_buckets
+
+
+@pytest.mark.parametrize("start, end, grain, count", [
+    ("2024-05-01 00:00:00", "2024-05-01 23:59:59", "minute", 1440),
+    ("2024-05-01 00:00:00", "2024-05-07 23:59:59", "hour", 168),
+    ("2024-05-01 00:00:00", "2024-05-31 23:59:59", "day", 31),
+    ("2024-01-01 00:00:00", "2024-12-31 23:59:59", "week", 53),
+    ("2020-01-01 00:00:00", "2024-12-31 23:59:59", "month", 60),
+])
+def test_finest_grain_that_fits_is_chosen(start, end, grain, count):
+    plan = plan_buckets(start, end, max_points=1440 if grain == "minute" else 200)
+    assert (plan.grain, plan.step, plan.count) == (grain, 1, count)
+
+
+def test_override_grows_the_step_instead_of_the_point_count():
+    plan = plan_buckets("2024-05-01 00:00:00", "2024-05-01 23:59:59", grain="minute", max_points=200)
+    assert plan.step == 8 and plan.count == 180
+    assert plan.label == "8 Phút"
+    assert plan.unit == "MINUTE"
+
+
+def test_unknown_grain_is_rejected():
+    with pytest.raises(ValueError):
+        plan_buckets("2024-05-01 00:00:00", "2024-05-01 23:59:59", grain="fortnight")
+
+
+def test_bucket_starts_are_aligned_to_the_range_start():
+    plan = plan_buckets(datetime(2024, 5, 1, 6), datetime(2024, 5, 1, 17, 59, 59), grain="hour", max_points=4)
+    assert plan.step == 3
+    assert list(plan.bucket_starts()) == [
+        pd.Timestamp("2024-05-01 06:00"),
+        pd.Timestamp("2024-05-01 09:00"),
+        pd.Timestamp("2024-05-01 12:00"),
+        pd.Timestamp("2024-05-01 15:00"),
+    ]
+
+
+def test_bucket_numbers_match_bucket_starts():
+    plan = plan_buckets("2024-05-01 00:00:00", "2024-05-07 23:59:59", grain="hour", max_points=50)
+    times = pd.Series(pd.to_datetime([
+        "2024-05-01 00:00:00", "2024-05-01 03:59:59", "2024-05-01 04:00:00", "2024-05-07 23:59:59",
+    ]))
+    numbers = plan.bucket_numbers(times)
+    assert list(numbers) == [0, 0, 1, plan.count - 1]
+    starts = plan.bucket_starts()
+    assert all(starts[n] <= t for n, t in zip(numbers, times))
+
+
+def test_month_buckets_count_whole_months_from_the_start():
+    plan = plan_buckets("2024-01-31 00:00:00", "2024-04-30 23:59:59", grain="month")
+    assert plan.count == 4
+    assert list(plan.bucket_starts()) == [
+        pd.Timestamp("2024-01-31"),
+        pd.Timestamp("2024-02-29"),
+        pd.Timestamp("2024-03-31"),
+        pd.Timestamp("2024-04-30"),
+    ]
+    times = pd.Series(pd.to_datetime(["2024-01-31 00:00:00", "2024-02-28 00:00:00", "2024-03-01 00:00:00", "2024-04-15 12:00:00"]))
+    assert list(plan.bucket_numbers(times)) == [0, 0, 1, 2]
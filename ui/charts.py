@@ -1,82 +1,38 @@
 """
 Chart UI components.
-Handles Plotly chart rendering.
+Handles Plotly chart rendering (figures are built and cached by ui/figures.py).
 """
 
-from typing import Optional
 import streamlit as st
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
 
-import config
 from src.logger import get_logger
+from ui.figures import figure_spec
 
 logger = get_logger(__name__)
 
 
-def render_hourly_trend_chart(trend_data: pd.DataFrame) -> None:
+def render_hourly_trend_chart(trend_data: pd.DataFrame, bucket_label: str = "Giờ") -> None:
     """
-    Render dual-axis line chart for hourly revenue and orders trend.
+    Render dual-axis line chart for the revenue and orders trend.
     
     Args:
-        trend_data: DataFrame with HOURNUM, Revenue, Orders columns
+        trend_data: DataFrame with BucketStart, Revenue, Orders columns
+            (one row per time bucket, see data_service.get_trend_data)
+        bucket_label: Bucket size for the x-axis title (BucketPlan.label)
     """
     if trend_data.empty:
         st.info("Chưa có dữ liệu biểu đồ cho khoảng thời gian này.")
         return
     
     try:
-        # Create figure with secondary y-axis
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        # Revenue line (left axis)
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["HOURNUM"],
-                y=trend_data["Revenue"],
-                name="Doanh Số",
-                line=dict(color=config.CHART_COLORS["revenue"]),
-            ),
-            secondary_y=False,
-        )
-        
-        # Orders line (right axis)
-        fig.add_trace(
-            go.Scatter(
-                x=trend_data["HOURNUM"],
-                y=trend_data["Orders"],
-                name="Đơn Hàng",
-                line=dict(color=config.CHART_COLORS["orders"]),
-            ),
-            secondary_y=True,
-        )
-        
-        # Update layout
-        fig.update_layout(
-            title_text="",
-            hovermode="x unified",
-            xaxis_title="Giờ (0-23)",
-            height=config.CHART_HEIGHT,
-            margin=dict(l=20, r=20, t=30, b=20),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-            ),
-        )
-        
-        # Set y-axes titles
-        fig.update_yaxes(title_text="Doanh Số", secondary_y=False)
-        fig.update_yaxes(title_text="Đơn Hàng", secondary_y=True)
+        fig = figure_spec("trend", trend_data, bucket_label=bucket_label)
         
         st.plotly_chart(fig, use_container_width=True)
-        logger.info("Hourly trend chart rendered successfully")
+        logger.info(f"Trend chart rendered: {len(trend_data)} points")
     
     except Exception as e:
-        logger.error(f"Error rendering hourly trend chart: {e}")
+        logger.error(f"Error rendering trend chart: {e}")
         st.error(f"Trend Chart Error: {e}")
 
 
@@ -94,43 +50,8 @@ def render_stacked_bar_chart(data: pd.DataFrame, category_col: str, platform_col
         return
     
     try:
-        # Create figure
-        fig = go.Figure()
-        
-        # Get unique platforms for colors
-        platforms = data[platform_col].unique() if platform_col else []
-        colors = ["#1e3a8a", "#ef4444", "#f97316", "#22c55e", "#8b5cf6"]
-        
-        # Add trace for each platform
-        for i, platform in enumerate(platforms):
-            platform_data = data[data[platform_col] == platform]
-            color = colors[i % len(colors)]
-            
-            fig.add_trace(
-                go.Bar(
-                    x=platform_data[category_col],
-                    y=platform_data["Revenue"],
-                    name=platform,
-                    marker=dict(color=color),
-                )
-            )
-        
-        # Update layout
-        fig.update_layout(
-            barmode="stack",
-            title_text="",
-            hovermode="x unified",
-            xaxis_title=category_col.capitalize(),
-            yaxis_title="Doanh Số",
-            height=config.CHART_HEIGHT,
-            margin=dict(l=20, r=20, t=30, b=20),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1,
-            ),
+        fig = figure_spec(
+            "stacked_bar", data, category_col=category_col, platform_col=platform_col
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -155,23 +76,7 @@ def render_pie_chart(data: pd.DataFrame, label_col: str, value_col: str = "Reven
         return
     
     try:
-        # Create figure
-        fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=data[label_col],
-                    values=data[value_col],
-                    hovertemplate="<b>%{label}</b><br>%{value:,.0f} (%{percent})<extra></extra>",
-                )
-            ]
-        )
-        
-        # Update layout
-        fig.update_layout(
-            title_text="",
-            height=config.CHART_HEIGHT,
-            margin=dict(l=20, r=20, t=30, b=20),
-        )
+        fig = figure_spec("pie", data, label_col=label_col, value_col=value_col)
         
         st.plotly_chart(fig, use_container_width=True)
         logger.info(f"Pie chart rendered for {label_col}")
@@ -180,3 +85,26 @@ def render_pie_chart(data: pd.DataFrame, label_col: str, value_col: str = "Reven
         logger.error(f"Error rendering pie chart: {e}")
         st.error(f"Pie Chart Error: {e}")
 
+
+
+def render_waterfall_chart(records: pd.DataFrame) -> None:
+    """
+    Render a query waterfall: one horizontal bar per query, from its start
+    offset to its end, colored by cache outcome.
+    
+    Args:
+        records: DataFrame from RenderProfile.to_frame()
+            (query_id, start_ms, wall_ms, server_ms, cache, thread columns)
+    """
+    if records.empty:
+        st.info("Chưa có truy vấn nào được ghi lại.")
+        return
+    
+    try:
+        fig = figure_spec("waterfall", records)
+        
+        st.plotly_chart(fig, use_container_width=True)
+    
+    except Exception as e:
+        logger.error(f"Error rendering waterfall chart: {e}")
+        st.error(f"Waterfall Chart Error: {e}")
@@ -2,11 +2,14 @@
 Data table UI components.
 """
 
+import time
+from datetime import datetime
 from typing import Optional
 import streamlit as st
 import pandas as pd
 
 import config
+from src.utils.date_helpers import format_age
 from src.utils.formatters import format_number
 from src.logger import get_logger
 
@@ -81,3 +84,23 @@ def render_province_table(province_data: pd.DataFrame) -> None:
     except Exception as e:
         logger.error(f"Error rendering province table: {e}")
         st.error(f"Province Table Error: {e}")
+
+
+def render_data_age(as_of: Optional[float], refreshing: bool = False) -> None:
+    """
+    Render when the displayed data was read from the database.
+    
+    Args:
+        as_of: Read time of the oldest dataset on the page (epoch seconds), None to skip
+        refreshing: Some datasets are stale cache entries being refreshed in the background
+    """
+    if as_of is None:
+        return
+    
+    caption = (
+        f"🕒 Dữ liệu lúc {datetime.fromtimestamp(as_of).strftime('%H:%M:%S')}"
+        f" ({format_age(time.time() - as_of)})"
+    )
+    if refreshing:
+        caption += " · đang làm mới, tải lại trang để xem số liệu mới"
+    st.caption(caption)
@@ -0,0 +1,287 @@
+"""
+Chart figure builders.
+Builds the Plotly figures of ui/charts.py from their DataFrames and caches
+the figure specs by a content hash of the data, so a rerun triggered by an
+unrelated widget reuses the spec instead of rebuilding the figure:
+
+- builders are pure (DataFrame + options -> go.Figure) and vectorized: the
+  stacked bar pivots the data once and takes every series from the pivot
+- figure_spec hashes the frame (pd.util.hash_pandas_object, dtypes included)
+  and looks the spec up in st.cache_data (FIGURE_CACHE_MAX_ENTRIES, LRU)
+    
+    spec = figure_spec("stacked_bar", df, category_col="brand", platform_col="PlatformName")
+    st.plotly_chart(spec, use_container_width=True)
+"""
+
+import hashlib
+import pickle
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+import config
+
+_MARGIN = dict(l=20, r=20, t=30, b=20)
+_LEGEND_TOP = dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+_WATERFALL_COLORS = {
+    "miss": "#ef4444",
+    "memory": "#22c55e",
+    "disk": "#84cc16",
+    "stale": "#f59e0b",
+    "store": "#3b82f6",
+    "error": "#6b7280",
+}
+
+
+def build_trend_figure(data: pd.DataFrame, bucket_label: str = "Giờ") -> go.Figure:
+    """
+    Dual-axis revenue and orders lines.
+    
+    Args:
+        data: DataFrame with BucketStart, Revenue, Orders columns
+        bucket_label: Bucket size for the x-axis title (BucketPlan.label)
+    
+    Returns:
+        Plotly figure
+    """
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    x = data["BucketStart"].to_numpy()
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=data["Revenue"].to_numpy(),
+            name="Doanh Số",
+            line=dict(color=config.CHART_COLORS["revenue"]),
+        ),
+        secondary_y=False,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=data["Orders"].to_numpy(),
+            name="Đơn Hàng",
+            line=dict(color=config.CHART_COLORS["orders"]),
+        ),
+        secondary_y=True,
+    )
+    fig.update_layout(
+        title_text="",
+        hovermode="x unified",
+        xaxis_title=f"Thời gian (mỗi điểm: {bucket_label})",
+        height=config.CHART_HEIGHT,
+        margin=_MARGIN,
+        legend=_LEGEND_TOP,
+    )
+    fig.update_yaxes(title_text="Doanh Số", secondary_y=False)
+    fig.update_yaxes(title_text="Đơn Hàng", secondary_y=True)
+    return fig
+
+
+def label_missing(values: pd.Series) -> pd.Series:
+    """
+    Replace missing dimension values with config.CHART_MISSING_LABEL, so their
+    rows stay in the chart as a group of their own.
+    
+    Args:
+        values: Dimension column (object, string or category dtype)
+    
+    Returns:
+        values with the label in place of NULL / NaN (values itself if none)
+    """
+    if not values.isna().any():
+        return values
+    label = config.CHART_MISSING_LABEL
+    if isinstance(values.dtype, pd.CategoricalDtype) and label not in values.cat.categories:
+        values = values.cat.add_categories([label])
+    return values.fillna(label)
+
+
+def pivot_stack(
+    data: pd.DataFrame,
+    category_col: str,
+    platform_col: Optional[str],
+    value_col: str = "Revenue",
+) -> pd.DataFrame:
+    """
+    Sum value_col into a category x series table in one groupby pass.
+    
+    Args:
+        data: Long DataFrame (one row per category and series, or more)
+        category_col: Column of the x categories
+        platform_col: Column of the stacked series (None: one series)
+        value_col: Column to sum
+    
+    Returns:
+        DataFrame indexed by category, one column per series, in order of
+        first appearance; NaN where a series has no row for a category.
+        Missing categories and series are kept under CHART_MISSING_LABEL
+    """
+    keys = [category_col, platform_col] if platform_col else [category_col]
+    data = data.assign(**{key: label_missing(data[key]) for key in keys})
+    categories = data[category_col].unique()
+    if not platform_col:
+        sums = data.groupby(category_col, sort=False, observed=True, dropna=False)[value_col].sum()
+        return sums.to_frame(value_col).reindex(categories)
+    sums = data.groupby(keys, sort=False, observed=True, dropna=False)[value_col].sum()
+    return sums.unstack(platform_col).reindex(index=categories, columns=data[platform_col].unique())
+
+
+def build_stacked_bar_figure(
+    data: pd.DataFrame,
+    category_col: str,
+    platform_col: Optional[str] = None,
+) -> go.Figure:
+    """
+    Revenue bars per category, stacked by platform.
+    
+    Args:
+        data: DataFrame with category, platform, and Revenue columns
+        category_col: Column name for categories (e.g., 'brand')
+        platform_col: Column name for stacking (e.g., 'PlatformName')
+    
+    Returns:
+        Plotly figure
+    """
+    table = pivot_stack(data, category_col, platform_col)
+    x = table.index.astype(str).to_numpy()
+    colors = config.CHART_STACK_COLORS
+    
+    fig = go.Figure([
+        go.Bar(
+            x=x,
+            y=table[series].to_numpy(dtype="float64"),
+            name=str(series) if platform_col else "Doanh Số",
+            marker=dict(color=colors[i % len(colors)]),
+        )
+        for i, series in enumerate(table.columns)
+    ])
+    fig.update_layout(
+        barmode="stack",
+        title_text="",
+        hovermode="x unified",
+        xaxis_title=category_col.capitalize(),
+        yaxis_title="Doanh Số",
+        height=config.CHART_HEIGHT,
+        margin=_MARGIN,
+        legend=_LEGEND_TOP,
+    )
+    return fig
+
+
+def build_pie_figure(data: pd.DataFrame, label_col: str, value_col: str = "Revenue") -> go.Figure:
+    """
+    Share of value_col per label.
+    
+    Args:
+        data: DataFrame with label and value columns
+        label_col: Column name for labels
+        value_col: Column name for values (default: Revenue)
+    
+    Returns:
+        Plotly figure
+    """
+    fig = go.Figure(
+        go.Pie(
+            labels=label_missing(data[label_col]).astype(str).to_numpy(),
+            values=data[value_col].to_numpy(),
+            hovertemplate="<b>%{label}</b><br>%{value:,.0f} (%{percent})<extra></extra>",
+        )
+    )
+    fig.update_layout(title_text="", height=config.CHART_HEIGHT, margin=_MARGIN)
+    return fig
+
+
+def build_waterfall_figure(records: pd.DataFrame) -> go.Figure:
+    """
+    Query waterfall: one horizontal bar per query, from its start offset to
+    its end, colored by cache outcome.
+    
+    Args:
+        records: DataFrame from RenderProfile.to_frame()
+            (query_id, start_ms, wall_ms, server_ms, cache, thread columns)
+    
+    Returns:
+        Plotly figure
+    """
+    labels = [f"{i + 1}. {query_id}" for i, query_id in enumerate(records["query_id"])]
+    fig = go.Figure(
+        go.Bar(
+            y=labels,
+            x=records["wall_ms"].to_numpy(),
+            base=records["start_ms"].to_numpy(),
+            orientation="h",
+            marker=dict(color=records["cache"].map(_WATERFALL_COLORS).fillna("#6b7280").tolist()),
+            customdata=records[["cache", "server_ms", "rows", "thread"]].to_numpy(),
+            hovertemplate=(
+                "<b>%{y}</b><br>wall %{x:,.1f} ms (start %{base:,.1f} ms)"
+                "<br>server %{customdata[1]:,.1f} ms<br>cache %{customdata[0]}"
+                "<br>%{customdata[2]:,} rows · %{customdata[3]}<extra></extra>"
+            ),
+        )
+    )
+    fig.update_layout(
+        title_text="",
+        xaxis_title="ms từ lúc bắt đầu render",
+        yaxis=dict(autorange="reversed"),
+        height=max(config.CHART_HEIGHT // 2, 40 * len(records) + 80),
+        margin=_MARGIN,
+    )
+    return fig
+
+
+FIGURE_BUILDERS: Dict[str, Callable[..., go.Figure]] = {
+    "trend": build_trend_figure,
+    "stacked_bar": build_stacked_bar_figure,
+    "pie": build_pie_figure,
+    "waterfall": build_waterfall_figure,
+}
+
+
+def frame_digest(data: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame: column names, dtypes and values in row order
+    (the index is ignored).
+    
+    Args:
+        data: DataFrame to hash
+    
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha1(repr(list(zip(data.columns, map(str, data.dtypes)))).encode("utf-8"))
+    try:
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cell values (lists, dicts): hash the pickled frame instead
+        digest.update(pickle.dumps(data.reset_index(drop=True)))
+    return digest.hexdigest()
+
+
+@st.cache_data(max_entries=config.FIGURE_CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_spec(kind: str, digest: str, _data: pd.DataFrame, params: Tuple[Tuple[str, Any], ...]) -> dict:
+    """Build a figure once per (kind, data digest, options); _data is not hashed."""
+    return FIGURE_BUILDERS[kind](_data, **dict(params)).to_plotly_json()
+
+
+def figure_spec(kind: str, data: pd.DataFrame, **params: Any) -> dict:
+    """
+    Plotly figure spec of a chart, built on the first call for this data and
+    options and served from the cache afterwards.
+    
+    Args:
+        kind: FIGURE_BUILDERS key ("trend", "stacked_bar", "pie", "waterfall")
+        data: Chart DataFrame
+        **params: Builder options (hashable values)
+    
+    Returns:
+        Figure dict for st.plotly_chart
+    
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind not in FIGURE_BUILDERS:
+        raise ValueError(f"Unknown figure kind: {kind}")
+    return _cached_spec(kind, frame_digest(data), data, tuple(sorted(params.items())))
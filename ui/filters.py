@@ -108,20 +108,20 @@ def checkbox_filter(
 
 def render_filter_section(
     engine,
-    brand_options: List[str],
-    platform_options: List[str],
-    shop_options: Dict[str, int],
-    status_options: List[str],
+    brand_options: Union[List[str], Dict[str, Optional[int]]],
+    platform_options: Union[List[str], Dict[str, Optional[int]]],
+    shop_options: Union[List[str], Dict[str, Optional[int]]],
+    status_options: Union[List[str], Dict[str, Optional[int]]],
 ) -> Dict[str, List[str]]:
     """
     Render complete filter section with all filters.
     
     Args:
         engine: SQLAlchemy Engine (for data loading)
-        brand_options: List of brands
-        platform_options: List of platforms
-        shop_options: Dict of shops with counts
-        status_options: List of statuses
+        brand_options: List of brands or Dict of brands with order counts
+        platform_options: List of platforms or Dict of platforms with order counts
+        shop_options: List of shops or Dict of shops with order counts
+        status_options: List of statuses or Dict of statuses with order counts
         
     Returns:
         Dictionary with selected values:
@@ -17,6 +17,7 @@ def render_kpi_card(
     value: str,
     growth: float,
     style: str = "card-white",
+    comparison_label: str = config.COMPARISON_MODES["previous"],
 ) -> str:
     """
     Generate HTML for KPI metric card.
@@ -26,6 +27,7 @@ def render_kpi_card(
         value: Formatted value to display
         growth: Growth percentage
         style: CSS class name (card-white, card-blue, card-red, card-purple)
+        comparison_label: Period the growth compares against (config.COMPARISON_MODES)
         
     Returns:
         HTML string for the card
@@ -34,17 +36,21 @@ def render_kpi_card(
     html = f"""<div class="metric-card {style}">
 <div style="font-size:14px; opacity:0.9">{title}</div>
 <div style="font-size:26px; font-weight:bold; margin: 8px 0;">{value}</div>
-<div style="font-size:13px">{arrow} {abs(growth):.1f}% so với kỳ trước</div>
+<div style="font-size:13px">{arrow} {abs(growth):.1f}% so với {comparison_label}</div>
 </div>"""
     return html
 
 
-def render_kpi_section(kpi_data) -> None:
+def render_kpi_section(
+    kpi_data,
+    comparison_label: str = config.COMPARISON_MODES["previous"],
+) -> None:
     """
     Render KPI metrics section with 4 cards.
     
     Args:
         kpi_data: DataFrame with KPI metrics
+        comparison_label: Period the growth compares against (config.COMPARISON_MODES)
     """
     st.write("")
     k_cols = st.columns(4)
@@ -68,6 +74,7 @@ def render_kpi_section(kpi_data) -> None:
                     format_currency(revenue_val),
                     revenue_growth,
                     config.CARD_STYLES["white"],
+                    comparison_label,
                 ),
                 unsafe_allow_html=True,
             )
@@ -83,6 +90,7 @@ def render_kpi_section(kpi_data) -> None:
                     format_number(orders_val),
                     orders_growth,
                     config.CARD_STYLES["blue"],
+                    comparison_label,
                 ),
                 unsafe_allow_html=True,
             )
@@ -98,6 +106,7 @@ def render_kpi_section(kpi_data) -> None:
                     format_currency(aov_val),
                     aov_growth,
                     config.CARD_STYLES["red"],
+                    comparison_label,
                 ),
                 unsafe_allow_html=True,
             )
@@ -112,6 +121,7 @@ def render_kpi_section(kpi_data) -> None:
                     f"{revenue_growth:.1f}%",
                     revenue_growth,
                     config.CARD_STYLES["purple"],
+                    comparison_label,
                 ),
                 unsafe_allow_html=True,
             )
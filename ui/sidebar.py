@@ -7,6 +7,8 @@ import streamlit as st
 from typing import Dict, List, Optional
 import config
 from src.logger import get_logger
+from src.services.profiler import profile_render
+from ui.data_tables import render_data_age
 
 logger = get_logger(__name__)
 
@@ -40,11 +42,16 @@ def render_sidebar() -> Optional[str]:
 def render_navigation_menu() -> Optional[str]:
     """
     Render navigation menu items using radio buttons.
+    Items with "hidden": True are only listed when the URL has ?diagnostics=1.
     
     Returns:
         Selected menu key
     """
-    menu_items = config.SIDEBAR_MENU
+    show_hidden = st.query_params.get("diagnostics") == "1"
+    menu_items = [
+        item for item in config.SIDEBAR_MENU
+        if show_hidden or not item.get("hidden", False)
+    ]
     menu_keys = [item["key"] for item in menu_items]
     menu_labels = [f"{item['icon']} {item['label']}" for item in menu_items]
     
@@ -70,7 +77,11 @@ def render_page_content(selected_menu: str) -> None:
     
     if selected_menu in menu_map:
         page_func = menu_map[selected_menu]
-        page_func()
+        # Queries of this render are recorded for the diagnostics page
+        with profile_render(selected_menu) as profile:
+            page_func()
+            # Age of the oldest dataset shown (cached results may be stale)
+            render_data_age(profile.data_as_of(), profile.serves_stale())
     else:
         st.error(f"Page not found: {selected_menu}")
         logger.warning(f"Unknown menu selection: {selected_menu}")